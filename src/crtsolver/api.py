@@ -0,0 +1,24 @@
+from crtsolver.solvers import crt_solver
+
+MODES = {"bv": True, "int": False} # mode -> use_bitvectors
+
+# NOTE: In-process entry point for embedding CRTSolver, e.g. in a verification pipeline
+# NOTE: One warm CRTSolver is kept per (mode, time limit, options): its cvc5 contexts are reset
+# NOTE: between calls instead of rebuilt, and nothing is printed or written to disk
+# NOTE: Not thread-safe - use one process per concurrent caller
+solvers = {}
+
+def solve(source, mode="bv", timeout=None, time_limit=30000, **options):
+    # source = SMT2 text or path, timeout = wall-clock limit (ms) for the whole problem,
+    # time_limit = limit (ms) for each check-sat, options = other CRTSolver arguments
+    # Returns dto.Result(status, model, reason, prime, candidates, setup_time, solve_time)
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode: {mode} (expected one of {', '.join(MODES)})")
+    key = (mode, time_limit, tuple(sorted(options.items())))
+    solver = solvers.get(key)
+    if solver is None:
+        solver = crt_solver.CRTSolver(str(time_limit), use_bitvectors=MODES[mode], verbose=False,
+            **options)
+        solvers[key] = solver
+    solver.file_timeout = timeout
+    return solver.solve(source)
@@ -0,0 +1,250 @@
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import time
+import timeit
+from pathlib import Path
+from crtsolver import server
+from crtsolver.input_output import reader
+from crtsolver.crt_components.engine import candidate, modulo, modulo_bv
+from crtsolver.crt_components.helpers import dto, prime_generator, utility
+
+ROOT = Path(__file__).resolve().parents[2]
+SUITES = ("solvers", "micro")
+PRIMES = (101, 103, 107, 109, 113) # moduli used by the translation micro-benchmarks
+
+# NOTE: Reproducible performance suite:
+# NOTE: - solvers: every configuration (server.ENGINES) on every file, repeated - the samples are
+# NOTE:   the total runtime of each repetition, plus PAR-2 (unsolved files count 2x the timeout)
+# NOTE:   and the solve count
+# NOTE: - micro: hot engine paths, timed with timeit (seconds per call, one sample per repeat)
+# NOTE: A run is compared with a stored baseline; a benchmark regresses if it is slower by more
+# NOTE: than threshold AND a one-sided permutation test on the samples gives p < alpha, or if a
+# NOTE: configuration solves fewer files
+
+def run_solvers(files, configurations, repeats, timeout, time_limit):
+    # {configuration: {"samples", "solved", "par2", "files": {file: {"status", "times"}}}}
+    report = {}
+    for name in configurations:
+        engine = server.create_engine(name, str(time_limit))
+        server.solve_job(engine, files[0], timeout) # warm-up: imports, contexts, sieve
+        results = {str(file): {"status": None, "times": []} for file in files}
+        samples = []
+        for _ in range(repeats):
+            total = 0.0
+            for file in files:
+                start = time.perf_counter()
+                result = server.solve_job(engine, file, timeout)
+                runtime = time.perf_counter() - start
+                total += runtime
+                results[str(file)]["status"] = result.status
+                results[str(file)]["times"].append(runtime)
+            samples.append(total)
+        solved = [entry for entry in results.values() if entry["status"] != "unknown"]
+        report[name] = {
+            "samples": samples,
+            "solved": len(solved),
+            "par2": par2(results.values(), timeout),
+            "files": results,
+        }
+    return report
+
+def par2(results, timeout):
+    # Sum of median runtimes of solved files + 2x the timeout (s) for every unsolved file
+    return sum(statistics.median(entry["times"]) if entry["status"] != "unknown"
+        else 2 * timeout / 1000 for entry in results)
+
+def micro_benchmarks(files):
+    # {name: function} - each function runs one unit of work on state prepared here
+    largest = max(files, key=lambda file: file.stat().st_size)
+    text = "".join(file.read_text() for file in files)
+    # Most constants, then highest degree - the heaviest translation in the benchmarks
+    widest = max(files, key=lambda file: (reader.natural_key(file.parent.parent.name),
+        reader.natural_key(file.parent.name)))
+
+    API = dto.API()
+    terms = dto.Terms()
+    ast = reader.preprocess(io.StringIO(widest.read_text()), API, terms)
+    primes = dto.Primes()
+    bitwidth = dto.Bitwidth()
+    util = utility.Utility(API, terms, primes, bitwidth, None)
+    int_modulo = modulo.Modulo(ast, API, terms, primes, util)
+    bv_modulo = modulo_bv.Modulo_BV(ast, API, terms, primes, bitwidth, util)
+    lifter = candidate.Candidate(ast, API, terms, util, None)
+    modulus = PRIMES[0] * PRIMES[1]
+    residues = tuple(i + 1 for i in range(len(terms.vars)))
+
+    def translate(back_end):
+        for prime in PRIMES:
+            primes.prime = prime
+            back_end.compute_mod()
+
+    def combine():
+        candidate_pair = (2, 1)
+        for prime in prime_generator.SIEVE.primes[1:40]:
+            candidate_pair = lifter.find_new_candidate((prime, prime // 2), candidate_pair)
+
+    def generate_primes():
+        generator = prime_generator.Prime_Generator().get_next_prime()
+        for _ in itertools.islice(generator, 10000):
+            pass
+
+    prime_generator.SIEVE.precompute(1 << 17)
+    return {
+        "reader.parse": lambda: reader.tokenize_and_parse(io.StringIO(text)),
+        "reader.parse (largest file)":
+            lambda: reader.tokenize_and_parse(io.StringIO(largest.read_text())),
+        "Modulo.compute_mod": lambda: translate(int_modulo),
+        "Modulo_BV.compute_mod": lambda: translate(bv_modulo),
+        "Candidate.populate_candidate_terms":
+            lambda: lifter.populate_candidate_terms(modulus, residues),
+        "Candidate.find_new_candidate": combine,
+        "Prime_Generator": generate_primes,
+    }
+
+def run_micro(files, repeats, names=None):
+    # {name: {"samples": [seconds per call]}}
+    report = {}
+    for name, function in micro_benchmarks(files).items():
+        if names and name not in names:
+            continue
+        timer = timeit.Timer(function)
+        number = timer.autorange()[0] # calls per sample - each sample takes >= 0.2 s
+        report[name] = {"samples": [total / number for total in timer.repeat(repeats, number)]}
+    return report
+
+def permutation_p_value(baseline, current, rounds=10000):
+    # One-sided: probability of a mean slowdown at least this large if both sets of samples
+    # came from the same distribution. Exact for small sample sets, sampled (seeded) otherwise
+    observed = statistics.fmean(current) - statistics.fmean(baseline)
+    pooled = list(baseline) + list(current)
+    size = len(current)
+    if math.comb(len(pooled), size) <= rounds:
+        splits = itertools.combinations(range(len(pooled)), size)
+    else:
+        generator = random.Random(0)
+        splits = (generator.sample(range(len(pooled)), size) for _ in range(rounds))
+    extreme = total = 0
+    for split in splits:
+        chosen = set(split)
+        moved = [pooled[i] for i in chosen]
+        stayed = [pooled[i] for i in range(len(pooled)) if i not in chosen]
+        extreme += statistics.fmean(moved) - statistics.fmean(stayed) >= observed - 1e-12
+        total += 1
+    return extreme / total
+
+def compare(baseline, current, alpha=0.05, threshold=0.15):
+    # Returns (lines, regressions) - one line per benchmark found in both reports
+    lines = []
+    regressions = []
+    for suite in SUITES:
+        for name, entry in current.get(suite, {}).items():
+            old = baseline.get(suite, {}).get(name)
+            if old is None:
+                continue
+            old_mean = statistics.fmean(old["samples"])
+            new_mean = statistics.fmean(entry["samples"])
+            change = new_mean / old_mean - 1 if old_mean else 0.0
+            p_value = permutation_p_value(old["samples"], entry["samples"])
+            regressed = change > threshold and p_value < alpha
+            line = (f"{suite}/{name}: {old_mean:.6g}s -> {new_mean:.6g}s "
+                f"({change:+.1%}, p={p_value:.3f})")
+            if "solved" in entry and entry["solved"] < old["solved"]:
+                regressed = True
+                line += f", solved {old['solved']} -> {entry['solved']}"
+            if regressed:
+                regressions.append(f"{suite}/{name}")
+                line += " REGRESSION"
+            lines.append(line)
+    return lines, regressions
+
+def summary(report):
+    lines = []
+    for name, entry in report.get("solvers", {}).items():
+        lines.append(f"{name}: solved {entry['solved']}/{len(entry['files'])}, "
+            f"PAR-2 {entry['par2']:.3f}s, total {statistics.fmean(entry['samples']):.3f}s "
+            f"(stdev {stdev(entry['samples']):.3f}s)")
+    for name, entry in report.get("micro", {}).items():
+        lines.append(f"{name}: {statistics.median(entry['samples']) * 1e6:.1f}us per call "
+            f"(stdev {stdev(entry['samples']) * 1e6:.1f}us)")
+    return lines
+
+def stdev(samples):
+    return statistics.stdev(samples) if len(samples) > 1 else 0.0
+
+def run(tests_dir, suites=SUITES, configurations=server.ENGINES, repeats=5, timeout=10000,
+    time_limit=30000, micro=None):
+    files = list(reader.iter_files(tests_dir))
+    report = {"timeout": timeout, "repeats": repeats, "python": sys.version.split()[0],
+        "cpus": os.cpu_count()}
+    # Engine output is discarded, so the timings do not include console I/O
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        if "solvers" in suites:
+            report["solvers"] = run_solvers(files, configurations, repeats, timeout, time_limit)
+        if "micro" in suites:
+            report["micro"] = run_micro(files, repeats, micro)
+    return report
+
+# CLI entry point
+def main(arguments=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark every solver configuration and hot engine paths, and compare "
+        "the timings with a stored baseline.")
+    parser.add_argument("--tests_dir", default=str(ROOT / "tests"),
+        help="Directory tree, manifest file (one path per line) or - (stdin) of SMT2 files.")
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=list(SUITES),
+        help="Benchmark suites to run.")
+    parser.add_argument("--configurations", nargs="+", choices=server.ENGINES,
+        default=list(server.ENGINES), help="Solver configurations run by the solvers suite.")
+    parser.add_argument("--micro", nargs="+", default=None,
+        help="Only run these micro-benchmarks (default: all).")
+    parser.add_argument("--repeats", type=int, default=5,
+        help="Timed repetitions of every benchmark (samples for the significance test).")
+    parser.add_argument("--timeout", type=int, default=10000,
+        help="Wall-clock limit for each file (in ms) - unsolved files count 2x towards PAR-2.")
+    parser.add_argument("--time_limit", type=int, default=30000,
+        help="Time limit for each check-sat of the CRT configurations (in ms).")
+    parser.add_argument("--baseline", default=str(ROOT / "results" / "benchmark_baseline.json"),
+        help="Baseline report to compare with (skipped if it does not exist).")
+    parser.add_argument("--save_baseline", action="store_true",
+        help="Store this run as the new baseline instead of comparing with it.")
+    parser.add_argument("--output", default=None,
+        help="Also write this run's report (JSON) to this path.")
+    parser.add_argument("--alpha", type=float, default=0.05,
+        help="Significance level of the permutation test.")
+    parser.add_argument("--threshold", type=float, default=0.15,
+        help="Smallest relative slowdown reported as a regression (0.15 = 15%%).")
+    args = parser.parse_args(arguments)
+
+    report = run(args.tests_dir, args.suites, args.configurations, args.repeats, args.timeout,
+        args.time_limit, args.micro)
+    print("\n".join(summary(report)))
+    if args.output is not None:
+        Path(args.output).write_text(json.dumps(report, indent=1))
+
+    baseline = Path(args.baseline)
+    if args.save_baseline:
+        baseline.parent.mkdir(parents=True, exist_ok=True)
+        baseline.write_text(json.dumps(report, indent=1))
+        print(f"Baseline saved to {baseline}")
+        return 0
+    if not baseline.exists():
+        print(f"No baseline at {baseline} - run with --save_baseline first")
+        return 0
+    lines, regressions = compare(json.loads(baseline.read_text()), report, args.alpha,
+        args.threshold)
+    print("\n".join(lines))
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,102 +1,150 @@
-import itertools
 import cvc5
 from cvc5 import Kind
+from crtsolver.crt_components.engine import evaluator, lifting, term_dag
+from crtsolver.crt_components.helpers import profiling
 
 class Candidate:
-    def __init__(self, ast, API, terms, utility, main):
+    def __init__(self, ast, API, terms, utility, main, branch_limit=1, dag=None, profiler=None,
+        lift_limit=4):
         self.ast = ast
+        # Compiled once per file - shared with the modulo back end when given
+        self.dag = dag if dag is not None else term_dag.Term_DAG(ast, terms.vars)
         self.API = API
         self.terms = terms
         self.utility = utility
         self.main = main
-        self.prime = 2
-        self.mod_results = {} # {constant_name: (modulus, result)}
-
-    def compute_candidate(self, candidate_list):
-        # candidate_list = [(constant_name, modulus, result)]
-        self.prime = candidate_list[0][1] # update prime
-
-        # Create one candidate term for each 
-        # These are the starting values for finding further candidates
-        candidate_dict = {} # candidate_dict = {constant_name, integer_value}
-        if self.mod_results: # mod 3 onwards
-            for candidate in candidate_list:
-                old_mod_result = self.mod_results[candidate[0]]
-                new_mod_result = self.find_new_candidate((candidate[1], candidate[2]), old_mod_result)
-                self.mod_results[candidate[0]] = new_mod_result
-                candidate_dict[candidate[0]] = new_mod_result[1]
-        else: # mod 2
-            for candidate in candidate_list:
-                self.mod_results[candidate[0]] = (candidate[1], candidate[2])
-                candidate_dict[candidate[0]] = candidate[2]
-
-        candidate_terms = self.populate_candidate_terms(candidate_dict)
-        self.check_all_candidates(candidate_terms)
-
-    def populate_candidate_terms(self, candidate_dict):
-        # 2 constants, 2 build_candidates each = 2^2 = 4 total variations
-        # 3 constants, 4 build_candidates each = 4^3 = 64 total variations
-
-        # Construct Cartesian product of offsets (one list for each constant)
-        offset_list = [0, -self.prime, self.prime, -(2*self.prime), 2*self.prime]
-        offset_variations = list(itertools.product(offset_list, repeat=len(candidate_dict)))
-
-        candidate_terms = []
-
-        # Construct lists of all possible variations
-        for variation in offset_variations:
-            candidate_section = {}
-            for (name, value), offset in zip(candidate_dict.items(), variation):
-                new_value = value + offset
-                term = self.utility.handle_integer(new_value)
-                candidate_section[name] = term
-            candidate_terms.append([candidate_section])          
-        return candidate_terms
-
-    def check_all_candidates(self, candidate_terms):
-        # candidate_terms = [
-        # [{constant_name1: value1, constant_name2: value2, constant_name3: value3}],
-        # [{constant_name1: value4, constant_name2: value5, constant_name3: value6}]]
-
-        for candidate_section in candidate_terms:
-            self.process() # reset assertions + ready solver for candidate checking
-            print("Attempting to solve with candidates:")
-            for candidate_dict in candidate_section:
+        self.modulus = 1 # product of the primes combined so far
+        self.branch_limit = branch_limit # branches of the residue search tree kept per prime
+        self.branches = [] # [(modulus, (result1, result2))] - one branch per CRT combination
+        self.complete = True # every residue class so far is covered by a branch
+        self.formula_asserted = False # original formula is asserted once per file
+        self.constraints = [] # translated assert terms, reused by every candidate check
+        self.checked = 0 # candidates checked so far (evaluated or passed to cvc5)
+        self.evaluator = evaluator.Evaluator(ast, terms.vars) # compiled once per file
+        self.profiler = profiler or profiling.DISABLED # per-phase timings of the CRT loop
+        self.lifter = lifting.Lifter(ast, terms.vars, lift_limit) # bounds read once per file
+
+    def compute_candidate(self, prime, residue_tuples, complete=False):
+        # residue_tuples = [(result1, result2)] - satisfying residues mod prime, in declaration order
+        # complete = residue_tuples holds every satisfying residue tuple mod prime
+        with self.profiler.phase("combine"):
+            # Extend every branch of the search tree with every residue tuple for the new prime
+            if self.modulus > 1: # mod 3 onwards
+                self.branches = [
+                    (modulus * prime, tuple(
+                        self.find_new_candidate((prime, new_result), (modulus, old_result))[1]
+                        for old_result, new_result in zip(results, residues)))
+                    for modulus, results in self.branches for residues in residue_tuples]
+            else: # mod 2
+                self.branches = [(prime, tuple(residues)) for residues in residue_tuples]
+            self.modulus *= prime
+
+            # Try the smallest-magnitude combined candidates first + prune to the branch limit
+            # A failed lift does not refute a residue class, so branches are only pruned by rank -
+            # except classes without an integer inside the bounds of the constraints
+            self.branches.sort(key=lambda branch: self.magnitude(*branch))
+            feasible = [branch for branch in self.branches if self.lifter.feasible(*branch)]
+            self.profiler.count("infeasible_branches", len(self.branches) - len(feasible))
+            # Branches dropped by rank are not refuted - once any is, no verdict covers every class
+            self.complete = self.complete and complete and len(feasible) <= self.branch_limit
+            self.branches = feasible[:self.branch_limit]
+        if not self.branches:
+            return # the bounds rule out every branch - the caller decides UNSAT or UNKNOWN
+
+        with self.profiler.phase("lift"):
+            # Residue classes past the 32-bit integers cvc5 accepts cannot be checked
+            self.utility.check_integer(self.modulus // 2)
+            # Lift every branch - the grids are checked in branch order
+            candidate_values = []
+            for modulus, results in self.branches:
+                candidate_values.extend(self.populate_candidate_terms(modulus, results))
+        self.profiler.count("candidates", len(candidate_values))
+        self.check_all_candidates(candidate_values)
+
+    def magnitude(self, modulus, results):
+        # Largest absolute value of the symmetric representatives (-m/2, m/2]
+        return max((abs(result - modulus) if result > modulus // 2 else result
+            for result in results), default=0)
+
+    def populate_candidate_terms(self, modulus, results):
+        # Lifts of x = result (mod modulus) inside the bounds, smallest magnitude first:
+        # lift_limit^k tuples for k constants at most (fewer for bounded constants)
+        names = list(self.terms.vars)
+        candidate_values = []
+
+        # Plain ints - terms are only built when checked
+        for values in self.lifter.candidates(modulus, results):
+            for value in values:
+                self.utility.check_integer(value)
+            candidate_values.append(dict(zip(names, values))) # {constant_name, integer_value}
+        return candidate_values
+
+    def check_all_candidates(self, candidate_values):
+        # candidate_values = [
+        # {constant_name1: value1, constant_name2: value2, constant_name3: value3},
+        # {constant_name1: value4, constant_name2: value5, constant_name3: value6}]
+
+        if self.evaluator.supported:
+            # Evaluate the whole offset grid in one pass - cvc5 only sees a satisfying tuple
+            with self.profiler.phase("evaluate"):
+                index = self.evaluator.first_satisfying(candidate_values)
+            if self.main.detail:
+                self.main.log(f"Evaluated {len(candidate_values)} candidates")
+            if index is None:
+                self.checked += len(candidate_values)
+                if self.main.detail:
+                    self.main.log("Candidate UNSAT")
+                return
+            self.checked += index # the satisfying tuple is counted when cvc5 checks it
+            candidate_values = [candidate_values[index]]
+
+        if not self.formula_asserted:
+            with self.profiler.phase("translate"):
+                self.process() # ready solver for candidate checking
+
+        for candidate_dict in candidate_values:
+            self.checked += 1
+            if self.main.detail:
+                self.main.log("Attempting to solve with candidates:")
                 for name, value in candidate_dict.items():
-                    print(f"{name}: {value}")
-                    # Create one constraint for each candidate
-                    constraint = self.API.solver.mkTerm(
-                        Kind.EQUAL, self.terms.vars[name], value)
-                    self.API.solver.assertFormula(constraint)
-
-            if not (self.main.check_candidate()):
+                    self.main.log(f"{name}: {value}")
+            constants = []
+            values = []
+            assumptions = []
+            for name, value in candidate_dict.items():
+                # Create one equality for each candidate - passed as an assumption
+                # so the asserted formula is reused by every check
+                term = self.utility.handle_integer(value)
+                constants.append(self.terms.vars[name])
+                values.append(term)
+                assumptions.append(self.API.solver.mkTerm(
+                    Kind.EQUAL, self.terms.vars[name], term))
+
+            # NOTE: cvc5 does not substitute assumptions during preprocessing, so an
+            # NOTE: unsubstituted nonlinear check is ~20x slower than a fresh solve
+            # NOTE: The ground instance of each constraint is passed as well, so wrong
+            # NOTE: candidates are refuted by simplification alone
+            with self.profiler.phase("candidate_check"):
+                ground = [constraint.substitute(constants, values)
+                    for constraint in self.constraints]
+                continue_check = self.main.check_candidate(ground + assumptions)
+            if not continue_check:
                 # Break loop if candidate solution is correct
                 break
 
     def process(self):
-        # Reset constant=candidate assertion
-        self.API.solver.resetAssertions()
-        for subTree in self.ast:
-            if subTree[0] == "assert":
-                # Process each assert command
-                constraint = self.process_constraint(subTree[1])
-                self.API.solver.assertFormula(constraint)
-
-    def process_constraint(self, subtree):
-        # leaf node = string
-        # subtree = list
-        if (isinstance(subtree, str)):
-            if subtree in self.terms.vars:
-                return self.terms.vars[subtree] # return constant
-            else:
-                return self.utility.handle_integer(subtree)
-        
+        # Assert the original formula once - candidates are checked under assumptions
+        self.constraints = self.dag.instantiate(self.process_leaf, self.utility.create_term)
+        for constraint in self.constraints:
+            self.API.solver.assertFormula(constraint)
+        self.formula_asserted = True
+
+    def process_leaf(self, kind, token):
+        if kind == "var":
+            return self.terms.vars[token] # return constant
         else:
-            # Call process_constraint for all operands (depth-first traversal)
-            operator = subtree[0]
-            operands = [self.process_constraint(operand) for operand in subtree[1:]]
-            return self.utility.create_term(operator, operands)
-    
+            return self.utility.handle_integer(token)
+
     # NOTE: find_new_candidate uses the Chinese Remainder Theorem
     # NOTE: Follows the equation detailed in the Wikipedia page for the Chinese Remainder Theorem
     # NOTE: Specifically, the equation for the "Case of two modulo" in the
@@ -0,0 +1,136 @@
+import functools
+import numpy as np
+
+# Largest magnitude evaluated with int64 arrays - leaves headroom below 2^63
+INT64_LIMIT = 2**62
+# Longest postfix program compiled - terms shared through let grow when flattened
+PROGRAM_LIMIT = 1 << 16
+
+class Evaluator:
+    def __init__(self, ast, var_names):
+        self.var_names = list(var_names)
+        self.index = {name: i for i, name in enumerate(self.var_names)}
+        self.operations = {
+            "+": lambda operands: functools.reduce(np.add, operands),
+            "-": lambda operands: functools.reduce(np.subtract, operands),
+            "*": lambda operands: functools.reduce(np.multiply, operands),
+            "neg": lambda operands: np.negative(operands[0]),
+            "=": lambda operands: self.chain(np.equal, operands),
+            ">": lambda operands: self.chain(np.greater, operands),
+            "<": lambda operands: self.chain(np.less, operands),
+            ">=": lambda operands: self.chain(np.greater_equal, operands),
+            "<=": lambda operands: self.chain(np.less_equal, operands),
+            "and": lambda operands: functools.reduce(np.logical_and, operands),
+            "or": lambda operands: functools.reduce(np.logical_or, operands),
+            "not": lambda operands: np.logical_not(operands[0])
+        }
+
+        # Compile every assert once into a postfix program
+        # supported = False if the formula uses anything the evaluator cannot decide
+        self.supported = True
+        self.programs = []
+        for subtree in ast:
+            if subtree[0] == "assert":
+                program = self.compile(subtree[1])
+                if program is None:
+                    self.supported = False
+                else:
+                    self.programs.append(program)
+
+    def compile(self, tree):
+        # Iterative post-order walk: program = [(operation, argument)]
+        program = []
+        stack = [(tree, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if isinstance(node, str):
+                if node in self.index:
+                    program.append(("var", self.index[node]))
+                else:
+                    try:
+                        program.append(("const", int(node)))
+                    except ValueError:
+                        return None # e.g. Boolean constants or undeclared symbols
+            elif expanded:
+                operator = node[0]
+                arity = len(node) - 1
+                if operator == "-" and arity == 1:
+                    operator = "neg" # unary minus
+                if operator not in self.operations:
+                    return None
+                program.append((operator, arity))
+                if len(program) > PROGRAM_LIMIT:
+                    return None
+            else:
+                # Visit node again after its operands
+                stack.append((node, True))
+                for operand in reversed(node[1:]):
+                    stack.append((operand, False))
+        return program
+
+    def chain(self, compare, operands):
+        # SMT-LIB comparisons are chainable: (< a b c) = (a < b) and (b < c)
+        result = compare(operands[0], operands[1])
+        for left, right in zip(operands[1:], operands[2:]):
+            result = np.logical_and(result, compare(left, right))
+        return result
+
+    def bound(self, program, input_bound):
+        # Upper bound on the magnitude of every intermediate value
+        stack = []
+        largest = 0
+        for operation, argument in program:
+            if operation == "var":
+                value = input_bound
+            elif operation == "const":
+                value = abs(argument)
+            else:
+                operands = stack[-argument:]
+                del stack[-argument:]
+                if operation in ("+", "-"):
+                    value = sum(operands)
+                elif operation == "*":
+                    value = functools.reduce(lambda a, b: a * b, operands)
+                elif operation == "neg":
+                    value = operands[0]
+                else:
+                    value = 1 # Boolean result
+            largest = max(largest, value)
+            stack.append(value)
+        return largest
+
+    def run(self, program, columns):
+        stack = []
+        for operation, argument in program:
+            if operation == "var":
+                stack.append(columns[argument])
+            elif operation == "const":
+                stack.append(argument)
+            else:
+                operands = stack[-argument:]
+                del stack[-argument:]
+                stack.append(self.operations[operation](operands))
+        return stack[0]
+
+    def first_satisfying(self, candidates):
+        # candidates = [{constant_name: value}]
+        # Returns the index of the first candidate satisfying every assert, or None
+        if not candidates:
+            return None
+        input_bound = max(abs(value) for candidate in candidates for value in candidate.values())
+
+        # Exact arithmetic: int64 when no intermediate value can overflow, Python ints otherwise
+        if all(self.bound(program, input_bound) < INT64_LIMIT for program in self.programs):
+            dtype = np.int64
+        else:
+            dtype = object
+        columns = [np.array([candidate[name] for candidate in candidates], dtype=dtype)
+            for name in self.var_names]
+
+        satisfied = np.ones(len(candidates), dtype=bool)
+        for program in self.programs:
+            satisfied &= np.asarray(self.run(program, columns), dtype=bool)
+        indices = np.flatnonzero(satisfied)
+        if len(indices) == 0:
+            return None
+        return int(indices[0])
@@ -0,0 +1,70 @@
+# NOTE: Encodes polynomial equations mod p in Horner form
+# NOTE: Coefficients are reduced mod p in Python, zero terms are dropped, and each Horner step
+# NOTE: (acc * x + addend) is reduced once - acc, x, addend < p keeps every step below p^2,
+# NOTE: so the bit-vector encoding cannot wrap around. Both back ends bound every constant
+# NOTE: to [0, p), so a constant on its own needs no reduction
+# NOTE: Expanding can also grow a formula - e.g. (x+23)^3 needs more steps in Horner form than
+# NOTE: as a product - so an assert only uses Horner form if it needs no more multiplications
+# NOTE: and reductions than its DAG encoding. Everything else is left to the DAG encoding
+class Horner_Encoder:
+    def __init__(self, dag, var_names):
+        self.polynomials = dag.polynomials # per assert: {monomial: coefficient} or None
+        self.dag_costs = [dag.cost(root) for root in dag.roots]
+        self.var_names = list(var_names)
+
+    def instantiate(self, prime, leaf, step):
+        # leaf(kind, value) -> term for a constant ("const", residue) or a constant name ("var", name)
+        # step(acc, var, addend) -> (acc * var + addend) mod p, acc = None means 1, addend may be None
+        # Returns per assert: term (the equation is term = 0 mod p) or None for the DAG encoding
+        encodings = []
+        for polynomial, dag_cost in zip(self.polynomials, self.dag_costs):
+            if polynomial is None:
+                encodings.append(None)
+                continue
+            reduced = {}
+            for monomial, coefficient in polynomial.items():
+                if coefficient % prime:
+                    reduced[monomial] = coefficient % prime
+            if self.cost(reduced, prime) > dag_cost:
+                encodings.append(None)
+            else:
+                encodings.append(self.horner(reduced, 0, prime, leaf, step)[0])
+        return encodings
+
+    def cost(self, polynomial, prime):
+        # Multiplications + reductions of the Horner form (dry run without building terms)
+        steps = []
+        def count(acc, var, addend):
+            steps.append(1 if acc is None else 2)
+            return "step"
+        self.horner(polynomial, 0, prime, lambda kind, value: kind, count)
+        return sum(steps)
+
+    def horner(self, polynomial, j, prime, leaf, step):
+        # Horner scheme in the j-th constant, with coefficients that are polynomials in the rest
+        # Returns (term, value) - value = residue if the polynomial is constant
+        k = len(self.var_names)
+        while j < k and all(monomial[j] == 0 for monomial in polynomial):
+            j += 1
+        if j == k:
+            value = sum(polynomial.values()) % prime # at most one (constant) monomial
+            return (leaf("const", value), value)
+
+        groups = {} # {exponent of constant j: polynomial}
+        for monomial, coefficient in polynomial.items():
+            groups.setdefault(monomial[j], {})[monomial] = coefficient
+        var = leaf("var", self.var_names[j])
+
+        degree = max(groups)
+        acc, value = self.horner(groups[degree], j + 1, prime, leaf, step)
+        if value == 1:
+            acc = None # leading coefficient 1 - no multiplication needed
+        for exponent in range(degree - 1, -1, -1):
+            addend = None
+            if exponent in groups:
+                addend = self.horner(groups[exponent], j + 1, prime, leaf, step)[0]
+            if acc is None and addend is None:
+                acc = var
+            else:
+                acc = step(acc, var, addend)
+        return (acc, None)
@@ -0,0 +1,169 @@
+import itertools
+from crtsolver.crt_components.engine import term_dag
+from crtsolver.crt_components.helpers import polynomial
+
+ENUMERATION_LIMIT = 1000 # widest root interval searched for the exact minimum of a univariate part
+
+# NOTE: Lifting of combined residues: x = r (mod m) is lifted to the integers r + j*m closest to 0
+# NOTE: (the symmetric representative (-m/2, m/2] first), within per-constant bounds
+# NOTE: Bounds [lower, upper] (None = open) are read from the asserts (and conjunctions):
+# NOTE: - linear atoms a*x + c (<, <=, >, >=, =) 0 in a single constant
+# NOTE: - Cauchy root bounds of univariate equations: |x| <= 1 + max|a_k| / |a_n|
+# NOTE: - separable constraints sum f_i(x_i) + c <= 0 (or = 0) where every f_i has even degree and
+# NOTE:   a positive leading coefficient (e.g. sums of squares): each f_i is bounded below, so
+# NOTE:   f_i(x_i) <= -c - sum of the other lower bounds, which bounds x_i by the Cauchy bound
+# NOTE: A residue class without an integer inside the bounds cannot contain a solution
+
+def assert_atoms(ast):
+    # Atoms of the asserts - conjunctions are flattened, anything else is kept whole
+    stack = [subtree[1] for subtree in reversed(ast) if subtree[0] == "assert"]
+    while stack:
+        term = stack.pop()
+        if isinstance(term, list) and term and term[0] == "and":
+            stack.extend(reversed(term[1:]))
+        else:
+            yield term
+
+def upper_forms(atom, var_names):
+    # Atom -> ([Q with Q <= 0], lhs - rhs if the atom is an equation else None)
+    if not (isinstance(atom, list) and len(atom) == 3
+        and atom[0] in ("<", "<=", ">", ">=", "=")):
+        return [], None
+    lhs = polynomial.expand(atom[1], var_names, term_dag.MONOMIAL_LIMIT)
+    rhs = polynomial.expand(atom[2], var_names, term_dag.MONOMIAL_LIMIT)
+    if lhs is None or rhs is None:
+        return [], None
+    difference = polynomial.add(lhs, rhs, -1)
+    negated = polynomial.add({}, difference, -1)
+    one = polynomial.constant(1, len(var_names))
+    forms = {
+        "<=": [difference],
+        "<": [polynomial.add(difference, one)], # integers: P < 0 <=> P + 1 <= 0
+        ">=": [negated],
+        ">": [polynomial.add(negated, one)],
+        "=": [difference, negated],
+    }[atom[0]]
+    return forms, difference if atom[0] == "=" else None
+
+def separable_parts(form):
+    # Q -> (constant, {constant index: [0, a_1, ..., a_n]}), or None if a monomial mixes constants
+    constant = 0
+    parts = {}
+    for monomial, coefficient in form.items():
+        used = [i for i, exponent in enumerate(monomial) if exponent]
+        if not used:
+            constant += coefficient
+            continue
+        if len(used) > 1:
+            return None
+        i = used[0]
+        coefficients = parts.setdefault(i, [0])
+        coefficients.extend([0] * (monomial[i] + 1 - len(coefficients)))
+        coefficients[monomial[i]] += coefficient
+    return constant, parts
+
+def cauchy_bound(coefficients):
+    # Every root of a_0 + a_1*x + ... + a_n*x^n satisfies |x| <= 1 + max|a_k| / |a_n| (k < n)
+    return 1 + max(abs(a) for a in coefficients[:-1]) // abs(coefficients[-1])
+
+def lower_bound(coefficients):
+    # Lower bound of an even-degree univariate polynomial with a positive leading coefficient
+    # over the integers - it is positive outside its root bound R, so only [-R, R] is searched
+    bound = cauchy_bound(coefficients)
+    if bound <= ENUMERATION_LIMIT:
+        inside = min(evaluate(coefficients, x) for x in range(-bound, bound + 1))
+    else:
+        # a_n*x^n >= 0, the other terms are at least -|a_k|*R^k on [-R, R]
+        inside = coefficients[0] - sum(abs(a) * bound ** k
+            for k, a in enumerate(coefficients[1:-1], 1))
+    return min(inside, 1)
+
+def evaluate(coefficients, x):
+    value = 0
+    for a in reversed(coefficients):
+        value = value * x + a
+    return value
+
+def integer_bounds(ast, var_names):
+    # [(lower, upper)] per constant in declaration order - None if the side is open
+    var_names = list(var_names)
+    lower = [None] * len(var_names)
+    upper = [None] * len(var_names)
+
+    def tighten(i, low, high):
+        if low is not None and (lower[i] is None or low > lower[i]):
+            lower[i] = low
+        if high is not None and (upper[i] is None or high < upper[i]):
+            upper[i] = high
+
+    for atom in assert_atoms(ast):
+        forms, equation = upper_forms(atom, var_names)
+        if equation is not None:
+            split = separable_parts(equation)
+            if split is not None and len(split[1]) == 1:
+                # Univariate equation: every root is inside the Cauchy bound
+                (i, coefficients), = split[1].items()
+                bound = cauchy_bound([split[0]] + coefficients[1:])
+                tighten(i, -bound, bound)
+        for form in forms:
+            split = separable_parts(form)
+            if split is None or not split[1]:
+                continue
+            constant, parts = split
+            if len(parts) == 1 and len(next(iter(parts.values()))) == 2:
+                # a*x + c <= 0
+                (i, (_, a)), = parts.items()
+                if a > 0:
+                    tighten(i, None, -constant // a)
+                else:
+                    tighten(i, -(-constant // -a), None)
+                continue
+            if all(len(coefficients) % 2 and coefficients[-1] > 0
+                for coefficients in parts.values()):
+                # sum f_i(x_i) + c <= 0 with every f_i bounded below
+                floors = {i: lower_bound(coefficients) for i, coefficients in parts.items()}
+                total = sum(floors.values())
+                for i, coefficients in parts.items():
+                    ceiling = -constant - (total - floors[i]) # f_i(x_i) <= ceiling
+                    bound = cauchy_bound([-ceiling] + coefficients[1:])
+                    tighten(i, -bound, bound)
+    return list(zip(lower, upper))
+
+def lifts(residue, modulus, lower=None, upper=None, limit=4):
+    # Integers = residue (mod modulus) inside [lower, upper], smallest magnitude first
+    up = residue % modulus # smallest non-negative lift
+    down = up - modulus # largest negative lift
+    if lower is not None and up < lower:
+        up += -(-(lower - up) // modulus) * modulus
+    if upper is not None and down > upper:
+        down -= -(-(down - upper) // modulus) * modulus
+    values = []
+    while len(values) < limit:
+        up_fits = upper is None or up <= upper
+        down_fits = lower is None or down >= lower
+        if not (up_fits or down_fits):
+            break
+        if up_fits and (not down_fits or up <= -down):
+            values.append(up)
+            up += modulus
+        else:
+            values.append(down)
+            down -= modulus
+    return values
+
+class Lifter:
+    def __init__(self, ast, var_names, limit=4):
+        self.bounds = integer_bounds(ast, var_names) # [(lower, upper)] per constant
+        self.limit = limit # lifts per constant - n lifts cover every |x| < n/2 * modulus
+
+    def feasible(self, modulus, results):
+        # Every constant has an integer in its residue class and inside its bounds
+        return all(lifts(result, modulus, lower, upper, 1)
+            for result, (lower, upper) in zip(results, self.bounds))
+
+    def candidates(self, modulus, results):
+        # Value tuples (declaration order), smallest largest-magnitude first
+        choices = [lifts(result, modulus, lower, upper, self.limit)
+            for result, (lower, upper) in zip(results, self.bounds)]
+        return sorted(itertools.product(*choices),
+            key=lambda values: (max(map(abs, values), default=0), sum(map(abs, values))))
@@ -1,21 +1,40 @@
 import cvc5
 from cvc5 import Kind
 import math
+from crtsolver.crt_components.engine import horner, term_dag
+from crtsolver.crt_components.helpers import profiling
 
 class Modulo:
-    def __init__(self, ast, API, terms, primes, utility):
+    def __init__(self, ast, API, terms, primes, utility, dag=None, cache=None, profiler=None):
         self.ast = ast
+        # Compiled once per file - shared with the other back ends when given
+        self.dag = dag if dag is not None else term_dag.Term_DAG(ast, terms.vars)
+        self.encoder = horner.Horner_Encoder(self.dag, terms.vars)
         self.API = API
         self.terms = terms
         self.primes = primes
         self.utility = utility
+        self.scope_open = False # True while the previous prime's assertions are on the stack
+        self.cache = cache # Residue_Cache shared across files and runs (None = off)
+        self.profiler = profiler or profiling.DISABLED # per-phase timings of the CRT loop
+        self.found_all = False # the last solve_mod returned every residue tuple of its prime
 
     def compute_mod(self):
+        # Each prime gets its own assertion level - the previous prime's level is popped,
+        # so checkSat only sees the current modulus
+        self.enter_scope()
+        self.terms.mod_vars.clear()
         self.primes.prime_int = self.utility.handle_integer(str(self.primes.prime))
         self.create_mod_constants()
         self.add_starting_assertion()
         self.process_mod()
 
+    def enter_scope(self):
+        if self.scope_open:
+            self.API.mod_solver.pop()
+        self.API.mod_solver.push()
+        self.scope_open = True
+
     def create_mod_constants(self):
         sort = self.API.tm.getIntegerSort()
         for name in self.terms.vars:
@@ -34,34 +53,126 @@ class Modulo:
                     "<", [self.terms.mod_vars[name], self.primes.prime_int]
                 )
                 self.API.mod_solver.assertFormula(constraint)
-
-    def process_mod(self):
-        # assertions are not reset - new modulo p assertions added each time
-        for subtree in self.ast:
-            # Process each assert command within context of modulo prime
-            if subtree[0] == "assert":
-                constraint = self.process_mod_constraint(subtree[1])
+                # and non-negative, so each residue class has exactly one representative
+                constraint = self.utility.create_mod_term(
+                    ">=", [self.terms.mod_vars[name], self.utility.handle_integer("0")]
+                )
                 self.API.mod_solver.assertFormula(constraint)
 
-    def process_mod_constraint(self, subtree):
-        # leaf node = string
-        # subtree = list
-        if (isinstance(subtree, str)):
-            if subtree in self.terms.vars:
-                return self.terms.mod_vars[
-                    f"{subtree}_mod_{self.primes.prime}"] # return mod_p equivalent
+    def process_mod(self):
+        # assertions live in the current prime's scope - popped before the next prime
+        # Polynomial equations use the Horner encoding, everything else is instantiated
+        # from the DAG within context of modulo prime
+        encodings = self.encoder.instantiate(
+            self.primes.prime, self.process_horner_leaf, self.process_horner_step)
+        if any(term is None for term in encodings):
+            dag_constraints = self.dag.instantiate(
+                self.process_mod_leaf, self.process_mod_node, modulo=True)
+        for i, term in enumerate(encodings):
+            if term is None:
+                constraint = dag_constraints[i]
+                if constraint is None:
+                    continue # not encodable mod p (see Term_DAG)
             else:
-                num_term = self.utility.handle_integer(subtree)
-                return self.API.mod_solver.mkTerm(Kind.INTS_MODULUS, num_term, self.primes.prime_int)
+                constraint = self.utility.create_mod_term("=", [term, self.utility.handle_integer("0")])
+            self.API.mod_solver.assertFormula(constraint)
+
+    def process_horner_leaf(self, kind, value):
+        if kind == "var":
+            return self.terms.mod_vars[f"{value}_mod_{self.primes.prime}"]
         else:
-            # Call process_modulo_constraint for all operands (depth-first traversal)
-            operator = subtree[0]
-            operands = [self.process_mod_constraint
-                (operand) for operand in subtree[1:]]
-            term = self.utility.create_mod_term(operator, operands)
-
-            # For all operations other than equals, wrap with mod p
-            if operator == "=":
-                return term
+            return self.utility.handle_integer(str(value)) # already reduced mod p
+
+    def process_horner_step(self, acc, var, addend):
+        # (acc * var + addend) mod p
+        term = var if acc is None else self.utility.create_mod_term("*", [acc, var])
+        if addend is not None:
+            term = self.utility.create_mod_term("+", [term, addend])
+        return self.API.mod_solver.mkTerm(Kind.INTS_MODULUS, term, self.primes.prime_int)
+
+    def process_mod_leaf(self, kind, token):
+        if kind == "var":
+            return self.terms.mod_vars[f"{token}_mod_{self.primes.prime}"] # return mod_p equivalent
+        else:
+            num_term = self.utility.handle_integer(token)
+            return self.API.mod_solver.mkTerm(Kind.INTS_MODULUS, num_term, self.primes.prime_int)
+
+    def process_mod_node(self, operator, operands):
+        term = self.utility.create_mod_term(operator, operands)
+
+        # For all operations other than equals, wrap with mod p
+        if operator == "=":
+            return term
+        else:
+            return self.API.mod_solver.mkTerm(Kind.INTS_MODULUS, term, self.primes.prime_int)
+
+    def get_mod_values(self):
+        # Get int values from solver, in declaration order
+        values = []
+        for name in self.terms.vars:
+            val = self.terms.mod_vars[f"{name}_mod_{self.primes.prime}"]
+            values.append(self.API.mod_solver.getValue(val).getIntegerValue())
+        return values
+
+    def solve_mod(self, limit):
+        # Returns (status, residue_tuples) for the current prime - "SAT", "UNSAT" or "UNKNOWN"
+        # A cached (system, prime) pair skips building and checking the modulo problem
+        key = None
+        if self.cache is not None:
+            key = self.dag.canonical_form(self.primes.prime, "int")
+            cached = self.cache.get(key, limit)
+            if cached is not None:
+                self.profiler.count("residue_cache_hits")
+                # Entries with fewer tuples than asked for hold every tuple (see below)
+                self.found_all = cached[0] == "SAT" and len(cached[1]) < limit
+                return cached
+
+        with self.profiler.phase("translate"):
+            self.compute_mod()
+        with self.profiler.phase("mod_check"):
+            self.utility.set_time_limit(self.API.mod_solver)
+            result = self.API.mod_solver.checkSat()
+            if result.isSat():
+                status, residue_tuples = "SAT", self.get_all_mod_values(limit)
+                self.profiler.count("residue_tuples", len(residue_tuples))
+            elif result.isUnsat():
+                status, residue_tuples = "UNSAT", None
             else:
-                return self.API.mod_solver.mkTerm(Kind.INTS_MODULUS, term, self.primes.prime_int)
+                return ("UNKNOWN", None) # timeouts are not cached
+
+        if key is not None:
+            if status == "SAT" and not self.found_all:
+                limit = len(residue_tuples) # only answers queries for this many tuples
+            self.cache.put(key, status, residue_tuples, limit)
+        return (status, residue_tuples)
+
+    def get_all_mod_values(self, limit):
+        # Enumerate up to limit residue tuples using blocking clauses
+        # The first model was found by the caller's checkSat
+        all_values = [self.get_mod_values()]
+        self.found_all = False # True once every residue tuple has been found
+        # Blocking clauses get their own assertion level - popped afterwards, so they do not
+        # exclude residues of the next prime
+        self.API.mod_solver.push()
+        while len(all_values) < limit:
+            self.block_mod_values(all_values[-1])
+            self.utility.set_time_limit(self.API.mod_solver)
+            result = self.API.mod_solver.checkSat()
+            if not result.isSat():
+                self.found_all = result.isUnsat() # UNKNOWN = stop early
+                break
+            all_values.append(self.get_mod_values())
+        self.API.mod_solver.pop()
+        return all_values
+
+    def block_mod_values(self, values):
+        # Assert that at least one constant differs from the previous model
+        differences = []
+        for name, value in zip(self.terms.vars, values):
+            const = self.terms.mod_vars[f"{name}_mod_{self.primes.prime}"]
+            differences.append(self.API.mod_solver.mkTerm(
+                Kind.DISTINCT, const, self.API.tm.mkInteger(value)))
+        if len(differences) == 1:
+            self.API.mod_solver.assertFormula(differences[0])
+        else:
+            self.API.mod_solver.assertFormula(self.API.mod_solver.mkTerm(Kind.OR, *differences))
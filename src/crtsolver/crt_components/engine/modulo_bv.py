@@ -1,32 +1,53 @@
 import cvc5
 from cvc5 import Kind
 import math
+from crtsolver.crt_components.engine import horner, term_dag
+from crtsolver.crt_components.helpers import profiling
 
 class Modulo_BV:
-    def __init__(self, ast, API, terms, primes, bitwidth, utility):
+    def __init__(self, ast, API, terms, primes, bitwidth, utility, dag=None, cache=None,
+        profiler=None):
         self.ast = ast
+        # Compiled once per file - shared with the other back ends when given
+        self.dag = dag if dag is not None else term_dag.Term_DAG(ast, terms.vars)
+        self.encoder = horner.Horner_Encoder(self.dag, terms.vars)
         self.API = API
         self.terms = terms
         self.primes = primes
         self.bitwidth = bitwidth
         self.utility = utility
+        self.scope_open = False # True while the previous prime's assertions are on the stack
+        self.cache = cache # Residue_Cache shared across files and runs (None = off)
+        self.profiler = profiler or profiling.DISABLED # per-phase timings of the CRT loop
+        self.found_all = False # the last solve_mod returned every residue tuple of its prime
 
     def compute_mod(self):
+        # Each prime gets its own assertion level - the previous prime's level is popped,
+        # so checkSat only sees the current modulus (and a single bitwidth)
+        self.enter_scope()
+
         # Reset bitvector dictionaries for current prime
         self.terms.bv_mod_vars.clear()
         self.terms.bv_ints.clear()
 
-        # Find the smallest n such that 2^n >= p^2
-        self.bitwidth.n = math.log2(self.primes.prime ** 2) # solve for n using n >= log2(p^2)
-        self.bitwidth.n = math.ceil(self.bitwidth.n) # round up if necessary
+        # Constants only need the smallest n such that 2^n > p - every other term gets
+        # its own width from range analysis (see process_bv_mod_node)
+        self.bitwidth.n = self.primes.prime.bit_length()
         self.primes.prime_bv = self.utility.handle_bv_integer(str(self.primes.prime))
         # Create a bit-vector type of width n
         self.bitwidth.n_sort = self.API.tm.mkBitVectorSort(self.bitwidth.n)
+        self.bv_values = {} # {(width, value): bit-vector constant}
 
         self.create_bv_mod_constants()
         self.add_bv_starting_assertion()
         self.process_bv_mod()
 
+    def enter_scope(self):
+        if self.scope_open:
+            self.API.mod_solver.pop()
+        self.API.mod_solver.push()
+        self.scope_open = True
+
     def create_bv_mod_constants(self):
         for name in self.terms.vars:
             # Create constant and add to dictionary
@@ -46,32 +67,190 @@ class Modulo_BV:
                 self.API.mod_solver.assertFormula(constraint)
 
     def process_bv_mod(self):
-        # assertions are not reset - new modulo p assertions added each time
-        for subtree in self.ast:
-            if subtree[0] == "assert":
-                # Process each assert command within context of modulo prime
-                constraint = self.process_bv_mod_constraint(subtree[1])
-                self.API.mod_solver.assertFormula(constraint)
-
-    def process_bv_mod_constraint(self, subtree):
-        # leaf node = string
-        # subtree = list
-        if (isinstance(subtree, str)):
-            if subtree in self.terms.vars:
-                return self.utility.handle_bv_mod_const(subtree) # return mod_p equivalent
+        # assertions live in the current prime's scope - popped before the next prime
+        # Polynomial equations use the Horner encoding, everything else is instantiated
+        # from the DAG within context of modulo prime
+        encodings = self.encoder.instantiate(
+            self.primes.prime, self.process_bv_mod_leaf, self.process_bv_horner_step)
+        if any(node is None for node in encodings):
+            dag_constraints = self.dag.instantiate(
+                self.process_bv_mod_leaf, self.process_bv_mod_node, modulo=True)
+        for i, node in enumerate(encodings):
+            if node is None:
+                if dag_constraints[i] is None:
+                    continue # not encodable mod p (see Term_DAG)
+                constraint = dag_constraints[i][0]
             else:
-                mod_term = int(subtree) % self.primes.prime
-                return self.utility.handle_bv_integer(str(mod_term))
+                zero = self.process_bv_mod_leaf("const", 0)
+                constraint = self.process_bv_mod_node("=", [node, zero])[0]
+            self.API.mod_solver.assertFormula(constraint)
+
+    # NOTE: Every arithmetic term is a node (term, width, bound) - bound is the largest value
+    # NOTE: the term can take. Widths follow the bounds, so no operation can wrap around:
+    # NOTE: operands are zero-extended only where the result needs more bits, subtraction
+    # NOTE: adds a multiple of p instead of wrapping, and urem is only emitted where
+    # NOTE: a bound reaches p (before a comparison, or to keep products within 2n bits)
+    def process_bv_mod_leaf(self, kind, token):
+        if kind == "var":
+            # return mod_p equivalent - asserted to be < p
+            return (self.utility.handle_bv_mod_const(token), self.bitwidth.n, self.primes.prime - 1)
+        else:
+            value = int(token) % self.primes.prime
+            return (self.bv_value(self.bitwidth.n, value), self.bitwidth.n, value)
+
+    def process_bv_mod_node(self, operator, operands):
+        if operator == "+":
+            return self.bv_add(operands)
+        elif operator == "-" and len(operands) == 1:
+            return self.bv_add([self.bv_negate(operands[0])])
+        elif operator == "-":
+            return self.bv_add([operands[0]] + [self.bv_negate(node) for node in operands[1:]])
+        elif operator == "*":
+            node = operands[0]
+            for operand in operands[1:]:
+                node = self.bv_multiply(node, operand)
+            return node
+        elif operator in ("=", ">", "<", ">=", "<="):
+            # Compare residues: reduce each side below p, then compare at a common width
+            operands = [self.bv_reduce(node) for node in operands]
+            width = max(node[1] for node in operands)
+            terms = [self.bv_extend(node, width) for node in operands]
+            return (self.utility.create_bv_mod_term(operator, terms), None, None)
         else:
-            # Call process_modulo_constraint for all operands (depth-first traversal)
-            operator = subtree[0]
-            operands = [self.process_bv_mod_constraint
-                (operand) for operand in subtree[1:]]
-            term = self.utility.create_bv_mod_term(operator, operands)
-
-            # For all operations other than equals, wrap with mod p
-            if operator == "=":
-                return term
+            return (self.utility.create_bv_mod_term(
+                operator, [node[0] for node in operands]), None, None)
+
+    def process_bv_horner_step(self, acc, var, addend):
+        # (acc * var + addend) urem p
+        node = var if acc is None else self.bv_multiply(acc, var)
+        if addend is not None:
+            node = self.bv_add([node, addend])
+        return self.bv_reduce(node)
+
+    def bv_value(self, width, value):
+        if (width, value) not in self.bv_values:
+            self.bv_values[(width, value)] = self.API.tm.mkBitVector(width, value)
+        return self.bv_values[(width, value)]
+
+    def bv_extend(self, node, width):
+        # Zero-extend a node's term to width bits (no-op if it is already that wide)
+        term, node_width, _ = node
+        if node_width == width:
+            return term
+        extend = self.API.tm.mkOp(Kind.BITVECTOR_ZERO_EXTEND, width - node_width)
+        return self.API.mod_solver.mkTerm(extend, term)
+
+    def bv_add(self, operands):
+        bound = sum(node[2] for node in operands)
+        width = max([bound.bit_length()] + [node[1] for node in operands])
+        terms = [self.bv_extend(node, width) for node in operands]
+        if len(terms) == 1:
+            return (terms[0], width, bound)
+        return (self.API.mod_solver.mkTerm(Kind.BITVECTOR_ADD, *terms), width, bound)
+
+    def bv_negate(self, node):
+        # -a = M - a (mod p), with M the smallest multiple of p that is >= the bound of a
+        term, width, bound = node
+        multiple = -(-bound // self.primes.prime) * self.primes.prime
+        width = max(multiple.bit_length(), width)
+        difference = self.API.mod_solver.mkTerm(
+            Kind.BITVECTOR_SUB, self.bv_value(width, multiple), self.bv_extend(node, width))
+        return (difference, width, multiple)
+
+    def bv_multiply(self, left, right):
+        # Products are kept within 2n bits - reduce the operand with the larger bound first
+        limit = 2 * self.bitwidth.n
+        while (left[2] * right[2]).bit_length() > limit:
+            if left[2] >= right[2]:
+                left = self.bv_reduce(left)
             else:
-                return self.API.mod_solver.mkTerm(Kind.BITVECTOR_UREM, term, self.primes.prime_bv)
-            
\ No newline at end of file
+                right = self.bv_reduce(right)
+        bound = left[2] * right[2]
+        width = max(bound.bit_length(), left[1], right[1])
+        product = self.API.mod_solver.mkTerm(Kind.BITVECTOR_MULT,
+            self.bv_extend(left, width), self.bv_extend(right, width))
+        return (product, width, bound)
+
+    def bv_reduce(self, node):
+        # urem p - skipped if the bound already proves the node is below p
+        term, width, bound = node
+        if bound < self.primes.prime:
+            return node
+        remainder = self.API.mod_solver.mkTerm(
+            Kind.BITVECTOR_UREM, term, self.bv_value(width, self.primes.prime))
+        if width > self.bitwidth.n: # the remainder fits in n bits
+            extract = self.API.tm.mkOp(Kind.BITVECTOR_EXTRACT, self.bitwidth.n - 1, 0)
+            remainder = self.API.mod_solver.mkTerm(extract, remainder)
+        return (remainder, self.bitwidth.n, self.primes.prime - 1)
+
+    def get_mod_values(self):
+        # Get bv values from solver (represented as int), in declaration order
+        values = []
+        for name in self.terms.vars:
+            val = self.terms.bv_mod_vars[f"{name}_mod_{self.primes.prime}"]
+            bitvector_val = self.API.mod_solver.getValue(val).getBitVectorValue()
+            values.append(int(bitvector_val, 2)) # conversion from base 2 to int
+        return values
+
+    def solve_mod(self, limit):
+        # Returns (status, residue_tuples) for the current prime - "SAT", "UNSAT" or "UNKNOWN"
+        # A cached (system, prime) pair skips building and checking the modulo problem
+        key = None
+        if self.cache is not None:
+            key = self.dag.canonical_form(self.primes.prime, "bv")
+            cached = self.cache.get(key, limit)
+            if cached is not None:
+                self.profiler.count("residue_cache_hits")
+                # Entries with fewer tuples than asked for hold every tuple (see below)
+                self.found_all = cached[0] == "SAT" and len(cached[1]) < limit
+                return cached
+
+        with self.profiler.phase("translate"):
+            self.compute_mod()
+        with self.profiler.phase("mod_check"):
+            self.utility.set_time_limit(self.API.mod_solver)
+            result = self.API.mod_solver.checkSat()
+            if result.isSat():
+                status, residue_tuples = "SAT", self.get_all_mod_values(limit)
+                self.profiler.count("residue_tuples", len(residue_tuples))
+            elif result.isUnsat():
+                status, residue_tuples = "UNSAT", None
+            else:
+                return ("UNKNOWN", None) # timeouts are not cached
+
+        if key is not None:
+            if status == "SAT" and not self.found_all:
+                limit = len(residue_tuples) # only answers queries for this many tuples
+            self.cache.put(key, status, residue_tuples, limit)
+        return (status, residue_tuples)
+
+    def get_all_mod_values(self, limit):
+        # Enumerate up to limit residue tuples using blocking clauses
+        # The first model was found by the caller's checkSat
+        all_values = [self.get_mod_values()]
+        self.found_all = False # True once every residue tuple has been found
+        # Blocking clauses get their own assertion level - popped afterwards, so they do not
+        # exclude residues of the next prime
+        self.API.mod_solver.push()
+        while len(all_values) < limit:
+            self.block_mod_values(all_values[-1])
+            self.utility.set_time_limit(self.API.mod_solver)
+            result = self.API.mod_solver.checkSat()
+            if not result.isSat():
+                self.found_all = result.isUnsat() # UNKNOWN = stop early
+                break
+            all_values.append(self.get_mod_values())
+        self.API.mod_solver.pop()
+        return all_values
+
+    def block_mod_values(self, values):
+        # Assert that at least one constant differs from the previous model
+        differences = []
+        for name, value in zip(self.terms.vars, values):
+            const = self.terms.bv_mod_vars[f"{name}_mod_{self.primes.prime}"]
+            differences.append(self.API.mod_solver.mkTerm(
+                Kind.DISTINCT, const, self.API.tm.mkBitVector(self.bitwidth.n, value)))
+        if len(differences) == 1:
+            self.API.mod_solver.assertFormula(differences[0])
+        else:
+            self.API.mod_solver.assertFormula(self.API.mod_solver.mkTerm(Kind.OR, *differences))
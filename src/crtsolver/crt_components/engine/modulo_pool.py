@@ -0,0 +1,87 @@
+import multiprocessing
+import queue
+import time
+from crtsolver.input_output import reader
+from crtsolver.crt_components.engine import modulo, modulo_bv, residue_enumerator
+from crtsolver.crt_components.helpers import dto, utility
+from crtsolver.crt_components.errors import error
+
+# NOTE: Runs inside a worker process, so every call builds its own cvc5 context
+# NOTE: The modulo problems for different primes do not depend on each other
+def solve_modulo_prime(ast, prime, time_limit, use_bitvectors, enum_threshold=0, residue_limit=1,
+    residue_cache=None):
+    API = dto.API(time_limit)
+    terms = dto.Terms()
+    reader.create_constants(ast, API, terms)
+
+    # Small residue grids are enumerated directly - no cvc5 round trip
+    enumerator = residue_enumerator.Residue_Enumerator(ast, terms.vars, enum_threshold)
+    if enumerator.fits(prime):
+        residues = enumerator.enumerate(prime)
+        if residues:
+            return (prime, "SAT", residues[:residue_limit])
+        return (prime, "UNSAT", None)
+
+    primes = dto.Primes(prime=prime)
+    bitwidth = dto.Bitwidth()
+    util = utility.Utility(API, terms, primes, bitwidth, None)
+
+    if use_bitvectors:
+        mod = modulo_bv.Modulo_BV(ast, API, terms, primes, bitwidth, util, cache=residue_cache)
+    else:
+        mod = modulo.Modulo(ast, API, terms, primes, util, cache=residue_cache)
+
+    # Return (prime, status, residue_tuples) - plain ints so they can be pickled
+    return (prime, *mod.solve_mod(residue_limit))
+
+def run_modulo_prime(task, result_queue):
+    # Process target - sends (prime, status, residue_tuples) back to the parent
+    result_queue.put(solve_modulo_prime(*task))
+
+# NOTE: One process per prime in the window, instead of a multiprocessing.Pool:
+# NOTE: Pool.terminate can deadlock while its task handler thread is still feeding work,
+# NOTE: which hung runs that short-circuit a window (UNSAT or candidate SAT)
+# NOTE: Every window gets a fresh result queue, so a process killed mid-put cannot leave
+# NOTE: a lock held for the next window. Processes are terminated when the file finishes
+class Modulo_Pool:
+    def __init__(self, window):
+        self.window = window # number of primes solved concurrently
+        self.processes = []
+
+    def solve_window(self, ast, primes, time_limit, use_bitvectors, enum_threshold=0,
+        residue_limit=1, deadline=None, residue_cache=None):
+        # Yields (prime, status, residue_tuples) as soon as each prime finishes
+        # Raises TimeoutException once the file deadline (wall-clock time) has passed
+        self.terminate()
+        result_queue = multiprocessing.Queue()
+        for prime in primes:
+            task = (ast, prime, time_limit, use_bitvectors, enum_threshold, residue_limit,
+                residue_cache)
+            process = multiprocessing.Process(target=run_modulo_prime, args=(task, result_queue))
+            process.start()
+            self.processes.append(process)
+
+        pending = set(primes)
+        while pending:
+            try:
+                result = result_queue.get(timeout=0.1)
+            except queue.Empty:
+                if deadline is not None and time.time() > deadline:
+                    raise error.TimeoutException("File timeout while solving the prime window")
+                # A worker that exited without a result (e.g. crashed in cvc5) counts as UNKNOWN
+                if not any(process.is_alive() for process in self.processes) \
+                    and result_queue.empty():
+                    for prime in sorted(pending):
+                        yield (prime, "UNKNOWN", None)
+                    return
+                continue
+            pending.discard(result[0])
+            yield result
+
+    def terminate(self):
+        # Kills workers that are still running a modulo check
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        self.processes = []
@@ -0,0 +1,59 @@
+import numpy as np
+from crtsolver.crt_components.engine import evaluator
+
+# NOTE: Evaluates every assert mod p over the full p^k residue grid
+# NOTE: Semantics match the integer-mode encoding: arithmetic is reduced mod p and
+# NOTE: "=" compares residues. Order comparisons have no meaning mod p, so formulas
+# NOTE: using them are left to the cvc5 modulo solver. So are negations: not (= 2x 2) holds for
+# NOTE: x = 0, but 2x = 2 for every residue mod 2
+class Residue_Enumerator:
+    def __init__(self, ast, var_names, threshold):
+        self.var_names = list(var_names)
+        self.threshold = threshold # largest grid (p^k tuples) enumerated directly
+        self.evaluator = evaluator.Evaluator(ast, self.var_names)
+        self.operations = {
+            "+": np.add,
+            "-": np.subtract,
+            "*": np.multiply
+        }
+        self.supported = bool(self.var_names) and self.evaluator.supported and all(
+            operation in ("var", "const", "+", "-", "*", "neg", "=", "and", "or")
+            for program in self.evaluator.programs for operation, _ in program)
+
+    def fits(self, prime):
+        # True if the residue grid for this prime is small enough to enumerate
+        return self.supported and prime ** len(self.var_names) <= self.threshold
+
+    def run(self, program, columns, prime):
+        stack = []
+        for operation, argument in program:
+            if operation == "var":
+                stack.append(columns[argument])
+            elif operation == "const":
+                stack.append(argument % prime)
+            else:
+                operands = stack[-argument:]
+                del stack[-argument:]
+                if operation in self.operations:
+                    # Reduce after every step, so values stay below p^2
+                    result = operands[0]
+                    for operand in operands[1:]:
+                        result = self.operations[operation](result, operand) % prime
+                elif operation == "neg":
+                    result = np.negative(operands[0]) % prime
+                else:
+                    result = self.evaluator.operations[operation](operands)
+                stack.append(result)
+        return stack[0]
+
+    def enumerate(self, prime):
+        # Returns every satisfying residue tuple (in lexicographic order) - empty list = UNSAT
+        k = len(self.var_names)
+        grid = np.indices((prime,) * k, dtype=np.int64).reshape(k, -1)
+        columns = [grid[i] for i in range(k)]
+
+        satisfied = np.ones(grid.shape[1], dtype=bool)
+        for program in self.evaluator.programs:
+            satisfied &= np.asarray(self.run(program, columns, prime), dtype=bool)
+        return [tuple(int(value) for value in grid[:, index])
+            for index in np.flatnonzero(satisfied)]
@@ -0,0 +1,147 @@
+import hashlib
+from crtsolver.crt_components.helpers import polynomial
+
+# Largest expansion kept as a sparse polynomial - bigger products stay in DAG form
+MONOMIAL_LIMIT = 512
+# Operators the modulo back ends encode - see Term_DAG.encodable
+MODULO_OPERATORS = ("=", "+", "-", "*", ">", "<", ">=", "<=")
+
+# NOTE: The asserts are compiled once per file into a hash-consed DAG
+# NOTE: Identical subterms share one node, so every back end (integer mod p, bit-vector mod p,
+# NOTE: original formula) builds each distinct subterm once per modulus
+# NOTE: Nodes are stored children-first, so instantiating is a single pass over a flat list
+# NOTE: Polynomial equations are also kept in sparse normal form for the Horner encoding
+# NOTE: Asserts using other operators than MODULO_OPERATORS (not, distinct, ...) are left out of
+# NOTE: the modulo problems: a negation does not survive reduction mod p (2x != 2 holds for
+# NOTE: x = 0, but 2x = 2 for every residue mod 2), while leaving an assert out keeps the
+# NOTE: residues of every integer solution. The original formula still checks every candidate
+class Term_DAG:
+    def __init__(self, ast, var_names):
+        self.nodes = [] # [(operator, argument)] - argument = token for leaves, child ids otherwise
+        self.ids = {} # hash-consing table: node -> node id
+        self.roots = [] # node id of every assert, in file order
+        self.polynomials = [] # sparse normal form of every assert (None if not an equation)
+        self.var_index = {name: i for i, name in enumerate(var_names)}
+        names = set(var_names)
+        for subtree in ast:
+            if subtree[0] == "assert":
+                self.roots.append(self.add_tree(subtree[1], names))
+                self.polynomials.append(
+                    polynomial.equation(subtree[1], list(var_names), MONOMIAL_LIMIT))
+        # Per node: leaf, or a MODULO_OPERATORS node over encodable children (children come first)
+        self.encodable = []
+        for operator, argument in self.nodes:
+            self.encodable.append(isinstance(argument, str) or (operator in MODULO_OPERATORS
+                and all(self.encodable[child] for child in argument)))
+
+    def add_tree(self, tree, var_names):
+        # Iterative post-order walk - deep terms do not hit the recursion limit
+        # Subtrees shared by reference (e.g. let bindings) are walked once
+        ids = []
+        built = {} # id(subtree) -> node id
+        stack = [(tree, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if isinstance(node, str):
+                if node in var_names:
+                    ids.append(self.intern(("var", node)))
+                else:
+                    ids.append(self.intern(("const", node)))
+            elif id(node) in built:
+                ids.append(built[id(node)])
+            elif expanded:
+                arity = len(node) - 1
+                children = tuple(ids[len(ids) - arity:])
+                del ids[len(ids) - arity:]
+                built[id(node)] = self.intern((node[0], children))
+                ids.append(built[id(node)])
+            else:
+                # Visit node again after its operands
+                stack.append((node, True))
+                for operand in reversed(node[1:]):
+                    stack.append((operand, False))
+        return ids[0]
+
+    def intern(self, node):
+        node_id = self.ids.get(node)
+        if node_id is None:
+            node_id = len(self.nodes)
+            self.ids[node] = node_id
+            self.nodes.append(node)
+        return node_id
+
+    def cost(self, root):
+        # Multiplications + mod p reductions needed to encode the assert at root
+        # Shared subterms are counted once, as they are built once
+        total = 0
+        seen = set()
+        stack = [root]
+        while stack:
+            node_id = stack.pop()
+            if node_id in seen:
+                continue
+            seen.add(node_id)
+            operator, argument = self.nodes[node_id]
+            if not isinstance(argument, str):
+                if operator == "*":
+                    total += len(argument) - 1
+                if operator != "=":
+                    total += 1 # every other operation is reduced
+                stack.extend(argument)
+        return total
+
+    def instantiate(self, leaf, combine, modulo=False):
+        # leaf(kind, token) -> term for "var"/"const" nodes
+        # combine(operator, operand_terms) -> term for every other node
+        # Returns one term per assert - with modulo=True, None for asserts that are not encodable
+        terms = []
+        for (operator, argument), encodable in zip(self.nodes, self.encodable):
+            if modulo and not encodable:
+                terms.append(None) # only used by nodes that are not encodable either
+            elif isinstance(argument, str): # leaf
+                terms.append(leaf(operator, argument))
+            else:
+                terms.append(combine(operator, [terms[child] for child in argument]))
+        return [terms[root] for root in self.roots]
+
+    def canonical_form(self, modulus, encoding):
+        # Hash of the system reduced mod modulus - equal for systems with the same residues
+        # Polynomial equations: coefficients reduced mod modulus, scaled so the leading one is 1
+        # Other asserts: structural hash (constants renamed to their index, numbers kept as is)
+        # tagged with the encoding, as the back ends may relax them differently
+        # Asserts are sorted and deduplicated, as their order does not change the solutions
+        forms = set()
+        hashes = None
+        for root, equation in zip(self.roots, self.polynomials):
+            if equation is not None:
+                forms.add(repr(self.reduce(equation, modulus)))
+            else:
+                if hashes is None:
+                    hashes = self.node_hashes()
+                forms.add(f"{encoding} {hashes[root]}")
+        system = "\n".join(sorted(forms))
+        return hashlib.sha256(f"{len(self.var_index)}|{modulus}|{system}".encode()).hexdigest()
+
+    def reduce(self, equation, modulus):
+        reduced = sorted((monomial, coefficient % modulus)
+            for monomial, coefficient in equation.items() if coefficient % modulus)
+        if reduced:
+            try:
+                inverse = pow(reduced[-1][1], -1, modulus)
+            except ValueError:
+                return reduced # leading coefficient is not a unit (modulus is a prime power)
+            reduced = [(monomial, coefficient * inverse % modulus)
+                for monomial, coefficient in reduced]
+        return reduced
+
+    def node_hashes(self):
+        # Merkle hash of every node - shared subterms are hashed once, deep terms do not recurse
+        hashes = []
+        for operator, argument in self.nodes:
+            if isinstance(argument, str):
+                token = self.var_index[argument] if operator == "var" else argument
+                text = f"{operator} {token}"
+            else:
+                text = f"{operator} " + " ".join(hashes[child] for child in argument)
+            hashes.append(hashlib.sha256(text.encode()).hexdigest())
+        return hashes
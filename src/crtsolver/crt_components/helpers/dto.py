@@ -23,6 +23,13 @@ class API:
         self.mod_solver.setOption("tlimit-per", self.time_limit)
         self.mod_solver.setLogic("QF_ALL")
 
+    def reset(self, time_limit):
+        # Reuses both contexts for a new problem - much cheaper than creating new solvers
+        self.time_limit = time_limit
+        for solver in (self.solver, self.mod_solver):
+            solver.resetAssertions()
+            solver.setOption("tlimit-per", time_limit)
+
 @dataclass
 class Terms:
     # field(default_factory=dict) ensures that 
@@ -43,3 +50,27 @@ class Primes:
 class Bitwidth:
     n: int = field(default=None) # python int
     n_sort: cvc5.Sort = field(default=None) # bv sort with n bitwidth
+
+@dataclass
+class Result:
+    status: str # "sat", "unsat" or "unknown"
+    model: dict = field(default_factory=dict) # constant name -> value, if sat
+    reason: str = field(default=None) # "timeout", "incomplete" or "error", if unknown
+    prime: int = field(default=None) # last prime the CRT loop reached
+    candidates: int = 0 # candidates checked
+    setup_time: float = 0.0 # parsing + compiling (s)
+    solve_time: float = 0.0 # CRT loop (s)
+
+    @classmethod
+    def from_sat_model(cls, sat_model, **fields):
+        # sat_model as stored in the results file: [["UNSAT"]], [["UNKNOWN (...)"]] or a model
+        result = cls(status="sat", **fields)
+        if sat_model and sat_model[0][0] == "UNSAT":
+            result.status = "unsat"
+        elif sat_model and sat_model[0][0].startswith("UNKNOWN"):
+            result.status = "unknown"
+            result.reason = {"UNKNOWN (TIMEOUT)": "timeout",
+                "UNKNOWN (INCOMPLETE)": "incomplete"}.get(sat_model[0][0], "error")
+        else:
+            result.model = dict(sat_model)
+        return result
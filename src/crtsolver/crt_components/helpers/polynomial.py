@@ -0,0 +1,112 @@
+# NOTE: Sparse polynomials over the declared constants: {monomial: coefficient}
+# NOTE: A monomial is a tuple of exponents, one per constant in declaration order
+# NOTE: Only +, -, * and integer constants are expanded - anything else returns None
+
+def constant(value, k):
+    if value == 0:
+        return {}
+    return {(0,) * k: value}
+
+def variable(i, k):
+    return {tuple(1 if j == i else 0 for j in range(k)): 1}
+
+def add(left, right, sign=1):
+    result = dict(left)
+    for monomial, coefficient in right.items():
+        total = result.get(monomial, 0) + sign * coefficient
+        if total:
+            result[monomial] = total
+        else:
+            result.pop(monomial, None)
+    return result
+
+def multiply(left, right):
+    result = {}
+    for monomial_a, coefficient_a in left.items():
+        for monomial_b, coefficient_b in right.items():
+            monomial = tuple(a + b for a, b in zip(monomial_a, monomial_b))
+            total = result.get(monomial, 0) + coefficient_a * coefficient_b
+            if total:
+                result[monomial] = total
+            else:
+                result.pop(monomial, None)
+    return result
+
+def expand(tree, var_names, limit=None):
+    # Iterative post-order walk - deep terms do not hit the recursion limit
+    # Returns None if an intermediate polynomial has more than limit monomials
+    index = {name: i for i, name in enumerate(var_names)}
+    k = len(index)
+    values = []
+    expanded_trees = {} # id(subtree) -> polynomial, for subtrees shared by reference
+    stack = [(tree, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if not isinstance(node, str) and id(node) in expanded_trees:
+            values.append(expanded_trees[id(node)])
+        elif isinstance(node, str):
+            if node in index:
+                values.append(variable(index[node], k))
+            else:
+                try:
+                    values.append(constant(int(node), k))
+                except ValueError:
+                    return None
+        elif expanded:
+            operator = node[0]
+            arity = len(node) - 1
+            operands = values[-arity:]
+            del values[-arity:]
+            if operator == "-" and arity == 1:
+                result = add({}, operands[0], -1) # unary minus
+            elif operator == "+":
+                result = {}
+                for operand in operands:
+                    result = add(result, operand)
+            elif operator == "-":
+                result = operands[0]
+                for operand in operands[1:]:
+                    result = add(result, operand, -1)
+            elif operator == "*":
+                result = operands[0]
+                for operand in operands[1:]:
+                    result = multiply(result, operand)
+            else:
+                return None
+            if limit is not None and len(result) > limit:
+                return None
+            expanded_trees[id(node)] = result
+            values.append(result)
+        else:
+            if isinstance(node, list) and len(node) > 1 and isinstance(node[0], str):
+                stack.append((node, True))
+                for operand in reversed(node[1:]):
+                    stack.append((operand, False))
+            else:
+                return None
+    return values[0]
+
+def equation(assertion, var_names, limit=None):
+    # (= lhs rhs) -> lhs - rhs, or None if the assert is not a polynomial equation
+    if not (isinstance(assertion, list) and len(assertion) == 3 and assertion[0] == "="):
+        return None
+    lhs = expand(assertion[1], var_names, limit)
+    rhs = expand(assertion[2], var_names, limit)
+    if lhs is None or rhs is None:
+        return None
+    return add(lhs, rhs, -1)
+
+def degree(polynomial):
+    return max((sum(monomial) for monomial in polynomial), default=0)
+
+def leading_coefficients(ast, var_names):
+    # Coefficients of the highest-degree monomials of every polynomial equation
+    coefficients = set()
+    for subtree in ast:
+        if subtree[0] == "assert":
+            polynomial = equation(subtree[1], var_names)
+            if polynomial:
+                top = degree(polynomial)
+                coefficients.update(abs(coefficient) for monomial, coefficient
+                    in polynomial.items() if sum(monomial) == top)
+    return sorted(coefficients)
@@ -1,25 +1,72 @@
-class Prime_Generator:
+import bisect
+import math
+
+SEGMENT_SIZE = 1 << 15 # numbers sieved per segment
+
+class Prime_Sieve:
     def __init__(self):
-        self.primes = []
-        self.curr = 2
+        self.primes = [] # every prime <= self.limit, ascending
+        self.limit = 1
 
-    def get_next_prime(self):
+    def precompute(self, limit):
+        # Sieve every number up to limit in advance
+        while self.limit < limit:
+            self.extend()
+
+    def extend(self):
+        # Segmented sieve of Eratosthenes over [low, high]
+        low = self.limit + 1
+        high = self.limit + SEGMENT_SIZE
+
+        if self.limit == 1:
+            # First segment: plain sieve, is_prime[n] represents n
+            is_prime = bytearray(b"\x00\x00") + bytearray(b"\x01") * (high - 1)
+            for p in range(2, math.isqrt(high) + 1):
+                if is_prime[p]:
+                    is_prime[p*p::p] = bytes(len(range(p*p, high + 1, p)))
+            self.primes.extend(n for n in range(2, high + 1) if is_prime[n])
+        else:
+            # Later segments: cross out multiples of the primes found so far
+            # Segments are smaller than the sieved range, so every prime <= sqrt(high) is known
+            is_prime = bytearray(b"\x01") * (high - low + 1)
+            for p in self.primes:
+                if p * p > high:
+                    break
+                first = max(p * p, -(-low // p) * p) # first multiple of p in the segment
+                is_prime[first - low::p] = bytes(len(range(first, high + 1, p)))
+            self.primes.extend(low + i for i, flag in enumerate(is_prime) if flag)
+        self.limit = high
+
+    def primes_from(self, start):
+        # Yields every prime >= start, sieving further segments when needed
+        index = bisect.bisect_left(self.primes, start)
         while True:
-            # true if current number is not divisible by any previous prime
-            if all(self.curr % p != 0 for p in self.primes):
-                self.primes.append(self.curr) # append current number
-                yield self.curr # return current number + save function state
-            self.curr += 1 # function resumes here if yield executes
+            while index >= len(self.primes):
+                self.extend()
+            yield self.primes[index]
+            index += 1
+
+# Shared by every generator - primes are only sieved once per process
+SIEVE = Prime_Sieve()
+
+class Prime_Generator:
+    def __init__(self, start=2):
+        self.primes = [] # primes returned so far
+        self.start = start
+
+    def get_next_prime(self):
+        for prime in SIEVE.primes_from(self.start):
+            self.primes.append(prime)
+            yield prime # return current prime + save function state
 
     def get_current_prime(self):
         if self.primes:
             return self.primes[-1]
         else:
             return None # if self.primes is empty
-    
+
     def get_previous_prime(self):
         if self.primes:
             return self.primes[-2]
         else:
             return None
-        
\ No newline at end of file
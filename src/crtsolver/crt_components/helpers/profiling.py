@@ -0,0 +1,88 @@
+import time
+from contextlib import nullcontext
+
+# Phases of the CRT loop -> results column (wall-clock seconds, summed over the file)
+PHASES = {
+    "parse": "Parse (s)", # reading + preprocessing the SMT2 file
+    "compile": "Compile (s)", # term DAG, Horner encoding, evaluator, schedule
+    "translate": "Translate (s)", # building the modulo problem for a prime
+    "mod_check": "Mod Check (s)", # modulo checkSat calls, including residue enumeration
+    "enumerate": "Enumerate (s)", # residue grids enumerated with NumPy (no cvc5)
+    "combine": "Combine (s)", # CRT combination of the residue branches
+    "lift": "Lift (s)", # candidate grids from the combined residues
+    "evaluate": "Evaluate (s)", # candidate grids evaluated without cvc5
+    "candidate_check": "Candidate Check (s)", # cvc5 candidate checks
+}
+HEADERS = list(PHASES.values()) + ["CPU (s)", "Primes Tried"]
+
+# NOTE: Per-file profile of the CRT loop: wall-clock (perf_counter) and CPU (process_time) time
+# NOTE: per phase, the same per prime, and counters (primes, candidates, terms)
+# NOTE: A disabled profiler hands out one shared no-op context, so instrumented code only pays
+# NOTE: a method call when profiling is off
+class Profiler:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.phases = {} # name -> [wall, cpu, calls]
+        self.counters = {} # name -> count
+        self.primes = [] # per prime: {"prime": p, phase name: wall, ...}
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+
+    def phase(self, name):
+        if not self.enabled:
+            return NO_OP
+        return Phase(self, name)
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def start_prime(self, prime):
+        # Phases recorded from now on are also attributed to this prime
+        if self.enabled:
+            self.primes.append({"prime": prime})
+            self.count("primes")
+
+    def record(self, name, wall, cpu):
+        totals = self.phases.setdefault(name, [0.0, 0.0, 0])
+        totals[0] += wall
+        totals[1] += cpu
+        totals[2] += 1
+        if self.primes and name not in ("parse", "compile"):
+            self.primes[-1][name] = self.primes[-1].get(name, 0.0) + wall
+
+    def columns(self):
+        # Values for HEADERS
+        return ([self.phases.get(name, [0.0])[0] for name in PHASES]
+            + [time.process_time() - self.cpu_start, self.counters.get("primes", 0)])
+
+    def to_json(self, **fields):
+        # Structured trace of the file - fields (e.g. file name, result) come first
+        return dict(fields,
+            wall_time=time.perf_counter() - self.wall_start,
+            cpu_time=time.process_time() - self.cpu_start,
+            phases={name: {"wall": wall, "cpu": cpu, "calls": calls}
+                for name, (wall, cpu, calls) in self.phases.items()},
+            counters=dict(self.counters),
+            primes=self.primes)
+
+class Phase:
+    __slots__ = ("profiler", "name", "wall", "cpu")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        # Recorded even if the phase raised (e.g. a file timeout)
+        self.profiler.record(self.name, time.perf_counter() - self.wall,
+            time.process_time() - self.cpu)
+        return False
+
+NO_OP = nullcontext()
+DISABLED = Profiler(enabled=False) # default for engine objects created without a profiler
@@ -0,0 +1,38 @@
+import math
+from crtsolver.crt_components.helpers import prime_generator
+
+SCHEDULES = ("consecutive", "skip_leading", "prime_powers", "geometric")
+
+# NOTE: A schedule decides which moduli the CRT loop uses, in order
+# NOTE: Every schedule yields pairwise coprime moduli, so candidates can still be combined
+# NOTE: with the CRT - the product of moduli is what has to outgrow the solution bound
+class Modulus_Schedule:
+    def __init__(self, name="consecutive", start_prime=2, power=2, ratio=2.0,
+        leading_coefficients=()):
+        if name not in SCHEDULES:
+            raise ValueError(f"Unknown modulus schedule: {name}")
+        self.name = name
+        self.start_prime = max(start_prime, 2) # smallest prime used
+        self.power = max(power, 1) # exponent for prime_powers
+        self.ratio = ratio # growth factor for geometric
+        self.leading_coefficients = [c for c in leading_coefficients if c != 0]
+
+    def get_next_modulus(self):
+        primes = prime_generator.Prime_Generator(self.start_prime).get_next_prime()
+        if self.name == "consecutive":
+            yield from primes
+        elif self.name == "skip_leading":
+            # Mod a prime dividing a leading coefficient the polynomial loses its top degree
+            for prime in primes:
+                if all(c % prime != 0 for c in self.leading_coefficients):
+                    yield prime
+        elif self.name == "prime_powers":
+            for prime in primes:
+                yield prime ** self.power
+        else:
+            # geometric: next prime >= previous prime * ratio
+            lower = self.start_prime
+            while True:
+                prime = next(prime_generator.Prime_Generator(lower).get_next_prime())
+                yield prime
+                lower = max(prime + 1, math.ceil(prime * self.ratio))
@@ -17,7 +17,12 @@ class Utility:
             ">": Kind.GT,
             "<": Kind.LT,
             ">=": Kind.GEQ,
-            "<=": Kind.LEQ
+            "<=": Kind.LEQ,
+            # Boolean structure - original formula only (the modulo problems leave it out)
+            "and": Kind.AND,
+            "or": Kind.OR,
+            "not": Kind.NOT,
+            "distinct": Kind.DISTINCT
         }
         self.bv_operator_mapping = {
             "=": Kind.EQUAL,
@@ -50,6 +55,16 @@ class Utility:
         except OverflowError:
             raise error.AbortFileException(num)
         
+    def set_time_limit(self, solver):
+        # Cap the next check-sat by the remaining file budget (raises TimeoutException when spent)
+        if self.main is not None:
+            solver.setOption("tlimit-per", str(self.main.time_budget()))
+
+    def check_integer(self, num):
+        # cvc5 mkInteger only accepts 32-bit ints - same limit as handle_integer
+        if not (-2**31 <= int(num) < 2**31):
+            raise error.AbortFileException(num)
+
     def handle_bv_mod_const(self, const):
         # Return equivalent constant for mod p
         mod_name = f"{const}_mod_{self.primes.prime}"
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+# NOTE: On-disk cache of solved files, shared by every run and solver
+# NOTE: Entries are keyed by a hash of the SMT2 contents + the solver configuration (name, mode,
+# NOTE: time limit and any option that can change the answer), so a renamed or moved file still
+# NOTE: hits and an edited file misses. Only the main process reads or writes the cache -
+# NOTE: a connection is opened per call, so solvers holding a cache can still be pickled
+class Result_Cache:
+    def __init__(self, path, retime=False):
+        self.path = Path(path)
+        self.retime = retime # solve cached files again (and refresh their entries) for new timings
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(self.path)) as connection, connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS results (digest TEXT, config TEXT, sat_model TEXT, "
+                "runtime REAL, progress TEXT, PRIMARY KEY (digest, config))")
+
+    def digest(self, file):
+        return hashlib.sha256(Path(file).read_bytes()).hexdigest()
+
+    def get(self, file, config):
+        # (sat_model, runtime, progress) stored for the file, or None
+        if self.retime:
+            return None
+        with closing(sqlite3.connect(self.path)) as connection:
+            row = connection.execute(
+                "SELECT sat_model, runtime, progress FROM results WHERE digest = ? AND config = ?",
+                (self.digest(file), config)).fetchone()
+        if row is None:
+            return None
+        return (json.loads(row[0]), row[1], json.loads(row[2]))
+
+    def put(self, file, config, sat_model, runtime, progress=()):
+        with closing(sqlite3.connect(self.path)) as connection, connection:
+            connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (self.digest(file), config, json.dumps(sat_model), runtime,
+                json.dumps(list(progress))))
+
+    def invalidate(self, config=None):
+        # Drops the entries of one solver configuration, or every entry
+        with closing(sqlite3.connect(self.path)) as connection, connection:
+            if config is None:
+                connection.execute("DELETE FROM results")
+            else:
+                connection.execute("DELETE FROM results WHERE config = ?", (config,))
+
+# NOTE: On-disk LRU cache of modulo results, keyed by Term_DAG.canonical_form (the system
+# NOTE: reduced mod the modulus) - shared by every file, run and worker process
+# NOTE: Stores the UNSAT verdict or the residue tuples found, with the limit they were found
+# NOTE: under: fewer tuples than the limit means every residue tuple was found
+# NOTE: The least recently used entries are evicted once capacity is exceeded
+class Residue_Cache:
+    def __init__(self, path, capacity=100000):
+        self.path = Path(path)
+        self.capacity = capacity # largest number of (system, modulus) entries kept
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(self.path, timeout=30)) as connection, connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS residues (key TEXT PRIMARY KEY, status TEXT, "
+                "residues TEXT, residue_limit INTEGER, used INTEGER)")
+            connection.execute("CREATE INDEX IF NOT EXISTS residues_used ON residues (used)")
+
+    def get(self, key, limit):
+        # (status, residue_tuples) if the entry answers a query for up to limit tuples, or None
+        with closing(sqlite3.connect(self.path, timeout=30)) as connection, connection:
+            row = connection.execute(
+                "SELECT status, residues, residue_limit FROM residues WHERE key = ?",
+                (key,)).fetchone()
+            if row is None:
+                return None
+            status, residues, residue_limit = row
+            residues = json.loads(residues)
+            if status == "SAT" and residue_limit < limit and len(residues) >= residue_limit:
+                return None # more tuples may exist than were enumerated
+            connection.execute("UPDATE residues SET used = (SELECT IFNULL(MAX(used), 0) + 1 "
+                "FROM residues) WHERE key = ?", (key,))
+        if status == "SAT":
+            return (status, residues[:limit])
+        return (status, None)
+
+    def put(self, key, status, residues, limit):
+        with closing(sqlite3.connect(self.path, timeout=30)) as connection, connection:
+            connection.execute("INSERT OR REPLACE INTO residues VALUES (?, ?, ?, ?, "
+                "(SELECT IFNULL(MAX(used), 0) + 1 FROM residues))",
+                (key, status, json.dumps(residues), limit))
+            connection.execute("DELETE FROM residues WHERE key IN (SELECT key FROM residues "
+                "ORDER BY used DESC LIMIT -1 OFFSET ?)", (self.capacity,))
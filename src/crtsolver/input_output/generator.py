@@ -0,0 +1,192 @@
+import argparse
+import math
+import random
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[3]
+VAR_NAMES = "xyzuvwabcdefghijklmnopqrst" # one letter per constant, up to 26
+OBSTRUCTION_PRIMES = (3, 5, 7, 11, 13) # moduli of the UNSAT obstructions
+
+# NOTE: Synthetic QF_NIA workloads in the <N>var/<M>deg layout read by reader.iter_files, with a
+# NOTE: solutions.txt ground truth (same format as tests/solutions.txt)
+# NOTE: SAT: random polynomials with the constant term chosen so a planted solution is a root -
+# NOTE: other roots may exist, the planted one is recorded
+# NOTE: UNSAT: P = m*Q + R(x1) for a prime m and a univariate R with no roots mod m, so every
+# NOTE: assignment leaves P = R(x1) != 0 mod m (the CRT solver refutes it at modulus m)
+# NOTE: Every file has its own seeded generator, so adding sizes does not change other files
+
+def monomials(variables, degree, count, rng):
+    # count distinct non-constant exponent tuples of total degree <= degree, one of them = degree
+    top = [0] * variables
+    for _ in range(degree):
+        top[rng.randrange(variables)] += 1
+    chosen = {tuple(top)}
+    # Exponent tuples of total degree 1..degree - count is clamped to it
+    available = math.comb(variables + degree, degree) - 1
+    while len(chosen) < min(count, available):
+        exponents = [0] * variables
+        for _ in range(rng.randint(1, degree)):
+            exponents[rng.randrange(variables)] += 1
+        chosen.add(tuple(exponents))
+    return sorted(chosen, key=lambda exponents: (-sum(exponents), exponents))
+
+def coefficient(rng, magnitude):
+    # Non-zero integer in [-magnitude, magnitude]
+    value = rng.randint(1, max(magnitude, 1))
+    return value if rng.random() < 0.5 else -value
+
+def evaluate(polynomial, point):
+    total = 0
+    for exponents, value in polynomial.items():
+        for x, exponent in zip(point, exponents):
+            value *= x ** exponent
+        total += value
+    return total
+
+def planted_polynomial(variables, degree, terms, magnitude, solution, rng):
+    # {exponents: coefficient} without a constant term + the constant c with P(solution) = c
+    polynomial = {exponents: coefficient(rng, magnitude)
+        for exponents in monomials(variables, degree, terms, rng)}
+    return polynomial, evaluate(polynomial, solution)
+
+def rootless_polynomial(modulus, degree, rng):
+    # [a_0, ..., a_degree] with a_degree != 0 and no root mod modulus
+    while True:
+        coefficients = [rng.randrange(modulus) for _ in range(degree)]
+        coefficients.append(rng.randrange(1, modulus))
+        if all(sum(a * x ** i for i, a in enumerate(coefficients)) % modulus
+            for x in range(modulus)):
+            return coefficients
+
+def obstructed_polynomial(variables, degree, terms, magnitude, rng):
+    # (polynomial, constant, modulus) with polynomial - constant != 0 mod modulus everywhere
+    # The obstruction needs a root-free R of degree >= 2 (degree 1 always has roots mod m)
+    modulus = rng.choice([m for m in OBSTRUCTION_PRIMES if m <= max(magnitude, 3)])
+    multiplier = max(magnitude // modulus, 1)
+    polynomial = {exponents: modulus * coefficient(rng, multiplier)
+        for exponents in monomials(variables, degree, terms, rng)}
+    residues = rootless_polynomial(modulus, max(degree, 2), rng)
+    x1 = rng.randrange(variables)
+    constant = 0
+    for power, residue in enumerate(residues):
+        # R(x1) = sum residue * x1^power - residues are shifted by a multiple of m at random,
+        # so the obstruction is not visible from the coefficients alone
+        value = residue + modulus * rng.randint(-multiplier, multiplier)
+        if power == 0:
+            constant -= value
+            continue
+        exponents = tuple(power if i == x1 else 0 for i in range(variables))
+        polynomial[exponents] = polynomial.get(exponents, 0) + value
+    return {key: value for key, value in polynomial.items() if value}, constant, modulus
+
+def to_smt2(polynomial, constant, names):
+    # (= (+ (* c x x y) ...) constant)
+    terms = []
+    for exponents, value in polynomial.items():
+        factors = [name for name, exponent in zip(names, exponents) for _ in range(exponent)]
+        terms.append(f"(* {value} {' '.join(factors)})")
+    left = terms[0] if len(terms) == 1 else f"(+ {' '.join(terms)})"
+    return f"(assert (= {left} {constant}))"
+
+def generate_file(variables, degree, index, satisfiable, options):
+    # Returns (SMT2 text, ground truth) for one instance
+    rng = random.Random(f"{options['seed']}-{variables}-{degree}-{index}")
+    names = VAR_NAMES[:variables]
+    solution = [rng.randint(-options["solution"], options["solution"]) for _ in names]
+    asserts = []
+    obstruction = None
+    for equation in range(options["equations"]):
+        if not satisfiable and equation == 0:
+            polynomial, constant, obstruction = obstructed_polynomial(
+                variables, degree, options["terms"], options["coefficient"], rng)
+        else:
+            polynomial, constant = planted_polynomial(
+                variables, degree, options["terms"], options["coefficient"], solution, rng)
+        asserts.append(to_smt2(polynomial, constant, names))
+
+    if satisfiable:
+        header = f"; synthetic SAT instance ({variables} vars, degree {degree}, planted solution)"
+        truth = ",".join(f"{name}={value}" for name, value in zip(names, solution))
+    else:
+        header = f"; synthetic UNSAT instance ({variables} vars, degree {degree}, " \
+            f"no solution mod {obstruction})"
+        truth = "UNSAT"
+    declarations = [f"(declare-const {name} Int)" for name in names]
+    return "\n".join([header, ""] + declarations + asserts) + "\n", truth
+
+def generate(output_dir, variables=(4, 6, 8, 10), degrees=(2, 3), count=10, unsat_ratio=0.5,
+    terms=8, coefficient=100, solution=20, equations=1, seed=0):
+    # Writes <output_dir>/<N>var/<M>deg/<name>.smt2 + <output_dir>/solutions.txt
+    # Returns the number of (SAT, UNSAT) files written
+    if max(variables) > len(VAR_NAMES):
+        raise ValueError(f"At most {len(VAR_NAMES)} variables are supported")
+    options = {"terms": terms, "coefficient": coefficient, "solution": solution,
+        "equations": equations, "seed": seed}
+    output_dir = Path(output_dir)
+    lines = []
+    sat_count = unsat_count = 0
+    for n in variables:
+        for degree in degrees:
+            directory = output_dir / f"{n}var" / f"{degree}deg"
+            directory.mkdir(parents=True, exist_ok=True)
+            unsat_files = round(count * unsat_ratio)
+            for index in range(count):
+                satisfiable = index >= unsat_files
+                text, truth = generate_file(n, degree, index, satisfiable, options)
+                name = f"syn{n}v{degree}d_{index:03d}"
+                (directory / f"{name}.smt2").write_text(text)
+                lines.append(f"{name}. {truth}")
+                sat_count += satisfiable
+                unsat_count += not satisfiable
+    lines.append(f"Total: {sat_count} SAT, {unsat_count} UNSAT, 0 UNKNOWN")
+    (output_dir / "solutions.txt").write_text("\n".join(lines) + "\n")
+    return sat_count, unsat_count
+
+def read_solutions(path):
+    # solutions.txt -> {file name: "UNSAT" or [{constant: value}, ...]}
+    # Alternative solutions are separated by OR, e.g. "truck. x=3,y=-3 OR x=-2,y=-4"
+    solutions = {}
+    for line in Path(path).read_text().splitlines():
+        name, _, truth = line.partition(". ")
+        if not truth or line.startswith("Total:"):
+            continue
+        if truth.startswith(("UNSAT", "UNKNOWN")):
+            solutions[name] = truth
+        else:
+            solutions[name] = [
+                {pair.split("=")[0].strip(): int(pair.split("=")[1]) for pair in option.split(",")}
+                for option in truth.split(" OR ")]
+    return solutions
+
+# CLI entry point
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic QF_NIA benchmarks with planted solutions.")
+    parser.add_argument("--output_dir", default=str(ROOT / "results" / "synthetic"),
+        help="Root of the generated <N>var/<M>deg tree (use it as --tests_dir).")
+    parser.add_argument("--vars", type=int, nargs="+", default=[4, 6, 8, 10],
+        help="Numbers of constants.")
+    parser.add_argument("--degrees", type=int, nargs="+", default=[2, 3],
+        help="Total degrees of the polynomials.")
+    parser.add_argument("--count", type=int, default=10,
+        help="Files per (variables, degree) pair.")
+    parser.add_argument("--unsat_ratio", type=float, default=0.5,
+        help="Fraction of UNSAT files (modular obstructions) per (variables, degree) pair.")
+    parser.add_argument("--terms", type=int, default=8,
+        help="Non-constant monomials per polynomial.")
+    parser.add_argument("--coefficient", type=int, default=100,
+        help="Largest coefficient magnitude.")
+    parser.add_argument("--solution", type=int, default=20,
+        help="Largest magnitude of the planted solution values.")
+    parser.add_argument("--equations", type=int, default=1,
+        help="Polynomial equations (asserts) per file.")
+    parser.add_argument("--seed", type=int, default=0,
+        help="Seed - the same options and seed always give the same files.")
+    args = parser.parse_args()
+
+    sat_count, unsat_count = generate(args.output_dir, args.vars, args.degrees, args.count,
+        args.unsat_ratio, args.terms, args.coefficient, args.solution, args.equations, args.seed)
+    print(f"Generated {sat_count} SAT and {unsat_count} UNSAT files in {args.output_dir}")
+
+if __name__ == "__main__":
+    main()
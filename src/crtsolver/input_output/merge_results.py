@@ -0,0 +1,18 @@
+import argparse
+from crtsolver.input_output import writer
+
+# CLI entry point
+def main():
+    parser = argparse.ArgumentParser(
+        description="Merge per-shard results files (from --shard i/n runs) into one.")
+    parser.add_argument("sources", nargs="+",
+        help="Results files of every shard (.csv or .jsonl).")
+    parser.add_argument("--output", required=True,
+        help="Merged results file - the format follows its suffix (.csv or .jsonl).")
+    args = parser.parse_args()
+
+    writer.merge(args.sources, args.output)
+    print(f"Merged results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,18 @@
 import cvc5
 from cvc5 import Kind
 from pathlib import Path
+import io
 import re
+import sys
 
-# Case 1: match opening bracket
-# Case 2: match closing bracket
-# Case 3: match any sequence not containing whitespace or brackets
-PATTERN = r"\(|\)|[^\s()]+"
+# Case 1: skip whitespace and comments
+# Case 2: match opening or closing bracket
+# Case 3: match quoted symbol or string literal (may span lines)
+# Case 4: match any sequence not containing whitespace, brackets, quotes or comments
+PATTERN = re.compile(r'\s+|;[^\n]*|\(|\)|\|[^|]*\||"(?:[^"]|"")*"|[^\s()|";]+')
+# Lines without quotes only need brackets and plain tokens
+PLAIN_PATTERN = re.compile(r"\(|\)|[^\s()]+")
+NUMERAL = re.compile(r"\d+")
 
 def preprocess(input, API, terms):
     ast = tokenize_and_parse(input)
@@ -14,56 +20,202 @@ def preprocess(input, API, terms):
     return ast
 
 def tokenize_and_parse(input):
-    code = input.read()
-    tokens = tokenize(code)
-    return parse(tokens)
+    # Streams the file - the source text is never held in memory as a whole
+    return parse(lex(input))
 
 def tokenize(code):
-    token_stream = re.findall(PATTERN, code)
+    token_stream = list(lex(io.StringIO(code)))
     #print(token_stream)
     return token_stream
 
+def lex(input):
+    # Reads one line at a time and yields interned tokens - repeated symbols and numerals
+    # share one string object
+    intern = sys.intern
+    carry = "" # unterminated quoted symbol or string, continued on the next line
+    for line in input:
+        if not carry and "|" not in line and '"' not in line:
+            for token in PLAIN_PATTERN.findall(line.split(";", 1)[0]):
+                yield intern(token)
+            continue
+        text = carry + line
+        carry = ""
+        position = 0
+        while position < len(text):
+            match = PATTERN.match(text, position)
+            if match is None:
+                carry = text[position:]
+                break
+            token = match.group()
+            position = match.end()
+            if not (token[0].isspace() or token[0] == ";"):
+                yield intern(token)
+
+# NOTE: The AST stays nested lists of interned strings - every engine stage (term DAG,
+# NOTE: polynomials, evaluator, cvc5 back ends) reads this format
+# NOTE: let and define-fun are expanded while parsing: a bound term is inserted by reference,
+# NOTE: so every use shares one subtree, which the term DAG builds once
+# NOTE: (- N) is folded into the numeral -N and (declare-fun x () Int) into (declare-const x Int)
 def parse(tokens):
     # Stack-based iterative approach - O(n) time + space complexity
     tree = [[]] # contains wrapper list
+    roles = [None] # "let", "bindings", "define", "params", "binder" or None for each open list
+    scopes = [] # let bindings and define-fun parameters - innermost last
+    macros = {} # define-fun name -> (parameter names, body)
 
     for token in tokens:
         if token == "(":
             # start new subtree
+            role = roles[-1]
+            if role is not None:
+                if role == "let" and len(tree[-1]) == 1:
+                    role = "bindings"
+                elif role == "define" and len(tree[-1]) == 2:
+                    role = "params"
+                elif role in ("bindings", "params"):
+                    role = "binder" # (name term) or (name sort)
+                else:
+                    role = None
             tree.append([])
+            roles.append(role)
         elif token == ")":
             # append to previous subtree
             subTree = tree.pop()
-            tree[-1].append(subTree)
+            role = roles.pop()
+            if role is None:
+                tree[-1].append(simplify(subTree, macros))
+            elif role == "binder":
+                tree[-1].append(subTree)
+            elif role == "bindings":
+                # Parallel let - the bound terms were resolved in the enclosing scope
+                scopes.append({binding[0]: binding[1] for binding in subTree})
+                tree[-1].append(subTree)
+            elif role == "params":
+                # Parameters shadow outer names - substituted when the function is applied
+                scopes.append({param[0]: param[0] for param in subTree})
+                tree[-1].append(subTree)
+            elif role == "let":
+                scopes.pop()
+                tree[-1].append(subTree[-1]) # (let (bindings) body) -> body
+            else:
+                # define-fun is expanded where it is used - not kept in the AST
+                scopes.pop()
+                macros[subTree[1]] = ([param[0] for param in subTree[2]], subTree[-1])
         else:
             # append to current subtree
-            tree[-1].append(token)
+            current = tree[-1]
+            if not current:
+                if token == "let":
+                    roles[-1] = "let"
+                elif token == "define-fun":
+                    roles[-1] = "define"
+            elif scopes or macros:
+                token = resolve(token, scopes, macros) # never a binder - those come first
+            current.append(token)
 
     ast = tree[0] # remove wrapper list
     #print(ast)
     return ast
 
-def get_sorted_files(root):
-    def extract_dir_no(dir_name):
-        match = re.match(r"(\d+)", dir_name)
-        number = (match.group(1)) # first group of re.match()
-        return int(number) # convert to int before returning
+def resolve(token, scopes, macros):
+    # Let-bound name, define-fun parameter or constant defined with define-fun
+    for scope in reversed(scopes):
+        if token in scope:
+            return scope[token]
+    if token in macros and not macros[token][0]:
+        return macros[token][1]
+    return token
+
+def simplify(subTree, macros):
+    # Negative literals, declare-fun constants and define-fun applications
+    if not subTree:
+        return subTree
+    head = subTree[0]
+    if head == "-":
+        if len(subTree) == 2 and isinstance(subTree[1], str) and NUMERAL.fullmatch(subTree[1]):
+            return sys.intern("-" + subTree[1]) # negative literal
+    elif head == "declare-fun":
+        if len(subTree) == 4 and subTree[2] == []:
+            return ["declare-const", subTree[1], subTree[3]]
+    elif macros and isinstance(head, str) and head in macros and macros[head][0]:
+        params, body = macros[head]
+        return substitute(body, dict(zip(params, subTree[1:])))
+    return subTree
+
+def substitute(tree, values):
+    # Replaces parameters by arguments - iterative, each shared subtree is rebuilt once
+    if isinstance(tree, str):
+        return values.get(tree, tree)
+    built = {} # id(node) -> substituted node
+    stack = [(tree, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in built:
+            continue
+        if expanded:
+            built[id(node)] = [values.get(operand, operand) if isinstance(operand, str)
+                else built[id(operand)] for operand in node]
+        else:
+            # Visit node again after its operands
+            stack.append((node, True))
+            for operand in node:
+                if isinstance(operand, list) and id(operand) not in built:
+                    stack.append((operand, False))
+    return built[id(tree)]
+
+def get_sorted_files(root, completed=()):
+    # All benchmark files under root, in iter_files order
+    return list(iter_files(root, completed))
+
+def iter_files(source, completed=(), shard=(0, 1)):
+    # Lazily yields SMT2 files from a directory tree, a manifest file (one path per line,
+    # relative to the manifest) or stdin ("-" - one path per line)
+    # shard = (i, n) keeps every n-th file starting at the i-th, so n nodes split one sweep
+    # completed = (Variables, Degree, FileName) of files that already have a result - skipped
+    index, count = shard
+    if str(source) == "-":
+        files = read_manifest(sys.stdin, Path.cwd())
+    elif Path(source).is_file():
+        files = read_manifest(open(source), Path(source).resolve().parent)
+    else:
+        files = walk_tree(Path(source))
 
-    root = Path(root)
-    sorted_files = []
+    # Shards are assigned before skipping completed files, so resuming keeps the same split
+    for position, file in enumerate(files):
+        if position % count == index \
+            and (file.parent.parent.name, file.parent.name, file.stem) not in completed:
+            yield file
 
-    var_dirs = [dir for dir in root.iterdir() if dir.is_dir()]
-    var_dirs = sorted(var_dirs, key=lambda dir: extract_dir_no(dir.name))
+def read_manifest(lines, base):
+    with lines:
+        for line in lines:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield base / line
 
-    for var_dir in var_dirs:
-        deg_dirs = [dir for dir in var_dir.iterdir() if dir.is_dir()]
-        deg_dirs = sorted(deg_dirs, key=lambda dir: extract_dir_no(dir.name))
+def walk_tree(root):
+    # Depth-first, in natural order (2var before 10var) - matches the <N>var/<M>deg layout
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        entries = sorted(directory.iterdir(), key=lambda entry: natural_key(entry.name))
+        for entry in entries:
+            if entry.is_file() and entry.suffix == ".smt2":
+                yield entry
+        subdirectories = [entry for entry in entries if entry.is_dir()
+            and not entry.name.startswith((".", "__"))] # e.g. __pycache__ created by pytest
+        stack.extend(reversed(subdirectories))
 
-        for deg_dir in deg_dirs:
-            files = deg_dir.glob("*.smt2")
-            sorted_files.extend(files) # append each item from the iterable separately
+def natural_key(name):
+    return [(0, int(part), "") if part.isdigit() else (1, 0, part)
+        for part in re.split(r"(\d+)", name)]
 
-    return sorted_files
+def parse_shard(text):
+    # "i/n" -> (i, n), 0 <= i < n
+    index, count = (int(part) for part in text.split("/"))
+    if not 0 <= index < count:
+        raise ValueError(f"Invalid shard {text} - expected i/n with 0 <= i < n")
+    return (index, count)
 
 def create_constants(ast, API, terms):
     sort = API.tm.getIntegerSort()
@@ -1,50 +1,175 @@
+import ast
 import csv
+import json
+import os
 import time
 from pathlib import Path
+from crtsolver.input_output import reader
 
+FORMATS = ("csv", "jsonl")
+HEADERS = ["TestInput", "FileName", "Variables", "Degree", "Runtime (s)", "Result"]
+UNKNOWN_RESULTS = ("UNKNOWN (TIMEOUT)", "UNKNOWN (ERROR)", "UNKNOWN (INCOMPLETE)")
+
+# NOTE: Results are streamed - every row is appended, flushed and fsynced as soon as its file
+# NOTE: finishes, so a crash or OOM kill only loses the file that was being solved
+# NOTE: The totals row is computed from the streamed file in write()
+# NOTE: With resume=True, rows from an earlier (possibly interrupted) run are kept and their
+# NOTE: files are reported by completed(), so reader.iter_files can skip them
 class Writer:
-    def __init__(self, file_path, solver_name):
-        self.file_name = file_path / f"results_{solver_name}.csv"
-        self.results = []
+    def __init__(self, file_path, solver_name, extra_headers=(), output_format="csv",
+        resume=False):
+        if output_format not in FORMATS:
+            raise ValueError(f"Unknown output format: {output_format}")
+        self.output_format = output_format
+        self.file_name = Path(file_path) / f"results_{solver_name}.{output_format}"
+        self.extra_headers = list(extra_headers) # solver-specific columns after Result
+        self.resume = resume
+        self.file = None # opened on the first result, so creating a Writer has no side effects
         self.file_count = 0
         self.total_time = 0
 
-    def write(self):
-        # self.results = [[1, "Cat", 0.538, [["UNSAT"]]]]
+    def set_shard(self, shard):
+        # results_<solver>.csv -> results_<solver>.shard-<i>-of-<n>.csv
+        index, count = shard
+        self.file_name = self.file_name.with_name(
+            f"{self.file_name.stem}.shard-{index}-of-{count}{self.file_name.suffix}")
+
+    def completed(self):
+        # (Variables, Degree, FileName) of every file already in the output - empty unless resuming
+        if not self.resume:
+            return set()
+        return {(row[2], row[3], row[1]) for row in self.read_rows()}
+
+    def read_rows(self):
+        # Result rows in the streamed file, without the header and totals rows
+        if not self.file_name.exists():
+            return []
+        rows = []
+        with open(self.file_name, newline="") as file:
+            if self.output_format == "csv":
+                for row in csv.reader(file):
+                    if row and row[0] != HEADERS[0] and not row[0].startswith("Totals"):
+                        try:
+                            row[4] = float(row[4])
+                            row[5] = ast.literal_eval(row[5])
+                        except (IndexError, ValueError, SyntaxError):
+                            continue # a row cut off by a crash - the file is solved again
+                        rows.append(row)
+            else:
+                for line in file:
+                    # A line cut off by a crash has no newline - the file is solved again
+                    if line.endswith("\n"):
+                        record = json.loads(line)
+                        if "Totals" not in record:
+                            rows.append([record[header]
+                                for header in HEADERS + self.extra_headers])
+        return rows
+
+    def open(self):
+        # Start a new output file, or keep the rows of an earlier run when resuming
+        rows = self.read_rows() if self.resume else []
+        self.file_name.parent.mkdir(parents=True, exist_ok=True)
+        temp_name = self.file_name.with_name(self.file_name.name + ".tmp")
+        with open(temp_name, mode="w", newline="") as file:
+            if self.output_format == "csv":
+                writer = csv.writer(file)
+                writer.writerow(HEADERS + self.extra_headers)
+                writer.writerows(rows)
+            else:
+                for row in rows:
+                    file.write(self.to_json(row))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_name, self.file_name) # the old totals row is dropped atomically
+
+        self.file_count = len(rows)
+        self.total_time = sum(row[4] for row in rows)
+        # newline="" guarantees OS-independent behaviour
+        self.file = open(self.file_name, mode="a", newline="")
+
+    def to_json(self, row):
+        return json.dumps(dict(zip(HEADERS + self.extra_headers, row))) + "\n"
 
-        # Build totals
-        unsat_count = sum(1 for item in self.results if item[5][0][0] == "UNSAT")
-        unknown_count = sum(1 for item in self.results if item[5][0][0] == "UNKNOWN (TIMEOUT)" or 
-            item[5][0][0] == "UNKNOWN (ERROR)")
-        sat_count = len(self.results) - unsat_count - unknown_count
+    def append(self, row):
+        if self.output_format == "csv":
+            csv.writer(self.file).writerow(row)
+        else:
+            self.file.write(self.to_json(row))
+        self.file.flush()
+        os.fsync(self.file.fileno())
 
-        self.file_count = f"Totals: {self.file_count}"
+    def write(self):
+        # Build totals from the streamed file (an empty model is SAT with no declared constants)
+        if self.file is None:
+            self.open()
+        rows = self.read_rows()
+        unsat_count = sum(1 for item in rows if item[5] and item[5][0][0] == "UNSAT")
+        unknown_count = sum(1 for item in rows if item[5] and item[5][0][0] in UNKNOWN_RESULTS)
+        sat_count = len(rows) - unsat_count - unknown_count
+
+        file_count = f"Totals: {len(rows)}"
         total_na = "n/a"
-        self.total_time = f"{self.total_time}s"
+        total_time = f"{sum(row[4] for row in rows)}s"
         total_results = f"{sat_count} SAT, {unsat_count} UNSAT, {unknown_count} UNKNOWN"
 
-        self.results.append([self.file_count, total_na, self.total_time, total_results])
+        if self.output_format == "csv":
+            self.append([file_count, total_na, total_time, total_results])
+        else:
+            self.file.write(json.dumps({"Totals": file_count, "Runtime (s)": total_time,
+                "Result": total_results}) + "\n")
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        self.file.close()
+        self.file = None
+
+    def store_result(self, file, start_time, sat_model, end_time=None, extra=()):
+        if self.file is None:
+            self.open()
 
-        # newline="" guarantees OS-independent behaviour
-        with open(self.file_name, mode="w", newline="") as file:
-            writer = csv.writer(file)
-            # Write header row
-            writer.writerow(["TestInput", "FileName", "Variables", "Degree", "Runtime (s)", "Result"])
-            # Write remaining rows (including totals row)
-            writer.writerows(self.results)
-
-    def store_result(self, file, start_time, sat_model):
         # Get information from file object
         file_name = file.stem
         no_of_vars = file.parent.parent.name
         no_of_degrees = file.parent.name
 
         # Store information and result for file
-        end_time = time.time()
+        # end_time is supplied when the file was solved in a worker process
+        if end_time is None:
+            end_time = time.time()
         time_taken = end_time - start_time
         self.file_count += 1
 
-        self.results.append(
-            [self.file_count, file_name, no_of_vars, no_of_degrees, time_taken, sat_model])
-        
+        self.append(
+            [self.file_count, file_name, no_of_vars, no_of_degrees, time_taken, sat_model, *extra])
+
         self.total_time += time_taken
+
+def merge(sources, output):
+    # Combines per-shard results files into one, in natural file order, with a fresh totals row
+    # The output format follows the suffix of output (.csv or .jsonl)
+    output = Path(output)
+    rows = []
+    extra_headers = None
+    for source in sources:
+        source = Path(source)
+        shard = Writer(source.parent, "", read_extra_headers(source), source.suffix[1:])
+        shard.file_name = source
+        if extra_headers is None:
+            extra_headers = shard.extra_headers
+        rows.extend(shard.read_rows())
+
+    merged = Writer(output.parent, "", extra_headers or (), output_format=output.suffix[1:])
+    merged.file_name = output
+    merged.open()
+    rows.sort(key=lambda row: [reader.natural_key(str(row[column])) for column in (2, 3, 1)])
+    for number, row in enumerate(rows, start=1):
+        merged.append([number] + row[1:])
+    merged.write()
+
+def read_extra_headers(source):
+    # Solver-specific columns after Result, from the header row / first record
+    with open(source, newline="") as file:
+        if source.suffix == ".csv":
+            return next(csv.reader(file), HEADERS)[len(HEADERS):]
+        for line in file:
+            return [key for key in json.loads(line) if key not in HEADERS]
+    return []
@@ -0,0 +1,380 @@
+import argparse
+import collections
+import contextlib
+import dataclasses
+import itertools
+import json
+import multiprocessing
+import os
+import signal
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from crtsolver.solvers import crt_solver, cvc5_solver, z3_solver
+from crtsolver.crt_components.helpers import dto
+
+# Engines a job can ask for - same names as the portfolio's Winner column
+ENGINES = ("CRT-BV", "CRT-INT", "cvc5", "Z3")
+GRACE = 2.0 # s after a job's timeout before its worker is killed
+THROUGHPUT_WINDOW = 60.0 # s of finished jobs counted by the recent throughput
+
+def create_engine(name, time_limit):
+    if name == "CRT-BV":
+        return crt_solver.CRTSolver(time_limit, use_bitvectors=True, verbose=False)
+    if name == "CRT-INT":
+        return crt_solver.CRTSolver(time_limit, use_bitvectors=False, verbose=False)
+    if name == "cvc5":
+        return cvc5_solver.cvc5Solver(time_limit)
+    return z3_solver.Z3Solver(time_limit)
+
+def solve_job(engine, source, timeout):
+    # timeout (ms) bounds the whole job - CRTSolver spreads it over its checks,
+    # cvc5 and Z3 run a single check
+    if isinstance(engine, crt_solver.CRTSolver):
+        engine.file_timeout = timeout
+    else:
+        engine.time_limit = str(timeout)
+    try:
+        return engine.solve(source)
+    except Exception:
+        return dto.Result(status="unknown", reason="error")
+
+def run_worker(connection, time_limit):
+    # Worker process: keeps one warm instance of every engine (imports done, a context pooled)
+    # and solves (engine, SMT2 text, timeout) jobs until the connection is closed
+    signal.signal(signal.SIGINT, signal.SIG_IGN) # Ctrl+C stops the server, which stops workers
+    engines = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name in ENGINES:
+            engines[name] = create_engine(name, time_limit)
+            engines[name].contexts.release(engines[name].contexts.acquire())
+        connection.send("ready")
+        while True:
+            try:
+                task = connection.recv()
+            except EOFError:
+                return
+            if task is None:
+                return
+            name, source, timeout = task
+            connection.send(dataclasses.asdict(solve_job(engines[name], source, timeout)))
+
+# NOTE: Each worker is a separate process, so a job can be cancelled (or stopped after its
+# NOTE: timeout + GRACE, if the engine does not give up on its own) by killing the process -
+# NOTE: the worker is then restarted. Workers are spawned, not forked, as the server is threaded
+class Worker:
+    def __init__(self, time_limit):
+        self.time_limit = time_limit
+        self.restarts = 0
+        self.start()
+
+    def start(self):
+        context = multiprocessing.get_context("spawn")
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=run_worker, args=(child, self.time_limit),
+            daemon=True)
+        self.process.start()
+        child.close()
+        self.warm = False # set once the worker has built its engines
+
+    def wait_until_warm(self):
+        # Startup (imports + engines) must not count towards the first job's timeout
+        if not self.warm:
+            self.connection.recv()
+            self.warm = True
+
+    def restart(self):
+        self.stop()
+        self.restarts += 1
+        self.start()
+
+    def stop(self):
+        with contextlib.suppress(OSError):
+            self.connection.close()
+        self.process.terminate()
+        self.process.join()
+
+@dataclasses.dataclass
+class Job:
+    id: str
+    engine: str
+    source: str # SMT2 text
+    timeout: int # ms
+    status: str = "queued" # "queued", "running", "cancelling", "done" or "cancelled"
+    result: dict = None # dto.Result fields, once done
+    submitted: float = dataclasses.field(default_factory=time.time)
+    started: float = None
+    finished: float = None
+
+    def to_json(self):
+        # state = where the job is, status = sat/unsat/unknown once it is done
+        response = {"id": self.id, "engine": self.engine, "state": self.status}
+        if self.result is not None:
+            response.update(self.result)
+        response["queue_time"] = ((self.started or self.finished or time.time())
+            - self.submitted)
+        if self.started is not None:
+            response["run_time"] = (self.finished or time.time()) - self.started
+        return response
+
+# NOTE: Jobs wait in a FIFO queue and are dispatched by one thread per worker process
+# NOTE: Finished jobs are kept (up to history) so clients can poll for their results
+class Solve_Server:
+    def __init__(self, workers=1, time_limit="30000", timeout=30000, history=10000):
+        self.timeout = timeout # ms - default per-job timeout
+        self.history = history # largest number of finished jobs kept
+        self.condition = threading.Condition()
+        self.queue = collections.deque()
+        self.jobs = collections.OrderedDict() # id -> Job, in submission order
+        self.ids = itertools.count(1)
+        self.closing = False
+        self.start_time = time.time()
+        self.counts = collections.Counter() # submitted, completed, cancelled, killed
+        self.finished = collections.deque() # finish times within THROUGHPUT_WINDOW
+        self.busy_time = 0.0 # s spent running finished jobs
+        self.workers = [Worker(time_limit) for _ in range(workers)]
+        self.dispatchers = [threading.Thread(target=self.dispatch, args=(worker,), daemon=True)
+            for worker in self.workers]
+        for dispatcher in self.dispatchers:
+            dispatcher.start()
+
+    def submit(self, source, engine="CRT-BV", timeout=None):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine} (expected one of {', '.join(ENGINES)})")
+        with self.condition:
+            job = Job(str(next(self.ids)), engine, source, timeout or self.timeout)
+            self.jobs[job.id] = job
+            self.queue.append(job)
+            self.counts["submitted"] += 1
+            self.condition.notify_all()
+            return job
+
+    def get(self, job_id):
+        with self.condition:
+            return self.jobs.get(job_id)
+
+    def wait(self, job, timeout=None):
+        with self.condition:
+            self.condition.wait_for(lambda: job.status in ("done", "cancelled"), timeout)
+            return job
+
+    def cancel(self, job_id):
+        # A queued job is dropped, a running one stops its worker (see dispatch)
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is not None and job.status == "queued":
+                self.queue.remove(job)
+                self.finish(job, "cancelled")
+            elif job is not None and job.status == "running":
+                job.status = "cancelling" # the dispatcher finishes it once the worker is stopped
+            return job
+
+    def dispatch(self, worker):
+        while True:
+            try:
+                worker.wait_until_warm()
+            except (EOFError, OSError):
+                if self.closing:
+                    return
+                raise # the worker cannot start (e.g. a solver fails to import)
+            with self.condition:
+                self.condition.wait_for(lambda: self.queue or self.closing)
+                if self.closing:
+                    return
+                job = self.queue.popleft()
+                job.status = "running"
+                job.started = time.time()
+            kill_time = job.started + job.timeout / 1000 + GRACE
+            result = None
+            try:
+                worker.connection.send((job.engine, job.source, job.timeout))
+                while result is None and job.status == "running" and time.time() < kill_time:
+                    if worker.connection.poll(0.05):
+                        result = worker.connection.recv()
+            except (EOFError, OSError):
+                pass # the worker died - it is restarted below
+            if result is None:
+                worker.restart()
+            with self.condition:
+                if job.status == "cancelling":
+                    self.finish(job, "cancelled")
+                else:
+                    if result is None:
+                        self.counts["killed"] += 1
+                        reason = "timeout" if time.time() >= kill_time else "error"
+                        result = dataclasses.asdict(dto.Result(status="unknown", reason=reason))
+                    job.result = result
+                    self.finish(job, "done")
+
+    def finish(self, job, status):
+        # Called with the condition held
+        job.status = status
+        job.finished = time.time()
+        job.source = None # the payload is not needed any more
+        self.counts["completed" if status == "done" else "cancelled"] += 1
+        if job.started is not None:
+            self.busy_time += job.finished - job.started
+        self.finished.append(job.finished)
+        while len(self.jobs) > self.history:
+            oldest = next(iter(self.jobs.values()))
+            if oldest.status not in ("done", "cancelled"):
+                break
+            del self.jobs[oldest.id]
+        self.condition.notify_all()
+
+    def metrics(self):
+        with self.condition:
+            now = time.time()
+            while self.finished and self.finished[0] < now - THROUGHPUT_WINDOW:
+                self.finished.popleft()
+            uptime = now - self.start_time
+            completed = self.counts["completed"]
+            return {
+                "queue_depth": len(self.queue),
+                "running": sum(1 for job in self.jobs.values()
+                    if job.status in ("running", "cancelling")),
+                "workers": len(self.workers),
+                "worker_restarts": sum(worker.restarts for worker in self.workers),
+                "submitted": self.counts["submitted"],
+                "completed": completed,
+                "cancelled": self.counts["cancelled"],
+                "killed": self.counts["killed"],
+                "uptime": uptime,
+                "throughput": completed / uptime if uptime else 0.0, # jobs/s since start
+                "recent_throughput": len(self.finished) / THROUGHPUT_WINDOW, # jobs/s
+                "mean_run_time": self.busy_time / completed if completed else 0.0,
+            }
+
+    def close(self):
+        with self.condition:
+            self.closing = True
+            self.condition.notify_all()
+        for worker in self.workers:
+            worker.stop()
+
+# NOTE: JSON over HTTP:
+# NOTE:   POST /jobs         queue a job -> {"id", "state", ...}
+# NOTE:   POST /solve        queue a job and wait for its result
+# NOTE:   GET /jobs/<id>     job status (and result once done), ?wait=1 waits for it
+# NOTE:   DELETE /jobs/<id>  cancel a queued or running job
+# NOTE:   GET /metrics       queue depth, throughput and job counts
+# NOTE: The body is either SMT2 text (engine and timeout as query parameters) or a JSON object
+# NOTE: {"input": SMT2 text, "engine": ..., "timeout": ms}
+class Request_Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path, query = self.split()
+        if path == "/metrics":
+            return self.reply(200, self.server.solve_server.metrics())
+        job = self.find_job(path)
+        if job is not None:
+            if query.get("wait"):
+                self.server.solve_server.wait(job)
+            self.reply(200, job.to_json())
+
+    def do_POST(self):
+        path, query = self.split()
+        if path not in ("/jobs", "/solve"):
+            return self.reply(404, {"error": f"Unknown path: {path}"})
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+        try:
+            options = dict(query)
+            if body.lstrip().startswith("{"):
+                options.update(json.loads(body))
+            else:
+                options["input"] = body
+            job = self.server.solve_server.submit(options.get("input", ""),
+                options.get("engine", "CRT-BV"), int(options.get("timeout", 0)) or None)
+        except (TypeError, ValueError) as e: # includes json.JSONDecodeError
+            return self.reply(400, {"error": str(e)})
+        if path == "/solve":
+            self.server.solve_server.wait(job)
+            return self.reply(200, job.to_json())
+        self.reply(202, job.to_json())
+
+    def do_DELETE(self):
+        path, _ = self.split()
+        if self.find_job(path) is not None:
+            self.reply(200, self.server.solve_server.cancel(path[len("/jobs/"):]).to_json())
+
+    def split(self):
+        url = urlsplit(self.path)
+        return (url.path.rstrip("/"), {key: values[-1] for key, values in
+            parse_qs(url.query).items()})
+
+    def find_job(self, path):
+        job = None
+        if path.startswith("/jobs/"):
+            job = self.server.solve_server.get(path[len("/jobs/"):])
+        if job is None:
+            self.reply(404, {"error": f"Unknown job or path: {path}"})
+        return job
+
+    def reply(self, code, response):
+        body = json.dumps(response).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def address_string(self):
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else "unix"
+
+class Unix_HTTP_Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def create_http_server(solve_server, host="127.0.0.1", port=8765, socket=None, verbose=False):
+    # localhost TCP, or a Unix socket if a path is given
+    if socket is not None:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(socket) # left behind by an earlier server
+        http_server = Unix_HTTP_Server(socket, Request_Handler)
+    else:
+        http_server = ThreadingHTTPServer((host, port), Request_Handler)
+    http_server.solve_server = solve_server
+    http_server.verbose = verbose
+    return http_server
+
+# CLI entry point
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve CRTSolver, cvc5 and Z3 from a pool of warm worker processes.")
+    parser.add_argument("--host", default="127.0.0.1",
+        help="Address to listen on (keep it local - there is no authentication).")
+    parser.add_argument("--port", type=int, default=8765,
+        help="Port to listen on.")
+    parser.add_argument("--socket", default=None,
+        help="Listen on this Unix socket path instead of a TCP port.")
+    parser.add_argument("--workers", type=int, default=1,
+        help="Number of worker processes (jobs solved in parallel).")
+    parser.add_argument("--time_limit", type=int, default=30000,
+        help="Time limit for each check-sat of the CRT engines (in ms).")
+    parser.add_argument("--timeout", type=int, default=30000,
+        help="Default time limit for a whole job (in ms), unless the job sets its own.")
+    parser.add_argument("--history", type=int, default=10000,
+        help="Largest number of finished jobs kept for polling.")
+    parser.add_argument("--verbose", action="store_true",
+        help="Log every request.")
+    args = parser.parse_args()
+
+    solve_server = Solve_Server(args.workers, str(args.time_limit), args.timeout, args.history)
+    http_server = create_http_server(solve_server, args.host, args.port, args.socket,
+        args.verbose)
+    print(f"Serving on {args.socket or f'http://{args.host}:{args.port}'}")
+    try:
+        http_server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        http_server.server_close()
+        solve_server.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import collections
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Solver instance owned by the current worker process
+# Each worker receives its own copy, and keeps its own pool of reused cvc5/Z3 contexts
+worker_solver = None
+
+def init_worker(solver):
+    global worker_solver
+    worker_solver = solver
+
+def get_progress(solver):
+    # Solver-specific extra result columns (e.g. how far the CRT loop got)
+    if hasattr(solver, "get_progress"):
+        return solver.get_progress()
+    return []
+
+def solve_in_worker(file):
+    sat_model = worker_solver.solve_file(file)
+    return (file, worker_solver.start_time, time.time(), sat_model, get_progress(worker_solver))
+
+def solve_files(solver, files, jobs=1):
+    # Yields (file, start_time, end_time, sat_model, progress) for every file, in the order given
+    # Files found in the solver's result cache (if any) are not solved again
+    cache = getattr(solver, "cache", None)
+    if cache is None:
+        yield from solve_uncached(solver, files, jobs)
+        return
+
+    config = solver.get_cache_config()
+    pending = collections.deque() # (file, cached result or None), in input order, not yet yielded
+
+    def lookup():
+        # Files are looked up one at a time as they are streamed - only misses reach the solver
+        for file in files:
+            hit = cache.get(file, config)
+            pending.append((file, hit))
+            if hit is None:
+                yield file
+
+    for result in solve_uncached(solver, lookup(), jobs):
+        # Results come back in input order, so every hit queued before this file goes first
+        file, hit = pending.popleft()
+        while hit is not None:
+            yield cached_result(file, hit)
+            file, hit = pending.popleft()
+        cache.put(file, config, result[3], result[2] - result[1], result[4])
+        yield result
+    for file, hit in pending: # hits after the last solved file
+        yield cached_result(file, hit)
+
+def cached_result(file, hit):
+    # Report the runtime of the run that produced the cached result
+    sat_model, runtime, progress = hit
+    start_time = time.time()
+    return (file, start_time, start_time + runtime, sat_model, progress)
+
+def solve_uncached(solver, files, jobs=1):
+    if jobs <= 1:
+        for file in files:
+            sat_model = solver.solve_file(file)
+            yield (file, solver.start_time, time.time(), sat_model, get_progress(solver))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs,
+            initializer=init_worker, initargs=(solver,)) as executor:
+            # map returns results in submission order, so the CSV order is deterministic
+            yield from executor.map(solve_in_worker, files)
@@ -0,0 +1,46 @@
+import os
+
+# NOTE: Solver contexts (cvc5 TermManager + solvers, Z3 solvers) are expensive to build and
+# NOTE: configure, so each process keeps idle contexts and resets them for the next file
+# NOTE: instead of building new ones. Terms created for earlier files stay in a reused context,
+# NOTE: so once the process' resident memory passes recycle_rss the idle contexts are dropped
+# NOTE: and the next file gets a fresh one
+class Context_Pool:
+    def __init__(self, create, reset, recycle_rss=None, size=1):
+        self.create = create # () -> new configured context
+        self.reset = reset # context -> None, clears it for the next file
+        self.recycle_rss = recycle_rss # MB - idle contexts are dropped above it (None = never)
+        self.size = size # largest number of idle contexts kept
+        self.idle = []
+        self.created = 0 # contexts built
+        self.recycled = 0 # contexts dropped because of recycle_rss
+
+    def acquire(self):
+        if self.idle and self.recycle_rss is not None and current_rss() > self.recycle_rss:
+            self.recycled += len(self.idle)
+            self.idle.clear()
+        if self.idle:
+            context = self.idle.pop()
+            self.reset(context)
+            return context
+        self.created += 1
+        return self.create()
+
+    def release(self, context):
+        if len(self.idle) < self.size:
+            self.idle.append(context)
+
+    def __getstate__(self):
+        # Contexts cannot be pickled - every worker process builds its own
+        state = self.__dict__.copy()
+        state["idle"] = []
+        return state
+
+def current_rss():
+    # Resident set size of this process in MB (peak resident size where /proc is missing)
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
@@ -1,16 +1,24 @@
 import cvc5
 from cvc5 import Kind
+import io
 import time
 import argparse
 import builtins
+import json
 from pathlib import Path
-from crtsolver.input_output import reader, writer
-from crtsolver.crt_components.engine import modulo, modulo_bv, candidate
-from crtsolver.crt_components.helpers import dto, prime_generator, utility
+from crtsolver.input_output import cache, reader, writer
+from crtsolver.solvers import batch, context_pool
+from crtsolver.crt_components.engine import modulo, modulo_bv, candidate, modulo_pool, residue_enumerator, term_dag
+from crtsolver.crt_components.helpers import dto, polynomial, profiling, schedule, utility
 from crtsolver.crt_components.errors import error
 
 class CRTSolver:
-    def __init__(self, time_limit="30000", solver_name="CRTSolver", use_bitvectors=True):
+    def __init__(self, time_limit="30000", solver_name="CRTSolver", use_bitvectors=True,
+        prime_window=1, enum_threshold=4096, residue_limit=16, schedule_name="consecutive",
+        start_prime=2, power=2, ratio=2.0, file_timeout=None,
+        output_format="csv", resume=False, use_cache=False, retime=False, residue_cache=False,
+        residue_cache_size=100000, verbose=1, reuse_contexts=True, recycle_rss=2048,
+        profile=False, profile_columns=False, lift_limit=4):
         # Set root directory for robust file paths
         # CRTSolver -> src -> solvers -> crt_solver.py
         # crt_solver.py = file, solvers = parents[0], crtsolver = parents[1],
@@ -20,6 +28,7 @@ class CRTSolver:
         # Set absolute paths from root directory
         self.TESTS = self.ROOT / "tests"
         self.RESULTS = self.ROOT / "results"
+        self.shard = (0, 1) # (i, n) - only every n-th file starting at the i-th is solved
 
         if use_bitvectors:
             self.solver_name = solver_name + " (Bit-Vector Mode)"
@@ -28,133 +37,332 @@ class CRTSolver:
 
         self.use_bitvectors = use_bitvectors
         self.time_limit = time_limit
-        self.writer = writer.Writer(self.RESULTS, self.solver_name)
-        
+        self.file_timeout = file_timeout # wall-clock limit for a whole file in ms (None = no limit)
+        self.prime_window = prime_window # primes solved concurrently (1 = sequential)
+        self.enum_threshold = enum_threshold # largest residue grid enumerated without cvc5
+        self.residue_limit = residue_limit # residue tuples kept per prime + search tree branches
+        self.lift_limit = lift_limit # integer lifts per constant and branch (smallest magnitude first)
+        self.schedule_name = schedule_name # modulus schedule (see helpers/schedule.py)
+        self.start_prime = start_prime
+        self.power = power
+        self.ratio = ratio
+        self.pool = None # created per file in solve_file, so the solver can still be pickled
+        # stdout messages: 0 = none, 1 = progress per prime, 2 = every residue tuple and candidate
+        self.verbose = verbose
+        self.detail = verbose >= 2 # checked before building per-candidate messages
+        # Per-phase timings + counters: a JSON trace per file (results/traces), and optionally
+        # extra result columns (see helpers/profiling.py)
+        self.profile = profile or profile_columns
+        self.profile_columns = profile_columns
+        self.profiler = profiling.DISABLED
+        # cvc5 contexts are reset and reused between files (size 0 = a new context per file)
+        self.contexts = context_pool.Context_Pool(self.create_context, self.reset_context,
+            recycle_rss, 1 if reuse_contexts else 0)
+        self.API = None
+        # How far the CRT loop got (last prime used + candidates checked) and the time spent
+        # before the first check (context, parsing and compiling)
+        self.writer = writer.Writer(self.RESULTS, self.solver_name,
+            extra_headers=["Last Prime", "Candidates Checked", "Setup (s)"]
+                + (profiling.HEADERS if profile_columns else []),
+            output_format=output_format, resume=resume)
+        # Results of earlier runs, keyed by file contents + get_cache_config()
+        self.cache = None
+        if use_cache:
+            self.cache = cache.Result_Cache(self.RESULTS / "cache.sqlite3", retime)
+        # Modulo results per (reduced system, prime), shared by every file and run
+        self.residue_cache = None
+        if residue_cache:
+            self.residue_cache = cache.Residue_Cache(
+                self.RESULTS / "residue_cache.sqlite3", residue_cache_size)
+
     def reinit(self):
-        self.API = dto.API(self.time_limit)
+        self.start_time = time.time() # context setup counts towards the runtime
+        if self.API is not None:
+            self.contexts.release(self.API)
+        self.API = self.contexts.acquire()
+        self.profiler = profiling.Profiler() if self.profile else profiling.DISABLED
         self.terms = dto.Terms()
-        self.generator = prime_generator.Prime_Generator().get_next_prime()
+        self.generator = None # modulus schedule - needs the AST, so set in solve_file
         self.primes = dto.Primes()
         self.bitwidth = dto.Bitwidth()
         self.utility = utility.Utility(self.API, self.terms, self.primes, self.bitwidth, self)
-        self.start_time = time.time()
+        self.deadline = None # set in solve_file if file_timeout is given
         self.ast = []
         self.sat_model = [] # if SAT, stores satisfying values
+        self.residues = None # satisfying residue tuples for the current prime
+        self.residues_complete = False # self.residues holds every residue tuple of the prime
         self.continue_sat = True # flag for while loop
 
+    def create_context(self):
+        return dto.API(self.time_limit)
+
+    def reset_context(self, API):
+        API.reset(self.time_limit)
+
     def get_solver_name(self):
         return self.solver_name
 
-    def execute(self):
-        for file in reader.get_sorted_files(self.TESTS):
-            if file.is_file():
-                #builtins.input("Press any key to continue:")
-
-                # Reinitialize data for new file
-                self.reinit()
-                print(f"Reading file: {file}")
-
-                # Get AST
-                with file.open("r") as input:
-                    self.ast = reader.preprocess(input, self.API, self.terms)
-
-                # Initialize modulo and candidate
-                self.init_mod_and_candidate()
-
-                try:
-                    while self.continue_sat:
-                        # Attempt to solve modulo prime
-                        self.solve_modulo()
-                        # If UNSAT modulo prime, original problem is also UNSAT
-                        if self.continue_sat:
-                            # If SAT, attempt to solve original problem with candidate solution
-                            self.solve_candidate()
-                            # If SAT, original problem is SAT and candidate solution is correct
-                            # If UNSAT, attempt to solve modulo new prime
-                            #builtins.input("Press any key to continue:")
-                except error.AbortFileException as e:
-                    print(e)
-                    print("UNKNOWN (ERROR)\n")
-                    self.continue_sat = False
-                    self.sat_model.append(["UNKNOWN (ERROR)"])
-                    self.continue_sat = False
+    def get_cache_config(self):
+        # Every option that can change the result of a file
+        return "|".join(str(option) for option in [self.solver_name, self.time_limit, self.file_timeout, self.prime_window,
+            self.enum_threshold, self.residue_limit, self.schedule_name, self.start_prime,
+            self.power, self.ratio, self.profile_columns, self.lift_limit])
 
-                self.writer.store_result(file, self.start_time, self.sat_model)
+    def execute(self, jobs=1):
+        # Files are read lazily - files that already have a result are skipped when resuming
+        files = reader.iter_files(self.TESTS, self.writer.completed(), self.shard)
+        for file, start_time, end_time, sat_model, progress in batch.solve_files(self, files, jobs):
+            self.writer.store_result(file, start_time, sat_model, end_time, progress)
         self.writer.write()
 
+    def solve_file(self, file):
+        #builtins.input("Press any key to continue:")
+        self.log(f"Reading file: {file}")
+        with file.open("r") as input:
+            sat_model = self.solve_input(input)
+        if self.profile:
+            self.write_trace(file, sat_model)
+        return sat_model
+
+    def write_trace(self, file, sat_model):
+        # results/traces/<solver>/<N>var/<M>deg/<file>.json
+        trace_file = (self.RESULTS / "traces" / self.solver_name / file.parent.parent.name
+            / file.parent.name / f"{file.stem}.json")
+        trace_file.parent.mkdir(parents=True, exist_ok=True)
+        trace = self.profiler.to_json(file=str(file), solver=self.solver_name,
+            status=dto.Result.from_sat_model(sat_model).status, last_prime=self.primes.prime)
+        trace_file.write_text(json.dumps(trace, indent=1))
+
+    def solve(self, source):
+        # In-process API: SMT2 text or path -> dto.Result, nothing is written to disk
+        # Progress messages still go through log - api.solve builds its solvers with verbose=0,
+        # as stdout belongs to the program embedding the solver
+        start_time = time.time()
+        if isinstance(source, Path) or "(" not in source:
+            with open(source) as input:
+                sat_model = self.solve_input(input)
+        else:
+            sat_model = self.solve_input(io.StringIO(source))
+        return self.get_result(sat_model, start_time)
+
+    def get_result(self, sat_model, start_time):
+        return dto.Result.from_sat_model(sat_model, prime=self.primes.prime,
+            candidates=self.candidate.checked, setup_time=self.setup_time - start_time,
+            solve_time=time.time() - self.setup_time)
+
+    def solve_input(self, input):
+        # Reinitialize data for new file
+        self.reinit()
+        if self.file_timeout is not None:
+            self.deadline = self.start_time + self.file_timeout / 1000
+
+        # Get AST
+        with self.profiler.phase("parse"):
+            self.ast = reader.preprocess(input, self.API, self.terms)
+
+        with self.profiler.phase("compile"):
+            # Moduli used by the CRT loop
+            self.generator = schedule.Modulus_Schedule(
+                self.schedule_name, self.start_prime, self.power, self.ratio,
+                polynomial.leading_coefficients(self.ast, self.terms.vars)
+            ).get_next_modulus()
+
+            # Initialize modulo and candidate
+            self.init_mod_and_candidate()
+        self.profiler.count("constants", len(self.terms.vars))
+        self.profiler.count("asserts", len(self.dag.roots))
+        self.profiler.count("dag_nodes", len(self.dag.nodes))
+
+        if self.prime_window > 1:
+            self.pool = modulo_pool.Modulo_Pool(self.prime_window)
+        self.setup_time = time.time() # parsing + compiling done
+
+        try:
+            while self.continue_sat:
+                self.time_budget() # stop between iterations once the deadline has passed
+                if self.prime_window > 1:
+                    # Solve a window of primes in parallel + check candidates in prime order
+                    self.solve_modulo_window()
+                else:
+                    # Attempt to solve modulo prime
+                    self.solve_modulo()
+                    # If UNSAT modulo prime, original problem is also UNSAT
+                    if self.continue_sat:
+                        # If SAT, attempt to solve original problem with candidate solution
+                        self.solve_candidate()
+                        # If SAT, original problem is SAT and candidate solution is correct
+                        # If UNSAT, attempt to solve modulo new prime
+                        #builtins.input("Press any key to continue:")
+        except error.AbortFileException as e:
+            self.log(e)
+            self.log("UNKNOWN (ERROR)\n")
+            self.continue_sat = False
+            self.sat_model.append(["UNKNOWN (ERROR)"])
+            self.continue_sat = False
+        except error.TimeoutException as e:
+            self.log(e)
+            self.log("UNKNOWN (TIMEOUT)\n")
+            self.continue_sat = False
+            self.sat_model = [["UNKNOWN (TIMEOUT)"]]
+        finally:
+            # Release the window pool, so nothing outlives the file
+            if self.pool is not None:
+                self.pool.terminate()
+                self.pool = None
+            self.profiler.count("candidates_checked", self.candidate.checked)
+            self.profiler.count("integer_terms", len(self.terms.ints) + len(self.terms.bv_ints))
+        return self.sat_model
+
+    def log(self, *values):
+        if self.verbose:
+            print(*values)
+
+    def get_progress(self):
+        # [last prime, candidates checked, setup time (+ profile columns)] - extra result columns
+        progress = [self.primes.prime, self.candidate.checked, self.setup_time - self.start_time]
+        if self.profile_columns:
+            progress.extend(self.profiler.columns())
+        return progress
+
+    def time_budget(self):
+        # Time limit (ms) for the next check: the per-check limit, capped by the file deadline
+        if self.deadline is None:
+            return int(self.time_limit)
+        remaining = int((self.deadline - time.time()) * 1000)
+        if remaining <= 0:
+            raise error.TimeoutException(f"File timeout after {self.file_timeout} ms")
+        return min(int(self.time_limit), remaining)
+
     def init_mod_and_candidate(self):
+        # Compile the asserts once - modulo and candidate instantiate the same DAG
+        self.dag = term_dag.Term_DAG(self.ast, self.terms.vars)
         if self.use_bitvectors:
-            self.modulo = modulo_bv.Modulo_BV(
-                self.ast, self.API, self.terms, self.primes, self.bitwidth, self.utility)
+            self.modulo = modulo_bv.Modulo_BV(self.ast, self.API, self.terms, self.primes,
+                self.bitwidth, self.utility, self.dag, self.residue_cache, self.profiler)
         else:
-            self.modulo = modulo.Modulo(
-                self.ast, self.API, self.terms, self.primes, self.utility)
-        self.candidate = candidate.Candidate(self.ast, self.API, self.terms, self.utility, self)
+            self.modulo = modulo.Modulo(self.ast, self.API, self.terms, self.primes,
+                self.utility, self.dag, self.residue_cache, self.profiler)
+        self.candidate = candidate.Candidate(self.ast, self.API, self.terms, self.utility, self,
+            self.residue_limit, self.dag, self.profiler, self.lift_limit)
+        self.enumerator = residue_enumerator.Residue_Enumerator(
+            self.ast, self.terms.vars, self.enum_threshold)
 
     def solve_modulo(self):
         # Get current prime
         self.primes.prime = next(self.generator)
-        print(f"Attempting to solve with mod {self.primes.prime}")
+        self.profiler.start_prime(self.primes.prime)
+        self.log(f"Attempting to solve with mod {self.primes.prime}")
 
-        # Attempt to solve modulo prime
-        self.modulo.compute_mod()
+        # Small residue grids are enumerated directly - no cvc5 round trip
+        if self.enumerator.fits(self.primes.prime):
+            with self.profiler.phase("enumerate"):
+                self.residues = self.enumerator.enumerate(self.primes.prime)
+            self.residues_complete = len(self.residues) <= self.residue_limit
+            if not self.residues:
+                self.log("UNSAT\n")
+                self.continue_sat = False
+                self.sat_model.append(["UNSAT"])
+            return
+
+        # Attempt to solve modulo prime (residue tuples are enumerated right away)
+        status, self.residues = self.modulo.solve_mod(self.residue_limit)
+        self.residues_complete = self.modulo.found_all
         #for assertion in self.API.mod_solver.getAssertions():
             #print(assertion)
-
-        # Check satisfiability
-        result = self.API.mod_solver.checkSat()
-        if result.isUnsat():
-            print("UNSAT\n")
+        if status == "UNSAT":
+            self.log("UNSAT\n")
             self.continue_sat = False
             self.sat_model.append(["UNSAT"])
-        if result.isUnknown():
-            print("UNKNOWN (TIMEOUT)\n")
+        if status == "UNKNOWN":
+            self.log("UNKNOWN (TIMEOUT)\n")
             self.continue_sat = False
             self.sat_model.append(["UNKNOWN (TIMEOUT)"])
 
     def solve_candidate(self):
         # Get candidate values from solver (represented as int)
-        print(f"Retrieving candidates for mod {self.primes.prime}")
-        candidate_vals = [] # [result1, result2]
-        var_names = list(self.terms.vars.keys()) # [constant_name1, constant_name2]
-        if self.use_bitvectors:
-            for name in var_names:
-                # Get bv values from solver (represented as int)
-                val = self.terms.bv_mod_vars[f"{name}_mod_{self.primes.prime}"]
-                bitvector_val = self.API.mod_solver.getValue(val).getBitVectorValue()
-                candidate_vals.append(int(bitvector_val, 2)) # conversion from base 2 to int
-        else:
-            for name in var_names:
-                # Get int values from solver
-                val = self.terms.mod_vars[f"{name}_mod_{self.primes.prime}"]
-                candidate_vals.append(self.API.mod_solver.getValue(val).getIntegerValue())
-
-        # Build candidate_list DTO
-        candidate_list = [] # [(constant_name, modulus, result)]
-        for name, value in zip(var_names, candidate_vals):
-            print(f"{name}: {value}")
-            candidate_list.append((name, self.primes.prime, value))
-        
-        # Attempt to solve original problem with candidate solution
-        self.candidate.compute_candidate(candidate_list)
+        self.log(f"Retrieving candidates for mod {self.primes.prime}")
+        self.check_mod_values(self.residues[:self.residue_limit], self.residues_complete)
+
+    def check_mod_values(self, residue_tuples, complete=False):
+        # residue_tuples = [(result1, result2)], complete = every residue tuple mod prime
+        if self.detail:
+            var_names = list(self.terms.vars.keys()) # [constant_name1, constant_name2]
+            for residues in residue_tuples:
+                self.log(", ".join(f"{name}: {value}" for name, value in zip(var_names, residues)))
+
+        # Attempt to solve original problem with candidate solutions
+        self.candidate.compute_candidate(self.primes.prime, residue_tuples, complete)
+        if self.continue_sat and not self.candidate.branches:
+            # No residue class left has an integer inside the bounds of the constraints
+            # Only a verdict if no residue tuple or branch was ever dropped along the way
+            if self.candidate.complete:
+                self.log("UNSAT (bounds)\n")
+                self.sat_model.append(["UNSAT"])
+            else:
+                self.log("UNKNOWN (INCOMPLETE)\n")
+                self.sat_model.append(["UNKNOWN (INCOMPLETE)"])
+            self.continue_sat = False
         #for assertion in self.API.solver.getAssertions():
             #print(assertion)
 
-    def check_candidate(self):
+    def solve_modulo_window(self):
+        # Get the next window of primes and solve their modulo problems in parallel
+        window = [next(self.generator) for _ in range(self.prime_window)]
+        self.log(f"Attempting to solve with mods {window}")
+        window_results = self.pool.solve_window(
+            self.ast, window, str(self.time_budget()), self.use_bitvectors, self.enum_threshold,
+            self.residue_limit, self.deadline, self.residue_cache)
+
+        # Results are buffered until every smaller prime in the window has been handled
+        # Returning early leaves unfinished primes running - they are killed at the end of the file
+        results = {} # {prime: (status, values)}
+        next_index = 0
+        for prime, status, values in window_results:
+            results[prime] = (status, values)
+
+            # UNSAT modulo any prime means the original problem is also UNSAT
+            if status == "UNSAT":
+                self.log(f"UNSAT (mod {prime})\n")
+                self.continue_sat = False
+                self.sat_model.append(["UNSAT"])
+                return
+
+            # Feed SAT residues to the candidate stage in prime order
+            while next_index < len(window) and window[next_index] in results:
+                self.primes.prime = window[next_index]
+                # Modulo problems run in worker processes - only the candidate phases are profiled
+                self.profiler.start_prime(self.primes.prime)
+                status, values = results[self.primes.prime]
+                next_index += 1
+                if status == "UNKNOWN":
+                    self.log("UNKNOWN (TIMEOUT)\n")
+                    self.continue_sat = False
+                    self.sat_model.append(["UNKNOWN (TIMEOUT)"])
+                    return
+                self.log(f"Retrieving candidates for mod {self.primes.prime}")
+                # Worker processes do not report whether every residue tuple was enumerated
+                self.check_mod_values(values)
+                if not self.continue_sat:
+                    # Candidate SAT - remaining primes are not needed
+                    return
+
+    def check_candidate(self, assumptions):
         # If SAT, original problem is SAT and candidate solution is correct
-        if self.API.solver.checkSat().isSat():
+        self.utility.set_time_limit(self.API.solver)
+        if self.API.solver.checkSatAssuming(*assumptions).isSat():
             self.continue_sat = continue_check = False
-            print("Candidate SAT")
+            self.log("Candidate SAT")
             for name, constant in self.terms.vars.items():
                 # Get solution from solver
                 model = self.API.solver.getValue(constant).getIntegerValue()
-                print(f"{name}: {model}")
+                self.log(f"{name}: {model}")
                 self.sat_model.append([name, model])
-            print()
+            self.log()
         # If UNSAT, attempt to solve modulo new prime
         else:
             continue_check = True
-            print("Candidate UNSAT")
+            if self.detail:
+                self.log("Candidate UNSAT")
         return continue_check
     
 # CLI entry point
@@ -168,7 +376,29 @@ def main():
     parser.add_argument("--solver_name", default="CRTSolver",
         help="Name for the solver run (used in output results).")
     parser.add_argument("--tests_dir", default=None,
-        help="Path to directory containing test SMT2 files.")
+        help="Directory tree, manifest file (one path per line) or - (stdin) of SMT2 files.")
+    parser.add_argument("--shard", default=None,
+        help="Solve only shard i/n of the files (0 <= i < n), e.g. 0/4 ... 3/4.")
+    parser.add_argument("--jobs", type=int, default=1,
+        help="Number of worker processes used to solve files in parallel.")
+    parser.add_argument("--prime_window", type=int, default=1,
+        help="Number of primes whose modulo problems are solved in parallel.")
+    parser.add_argument("--residue_limit", type=int, default=16,
+        help="Residue tuples enumerated per prime and search tree branches kept (1 = single model).")
+    parser.add_argument("--lift_limit", type=int, default=4,
+        help="Integer lifts tried per constant and branch, smallest magnitude first (n lifts cover |x| < n/2 * modulus).")
+    parser.add_argument("--enum_threshold", type=int, default=4096,
+        help="Largest residue grid (p^k tuples) enumerated directly instead of using cvc5 (0 = off).")
+    parser.add_argument("--schedule", choices=schedule.SCHEDULES, default="consecutive",
+        help="Order in which moduli are used.")
+    parser.add_argument("--start_prime", type=int, default=2,
+        help="Smallest prime used by the modulus schedule.")
+    parser.add_argument("--power", type=int, default=2,
+        help="Exponent for the prime_powers schedule.")
+    parser.add_argument("--ratio", type=float, default=2.0,
+        help="Growth factor between consecutive primes for the geometric schedule.")
+    parser.add_argument("--file_timeout", type=int, default=None,
+        help="Wall-clock limit for each file (in ms), shared by all of its checks.")
     
     # Default: use_bitvectors = True (bit-vector mode)
     parser.set_defaults(use_bitvectors=True)
@@ -178,14 +408,62 @@ def main():
         action="store_false",
         help="Disable bit-vector mode (use integer mode instead)."
     )
+    parser.add_argument("--output_format", choices=writer.FORMATS, default="csv",
+        help="Format of the streamed results file.")
+    parser.add_argument("--resume", action="store_true",
+        help="Keep existing results and skip files that already have one.")
+    parser.add_argument("--cache", action="store_true",
+        help="Reuse results of unchanged files from earlier runs (results/cache.sqlite3).")
+    parser.add_argument("--invalidate_cache", action="store_true",
+        help="Drop the cached results of this solver configuration before solving.")
+    parser.add_argument("--retime", action="store_true",
+        help="Solve cached files again and refresh their cached results and runtimes.")
+    parser.add_argument("--residue_cache", action="store_true",
+        help="Reuse modulo results per (reduced system, prime) (results/residue_cache.sqlite3).")
+    parser.add_argument("--residue_cache_size", type=int, default=100000,
+        help="Largest number of entries kept in the residue cache (least recently used evicted).")
+    parser.add_argument("--recycle_rss", type=int, default=2048,
+        help="Resident memory (in MB) above which reused solver contexts are rebuilt.")
+    parser.add_argument("--verbosity", type=int, choices=[0, 1, 2], default=1,
+        help="0 = silent, 1 = progress per prime, 2 = every residue tuple and candidate.")
+    parser.add_argument("--profile", action="store_true",
+        help="Time every phase of the CRT loop and write a JSON trace per file (results/traces).")
+    parser.add_argument("--profile_columns", action="store_true",
+        help="Also store the per-phase times as extra result columns (implies --profile).")
     args = parser.parse_args()
 
     solver = CRTSolver(
         time_limit=str(args.time_limit),
         solver_name=args.solver_name,
-        use_bitvectors=args.use_bitvectors
+        use_bitvectors=args.use_bitvectors,
+        prime_window=args.prime_window,
+        enum_threshold=args.enum_threshold,
+        residue_limit=args.residue_limit,
+        lift_limit=args.lift_limit,
+        schedule_name=args.schedule,
+        start_prime=args.start_prime,
+        power=args.power,
+        ratio=args.ratio,
+        file_timeout=args.file_timeout,
+        output_format=args.output_format,
+        resume=args.resume,
+        use_cache=args.cache or args.invalidate_cache or args.retime,
+        retime=args.retime,
+        residue_cache=args.residue_cache,
+        residue_cache_size=args.residue_cache_size,
+        recycle_rss=args.recycle_rss,
+        verbose=args.verbosity,
+        profile=args.profile,
+        profile_columns=args.profile_columns
     )
-    solver.execute()
+    if args.invalidate_cache:
+        solver.cache.invalidate(solver.get_cache_config())
+    if args.tests_dir is not None:
+        solver.TESTS = Path(args.tests_dir)
+    if args.shard is not None:
+        solver.shard = reader.parse_shard(args.shard)
+        solver.writer.set_shard(solver.shard) # one results file per shard - see merge-results
+    solver.execute(jobs=args.jobs)
 
 if __name__ == "__main__":
     main()
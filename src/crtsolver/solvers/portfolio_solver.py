@@ -0,0 +1,141 @@
+from pathlib import Path
+import contextlib
+import multiprocessing
+import os
+import queue
+import time
+import argparse
+from crtsolver.input_output import reader, writer
+from crtsolver.solvers import crt_solver, cvc5_solver, z3_solver
+
+UNKNOWN_RESULTS = ("UNKNOWN (TIMEOUT)", "UNKNOWN (ERROR)", "UNKNOWN (INCOMPLETE)")
+
+def run_engine(engine_name, engine, file, result_queue):
+    # Runs in a separate process - engine output is discarded to keep the console readable
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        try:
+            sat_model = engine.solve_file(file)
+        except Exception:
+            sat_model = [["UNKNOWN (ERROR)"]]
+    result_queue.put((engine_name, sat_model))
+
+class PortfolioSolver:
+    def __init__(self, time_limit="30000", solver_name="Portfolio",
+        output_format="csv", resume=False):
+        # Set root directory for robust file paths
+        # CRTSolver -> src -> solvers -> portfolio_solver.py
+        # portfolio_solver.py = file, solvers = parents[0], crtsolver = parents[1],
+        # src = parents[2], CRTSolver = parents[3]
+        self.ROOT = Path(__file__).resolve().parents[3]
+
+        # Set absolute paths from root directory
+        self.TESTS = self.ROOT / "tests"
+        self.RESULTS = self.ROOT / "results"
+        self.shard = (0, 1) # (i, n) - only every n-th file starting at the i-th is solved
+
+        self.time_limit = time_limit
+        self.solver_name = solver_name
+        self.writer = writer.Writer(self.RESULTS, self.solver_name, extra_headers=["Winner"],
+            output_format=output_format, resume=resume)
+
+        # Engines raced on every file
+        self.engines = {
+            "CRT-BV": crt_solver.CRTSolver(time_limit, use_bitvectors=True),
+            "CRT-INT": crt_solver.CRTSolver(time_limit, use_bitvectors=False),
+            "cvc5": cvc5_solver.cvc5Solver(time_limit),
+            "Z3": z3_solver.Z3Solver(time_limit)
+        }
+
+    def reinit(self):
+        self.start_time = time.time()
+        self.sat_model = [] # if SAT, stores satisfying values
+        self.winner = "n/a" # engine that produced the first definitive answer
+
+    def get_solver_name(self):
+        return self.solver_name
+
+    def execute(self):
+        # Files are read lazily - files that already have a result are skipped when resuming
+        for file in reader.iter_files(self.TESTS, self.writer.completed(), self.shard):
+            sat_model = self.solve_file(file)
+            self.writer.store_result(file, self.start_time, sat_model, extra=[self.winner])
+        self.writer.write()
+
+    def solve_file(self, file):
+        # Reinitialize data for new file
+        self.reinit()
+        print(f"Reading file: {file}")
+
+        # Start one process per engine on the same file
+        result_queue = multiprocessing.Queue()
+        processes = []
+        for engine_name, engine in self.engines.items():
+            process = multiprocessing.Process(
+                target=run_engine, args=(engine_name, engine, file, result_queue))
+            process.start()
+            processes.append(process)
+
+        # Take the first definitive SAT/UNSAT answer
+        pending = len(processes)
+        while pending > 0:
+            try:
+                engine_name, sat_model = result_queue.get(timeout=0.1)
+            except queue.Empty:
+                # Stop waiting if every engine exited without reporting a result
+                if not any(process.is_alive() for process in processes) and result_queue.empty():
+                    break
+                continue
+            pending -= 1
+            # An empty model is a definitive SAT answer for a file with no declared constants
+            if not sat_model or sat_model[0][0] not in UNKNOWN_RESULTS:
+                self.sat_model = sat_model
+                self.winner = engine_name
+                break
+            # Keep the latest UNKNOWN in case no engine gives a definitive answer
+            self.sat_model = sat_model
+
+        # Kill the engines that are still running
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+        if not self.sat_model and self.winner == "n/a":
+            self.sat_model.append(["UNKNOWN (ERROR)"])
+        print(f"Winner: {self.winner}")
+        print(f"{self.sat_model}\n")
+        return self.sat_model
+
+# CLI entry point
+def main():
+    parser = argparse.ArgumentParser(
+        description="Race CRTSolver (both modes), cvc5 and Z3 on a directory of SMT2 files.")
+    parser.add_argument("--time_limit", type=int, default=30000,
+        help="Time limit for each check-sat (in ms).")
+    parser.add_argument("--solver_name", default="Portfolio",
+        help="Name for the solver run (used in output results).")
+    parser.add_argument("--tests_dir", default=None,
+        help="Directory tree, manifest file (one path per line) or - (stdin) of SMT2 files.")
+    parser.add_argument("--shard", default=None,
+        help="Solve only shard i/n of the files (0 <= i < n), e.g. 0/4 ... 3/4.")
+    parser.add_argument("--output_format", choices=writer.FORMATS, default="csv",
+        help="Format of the streamed results file.")
+    parser.add_argument("--resume", action="store_true",
+        help="Keep existing results and skip files that already have one.")
+    args = parser.parse_args()
+
+    solver = PortfolioSolver(
+        time_limit=str(args.time_limit),
+        solver_name=args.solver_name,
+        output_format=args.output_format,
+        resume=args.resume
+    )
+    if args.tests_dir is not None:
+        solver.TESTS = Path(args.tests_dir)
+    if args.shard is not None:
+        solver.shard = reader.parse_shard(args.shard)
+        solver.writer.set_shard(solver.shard) # one results file per shard - see merge-results
+    solver.execute()
+
+if __name__ == "__main__":
+    main()
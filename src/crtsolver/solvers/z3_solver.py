@@ -2,13 +2,17 @@ from pathlib import Path
 from z3 import *
 import time
 import argparse
-from crtsolver.input_output import reader, writer
+from crtsolver.input_output import cache, reader, writer
+from crtsolver.solvers import batch, context_pool
+from crtsolver.crt_components.helpers import dto
 
 # NOTE: Inspired by code and instructions from the following sources:
 # NOTE: https://ericpony.github.io/z3py-tutorial/guide-examples.htm
 # NOTE: https://z3prover.github.io/papers/programmingz3.html
 class Z3Solver:
-    def __init__(self, time_limit="30000", solver_name="Z3"):
+    def __init__(self, time_limit="30000", solver_name="Z3",
+        output_format="csv", resume=False, use_cache=False, retime=False, reuse_contexts=True,
+        recycle_rss=2048):
         # Set root directory for robust file paths
         # CRTSolver -> src -> solvers -> z3_solver.py
         # z3_solver.py = file, solvers = parents[0], crtsolver = parents[1],
@@ -18,55 +22,111 @@ class Z3Solver:
         # Set absolute paths from root directory
         self.TESTS = self.ROOT / "tests"
         self.RESULTS = self.ROOT / "results"
+        self.shard = (0, 1) # (i, n) - only every n-th file starting at the i-th is solved
 
         self.time_limit = time_limit
         self.solver_name = solver_name
-        self.writer = writer.Writer(self.RESULTS, self.solver_name)
+        # Solvers are reset and reused between files (size 0 = a new solver per file)
+        self.contexts = context_pool.Context_Pool(self.create_context, self.reset_context,
+            recycle_rss, 1 if reuse_contexts else 0)
+        self.solver = None
+        # Time spent before the check (solver setup and parsing)
+        self.writer = writer.Writer(self.RESULTS, self.solver_name, extra_headers=["Setup (s)"],
+            output_format=output_format, resume=resume)
+        # Results of earlier runs, keyed by file contents + get_cache_config()
+        self.cache = None
+        if use_cache:
+            self.cache = cache.Result_Cache(self.RESULTS / "cache.sqlite3", retime)
         
     def reinit(self):
+        self.start_time = time.time() # solver setup counts towards the runtime
+        if self.solver is not None:
+            self.contexts.release(self.solver)
+        self.solver = self.contexts.acquire()
+        self.setup_time = self.start_time
+        self.sat_model = [] # if SAT, stores satisfying values
+
+    def create_context(self):
         # Create solver
-        self.solver = Solver()
-        
+        solver = Solver()
+
         # Set solver options
-        self.solver.set(unsat_core=True)
-        self.solver.set(timeout=int(self.time_limit))
+        solver.set(unsat_core=True)
+        solver.set(timeout=int(self.time_limit))
+        return solver
 
-        self.start_time = time.time()
-        self.sat_model = [] # if SAT, stores satisfying values
+    def reset_context(self, solver):
+        # Drops the asserts of the last file
+        solver.reset()
+        solver.set(unsat_core=True)
+        solver.set(timeout=int(self.time_limit))
 
     def get_solver_name(self):
         return self.solver_name
 
-    def execute(self):
-        for file in reader.get_sorted_files(self.TESTS):
-            if file.is_file():
-                # Reinitialize data for new file
-                self.reinit()
-                print(f"Reading file: {file}")
-
-                #with file.open("r") as input:
-                    #input_code = input.read()
-
-                self.solver.from_file(str(file)) # from_file expects string, not Path
-
-                # Check satisfiability
-                result = self.solver.check()
-                if result == sat:
-                    model = self.solver.model()
-                    # Get all declared variable names and terms
-                    for decl in model.decls():
-                        name = decl.name() # constant name
-                        value = model[decl] # constant value
-                        self.sat_model.append([name, value])
-                elif result == unsat:
-                    self.sat_model.append(["UNSAT"])
-                elif result == unknown:
-                    self.sat_model.append(["UNKNOWN (TIMEOUT)"])
-
-                print()
-                self.writer.store_result(file, self.start_time, self.sat_model)
+    def get_progress(self):
+        # [setup time] - stored as an extra result column
+        return [self.setup_time - self.start_time]
+
+    def get_cache_config(self):
+        # Every option that can change the result of a file
+        return "|".join(str(option) for option in [self.solver_name, self.time_limit])
+
+    def execute(self, jobs=1):
+        # Files are read lazily - files that already have a result are skipped when resuming
+        files = reader.iter_files(self.TESTS, self.writer.completed(), self.shard)
+        for file, start_time, end_time, sat_model, progress in batch.solve_files(self, files, jobs):
+            self.writer.store_result(file, start_time, sat_model, end_time, progress)
         self.writer.write()
 
+    def solve_file(self, file):
+        # Reinitialize data for new file
+        self.reinit()
+        print(f"Reading file: {file}")
+
+        #with file.open("r") as input:
+            #input_code = input.read()
+
+        self.solver.from_file(str(file)) # from_file expects string, not Path
+        return self.check()
+
+    def solve(self, source):
+        # In-process API: SMT2 text or path -> dto.Result
+        start_time = time.time()
+        if isinstance(source, Path) or "(" not in source:
+            sat_model = self.solve_file(Path(source))
+        else:
+            self.reinit()
+            self.solver.from_string(source)
+            sat_model = self.check()
+        return dto.Result.from_sat_model(sat_model, setup_time=self.setup_time - start_time,
+            solve_time=time.time() - self.setup_time)
+
+    def check(self):
+        self.setup_time = time.time() # parsing done
+
+        # Check satisfiability
+        result = self.solver.check()
+        if result == sat:
+            model = self.solver.model()
+            # Get all declared variable names and terms
+            for decl in model.decls():
+                name = decl.name() # constant name
+                value = model[decl] # constant value
+                # Store as python int - Z3 terms cannot be sent between processes
+                if is_int_value(value):
+                    value = value.as_long()
+                else:
+                    value = str(value)
+                self.sat_model.append([name, value])
+        elif result == unsat:
+            self.sat_model.append(["UNSAT"])
+        elif result == unknown:
+            self.sat_model.append(["UNKNOWN (TIMEOUT)"])
+
+        print()
+        return self.sat_model
+
 # CLI entry point
 def main():
     parser = argparse.ArgumentParser(description="Run the Z3 solver on a directory of SMT2 files.")
@@ -74,13 +134,43 @@ def main():
         help="Time limit for each check-sat (in ms).")
     parser.add_argument("--solver_name", default="Z3",
         help="Name for the solver run (used in output results).")
+    parser.add_argument("--tests_dir", default=None,
+        help="Directory tree, manifest file (one path per line) or - (stdin) of SMT2 files.")
+    parser.add_argument("--shard", default=None,
+        help="Solve only shard i/n of the files (0 <= i < n), e.g. 0/4 ... 3/4.")
+    parser.add_argument("--jobs", type=int, default=1,
+        help="Number of worker processes used to solve files in parallel.")
+    parser.add_argument("--output_format", choices=writer.FORMATS, default="csv",
+        help="Format of the streamed results file.")
+    parser.add_argument("--resume", action="store_true",
+        help="Keep existing results and skip files that already have one.")
+    parser.add_argument("--cache", action="store_true",
+        help="Reuse results of unchanged files from earlier runs (results/cache.sqlite3).")
+    parser.add_argument("--invalidate_cache", action="store_true",
+        help="Drop the cached results of this solver configuration before solving.")
+    parser.add_argument("--retime", action="store_true",
+        help="Solve cached files again and refresh their cached results and runtimes.")
+    parser.add_argument("--recycle_rss", type=int, default=2048,
+        help="Resident memory (in MB) above which reused solver contexts are rebuilt.")
     args = parser.parse_args()
 
     solver = Z3Solver(
         time_limit=str(args.time_limit),
         solver_name=args.solver_name,
+        output_format=args.output_format,
+        resume=args.resume,
+        use_cache=args.cache or args.invalidate_cache or args.retime,
+        retime=args.retime,
+        recycle_rss=args.recycle_rss
     )
-    solver.execute()
+    if args.invalidate_cache:
+        solver.cache.invalidate(solver.get_cache_config())
+    if args.tests_dir is not None:
+        solver.TESTS = Path(args.tests_dir)
+    if args.shard is not None:
+        solver.shard = reader.parse_shard(args.shard)
+        solver.writer.set_shard(solver.shard) # one results file per shard - see merge-results
+    solver.execute(jobs=args.jobs)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,37 @@
+import shutil
+from pathlib import Path
+import pytest
+from crtsolver.input_output import reader, writer
+from crtsolver.crt_components.engine import evaluator
+
+BENCHMARKS = Path(__file__).resolve().parent
+
+# Small subset of the benchmarks: UNSAT (1 var), SAT (1 var), SAT (2 vars)
+SUBSET = ["1var/2deg/cat.smt2", "1var/2deg/dog.smt2", "2var/2deg/small.smt2"]
+
+@pytest.fixture
+def tests_dir(tmp_path):
+    # Copy the subset into the <N>var/<M>deg layout expected by reader.get_sorted_files
+    root = tmp_path / "tests"
+    for name in SUBSET:
+        target = root / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(BENCHMARKS / name, target)
+    return root
+
+@pytest.fixture
+def redirect(tests_dir, tmp_path):
+    # Point a solver at the temporary tests directory and results directory
+    def apply(solver, extra_headers=()):
+        solver.TESTS = tests_dir
+        solver.RESULTS = tmp_path
+        solver.writer = writer.Writer(tmp_path, solver.solver_name, extra_headers)
+        return solver
+    return apply
+
+def satisfies(file, sat_model):
+    # True if sat_model is a model of the SMT2 file (checked with the exact evaluator)
+    with open(file) as input:
+        ast = reader.tokenize_and_parse(input)
+    model = {name: int(value) for name, value in sat_model}
+    return evaluator.Evaluator(ast, list(model)).first_satisfying([model]) == 0
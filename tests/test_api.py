@@ -0,0 +1,28 @@
+from crtsolver import api
+from conftest import BENCHMARKS
+
+def test_solve_text_and_path_without_output(capsys, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    result = api.solve("(declare-const x Int)(assert (= (* x x) 49))(assert (> x 0))")
+    assert (result.status, result.model) == ("sat", {"x": 7})
+    assert result.prime >= 2 and result.setup_time >= 0 and result.solve_time >= 0
+
+    result = api.solve(BENCHMARKS / "1var" / "2deg" / "cat.smt2", mode="int")
+    assert (result.status, result.model, result.reason) == ("unsat", {}, None)
+
+    assert capsys.readouterr().out == ""
+    assert not list(tmp_path.iterdir())
+
+def test_contexts_are_reused():
+    api.solve("(declare-const x Int)(assert (= x 3))")
+    solver = api.solvers[("bv", 30000, ())]
+    contexts = solver.API
+    # The earlier asserts must not leak into the next problem
+    result = api.solve("(declare-const x Int)(assert (= x 4))")
+    assert solver.API is contexts and result.model == {"x": 4}
+
+def test_timeout_reports_progress():
+    result = api.solve(str(BENCHMARKS / "3var" / "3deg" / "titanium.smt2"), timeout=300,
+        enum_threshold=0)
+    assert (result.status, result.reason) == ("unknown", "timeout")
+    assert result.prime > 2 and result.candidates > 0
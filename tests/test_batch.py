@@ -0,0 +1,34 @@
+import csv
+from crtsolver.input_output import reader
+from crtsolver.solvers import batch, crt_solver, z3_solver
+
+from conftest import satisfies
+
+def test_sequential_and_parallel_results_match(tests_dir):
+    files = reader.get_sorted_files(tests_dir)
+    solver = crt_solver.CRTSolver("5000")
+    sequential = list(batch.solve_files(solver, files, jobs=1))
+    parallel = list(batch.solve_files(solver, files, jobs=2))
+
+    # Results come back in the order the files were given
+    assert [result[0] for result in parallel] == files
+    assert [result[3] for result in parallel] == [result[3] for result in sequential]
+    for file, _, _, sat_model, _ in parallel:
+        if file.stem == "cat":
+            assert sat_model == [["UNSAT"]]
+        else:
+            assert satisfies(file, sat_model)
+
+def test_worker_timings_are_ordered(tests_dir):
+    files = reader.get_sorted_files(tests_dir)
+    for _, start_time, end_time, _, _ in batch.solve_files(crt_solver.CRTSolver("5000"), files, jobs=2):
+        assert start_time <= end_time
+
+def test_execute_with_jobs_writes_csv_in_file_order(redirect):
+    solver = redirect(z3_solver.Z3Solver("5000"))
+    solver.execute(jobs=2)
+
+    with open(solver.writer.file_name, newline="") as file:
+        rows = list(csv.reader(file))
+    assert [row[1] for row in rows[1:-1]] == ["cat", "dog", "small"]
+    assert rows[-1][0] == "Totals: 3"
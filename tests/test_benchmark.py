@@ -0,0 +1,40 @@
+import json
+from crtsolver import benchmark
+
+def test_permutation_test_detects_slowdowns():
+    baseline = [1.0, 1.1, 0.9, 1.0, 1.05]
+    assert benchmark.permutation_p_value(baseline, [2.0, 2.1, 1.9, 2.0, 2.05]) < 0.01
+    assert benchmark.permutation_p_value(baseline, list(baseline)) > 0.3
+    # Faster runs are never a slowdown
+    assert benchmark.permutation_p_value(baseline, [0.5, 0.6, 0.4, 0.5, 0.55]) == 1.0
+
+def test_compare_flags_slowdowns_and_lost_files():
+    baseline = {
+        "micro": {"fast": {"samples": [1.0, 1.1, 0.9, 1.0]}, "noisy": {"samples": [1.0, 3.0]}},
+        "solvers": {"Z3": {"samples": [5.0, 5.1, 4.9], "solved": 3}},
+    }
+    current = {
+        "micro": {"fast": {"samples": [2.0, 2.1, 1.9, 2.0]}, "noisy": {"samples": [3.0, 1.2]},
+            "new": {"samples": [1.0]}},
+        "solvers": {"Z3": {"samples": [5.0, 5.1, 4.9], "solved": 2}},
+    }
+    lines, regressions = benchmark.compare(baseline, current)
+    assert regressions == ["solvers/Z3", "micro/fast"]
+    assert len(lines) == 3 # "new" has no baseline
+
+def test_par2_counts_unsolved_files_twice_the_timeout():
+    results = [{"status": "sat", "times": [1.0, 3.0, 2.0]}, {"status": "unknown", "times": [5.0]}]
+    assert benchmark.par2(results, 5000) == 12.0
+
+def test_baseline_round_trip(tests_dir, tmp_path, capsys):
+    options = ["--tests_dir", str(tests_dir), "--configurations", "Z3", "--repeats", "2",
+        "--micro", "Candidate.find_new_candidate", "--baseline", str(tmp_path / "baseline.json")]
+    assert benchmark.main(options + ["--save_baseline"]) == 0
+    report = json.loads((tmp_path / "baseline.json").read_text())
+    assert report["solvers"]["Z3"]["solved"] == 3 and len(report["solvers"]["Z3"]["samples"]) == 2
+    assert list(report["micro"]) == ["Candidate.find_new_candidate"]
+
+    # Unchanged code: nothing is flagged
+    assert benchmark.main(options + ["--threshold", "10"]) == 0
+    output = capsys.readouterr().out
+    assert "Z3: solved 3/3, PAR-2" in output and "solvers/Z3" in output
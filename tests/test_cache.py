@@ -0,0 +1,52 @@
+from crtsolver.input_output import cache, reader
+from crtsolver.solvers import batch, crt_solver, z3_solver
+
+def solve(solver, files):
+    return [(result[0].stem, result[3]) for result in batch.solve_files(solver, files)]
+
+def test_cached_files_are_not_solved_again(tests_dir, tmp_path):
+    files = reader.get_sorted_files(tests_dir)
+    solver = z3_solver.Z3Solver("5000")
+    solver.cache = cache.Result_Cache(tmp_path / "cache.sqlite3")
+    first = solve(solver, files)
+
+    # Only the edited file is solved again
+    files[1].write_text(files[1].read_text() + "\n")
+    solved = []
+    solve_file = solver.solve_file
+    solver.solve_file = lambda file: solved.append(file.stem) or solve_file(file)
+    second = solve(solver, files)
+    assert solved == ["dog"]
+    assert [second[0], second[2]] == [first[0], first[2]]
+
+def test_cache_is_keyed_by_configuration(tests_dir, tmp_path):
+    file = reader.get_sorted_files(tests_dir)[0]
+    results = cache.Result_Cache(tmp_path / "cache.sqlite3")
+    bit_vector = crt_solver.CRTSolver("5000")
+    integer = crt_solver.CRTSolver("5000", use_bitvectors=False)
+    results.put(file, bit_vector.get_cache_config(), [["UNSAT"]], 1.5, [2, 0])
+    assert results.get(file, bit_vector.get_cache_config()) == ([["UNSAT"]], 1.5, [2, 0])
+    assert results.get(file, integer.get_cache_config()) is None
+
+    # Retiming ignores stored results, invalidating drops them
+    assert cache.Result_Cache(tmp_path / "cache.sqlite3", retime=True).get(
+        file, bit_vector.get_cache_config()) is None
+    results.invalidate(bit_vector.get_cache_config())
+    assert results.get(file, bit_vector.get_cache_config()) is None
+
+def test_cached_runs_stream_the_input(tests_dir, tmp_path):
+    files = reader.get_sorted_files(tests_dir)
+    solver = z3_solver.Z3Solver("5000")
+    solver.cache = cache.Result_Cache(tmp_path / "cache.sqlite3")
+    solve(solver, files[:2]) # first two files cached, the rest are solved
+
+    read = []
+    def stream():
+        for file in files:
+            read.append(file)
+            yield file
+    results = batch.solve_files(solver, stream())
+    # The first results (two hits + one solved file) only read the files up to that one
+    assert [next(results)[0] for _ in range(3)] == files[:3]
+    assert read == files[:3]
+    assert [result[0] for result in results] == files[3:]
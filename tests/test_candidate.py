@@ -0,0 +1,54 @@
+import io
+from crtsolver.solvers import crt_solver
+from conftest import BENCHMARKS, satisfies
+
+def test_search_tree_keeps_smallest_branches():
+    solver = crt_solver.CRTSolver("5000", residue_limit=3)
+    solver.reinit()
+    solver.terms.vars = {"x": None}
+    solver.init_mod_and_candidate()
+    candidate = solver.candidate
+    candidate.check_all_candidates = lambda candidate_values: None
+
+    candidate.compute_candidate(2, [(0,), (1,)])
+    candidate.compute_candidate(3, [(0,), (1,), (2,)])
+    # x mod 6 in {0, 1, 2, 3, 4, 5} - symmetric magnitudes 0, 1, 2, 3, 2, 1
+    assert candidate.branches == [(6, (0,)), (6, (1,)), (6, (5,))]
+
+def test_residue_sets_solve_machine():
+    # Single models per prime miss machine (x = 13, y = 7) - the search tree finds it
+    file = BENCHMARKS / "2var" / "2deg" / "machine.smt2"
+    for use_bitvectors in (True, False):
+        solver = crt_solver.CRTSolver("5000", use_bitvectors=use_bitvectors, residue_limit=16)
+        assert satisfies(file, solver.solve_file(file))
+
+def test_blocking_clauses_do_not_leak_into_next_prime():
+    # Blocking clauses that exhaust every residue mod 2 must not make mod 3 UNSAT
+    file = BENCHMARKS / "3var" / "3deg" / "bar.smt2"
+    solver = crt_solver.CRTSolver("5000", enum_threshold=0, residue_limit=16)
+    assert solver.solve_file(file) != [["UNSAT"]]
+
+def test_integer_mode_enumerates_one_representative_per_class():
+    # Without 0 <= x, blocking yields 0, -11, -13, ... - duplicates of the same residue classes
+    solver = crt_solver.CRTSolver("5000", use_bitvectors=False)
+    solver.reinit()
+    text = "(declare-const x Int)(assert (= (+ (* x x x x x) (* 20 x x) (* 1036 x)) 0))"
+    solver.ast = crt_solver.reader.preprocess(io.StringIO(text), solver.API, solver.terms)
+    solver.init_mod_and_candidate()
+    solver.primes.prime = 13
+    solver.modulo.compute_mod()
+    assert solver.API.mod_solver.checkSat().isSat()
+    residues = [value for (value,) in solver.modulo.get_all_mod_values(16)]
+    assert len(residues) == len(set(residues))
+    assert all(0 <= value < 13 for value in residues)
+
+def test_bounds_that_rule_out_every_branch_decide_the_file():
+    # x^2 + y^2 = 3 has solutions mod every prime, but none with |x|, |y| <= 4
+    text = "(declare-const x Int)(declare-const y Int)(assert (= (+ (* x x) (* y y)) 3))"
+    for use_bitvectors in (True, False):
+        solver = crt_solver.CRTSolver("5000", use_bitvectors=use_bitvectors, residue_limit=16)
+        assert solver.solve(text).status == "unsat"
+        # Branches dropped by rank are not refuted - no verdict
+        solver = crt_solver.CRTSolver("5000", use_bitvectors=use_bitvectors, residue_limit=1)
+        result = solver.solve(text)
+        assert (result.status, result.reason) == ("unknown", "incomplete")
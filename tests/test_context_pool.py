@@ -0,0 +1,57 @@
+import pytest
+from crtsolver.input_output import reader
+from crtsolver.solvers import batch, context_pool, crt_solver, cvc5_solver, z3_solver
+
+from conftest import satisfies
+
+SOLVERS = [
+    lambda **options: crt_solver.CRTSolver("5000", verbose=False, **options),
+    lambda **options: cvc5_solver.cvc5Solver("5000", **options),
+    lambda **options: z3_solver.Z3Solver("5000", **options),
+]
+
+def test_pool_resets_and_reuses_contexts():
+    resets = []
+    pool = context_pool.Context_Pool(object, resets.append)
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    assert resets == [first]
+    assert pool.created == 1
+
+def test_pool_recycles_above_rss():
+    pool = context_pool.Context_Pool(object, lambda context: None, recycle_rss=0)
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is not first
+    assert (pool.created, pool.recycled) == (2, 1)
+
+def test_pool_without_idle_contexts_builds_every_time():
+    pool = context_pool.Context_Pool(object, lambda context: None, size=0)
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is not first
+
+@pytest.mark.parametrize("make_solver", SOLVERS)
+def test_reused_contexts_give_the_same_results(tests_dir, make_solver):
+    files = reader.get_sorted_files(tests_dir) * 2 # every context is reused at least once
+    fresh = [result[3] for result in batch.solve_files(make_solver(reuse_contexts=False), files)]
+    solver = make_solver()
+    reused = list(batch.solve_files(solver, files))
+    # Z3 may pick a different model in a reused solver, so only the verdicts are compared
+    verdicts = [sat_model[0] == ["UNSAT"] for sat_model in fresh]
+    assert [result[3][0] == ["UNSAT"] for result in reused] == verdicts
+    for file, _, _, sat_model, _ in reused:
+        assert sat_model == [["UNSAT"]] or satisfies(file, sat_model)
+    assert solver.contexts.created == 1
+    # Setup time is reported separately and is part of the runtime
+    for _, start_time, end_time, _, progress in reused:
+        assert 0 <= progress[-1] <= end_time - start_time
+
+def test_setup_column_is_written(redirect):
+    solver = z3_solver.Z3Solver("5000")
+    solver = redirect(solver, solver.writer.extra_headers)
+    solver.execute()
+    rows = solver.writer.read_rows()
+    assert solver.writer.extra_headers == ["Setup (s)"]
+    assert all(float(row[-1]) >= 0 for row in rows)
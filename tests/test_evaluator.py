@@ -0,0 +1,30 @@
+from crtsolver.crt_components.engine import evaluator
+from crtsolver.input_output import reader
+
+def parse(code):
+    return reader.parse(reader.tokenize(code))
+
+def test_finds_first_satisfying_candidate():
+    ast = parse("(declare-const x Int)(assert (= (* (+ x -5) (+ x 1)) 0))")
+    engine = evaluator.Evaluator(ast, ["x"])
+    assert engine.supported
+    candidates = [{"x": value} for value in (0, 2, -1, 5)]
+    assert engine.first_satisfying(candidates) == 2
+    assert engine.first_satisfying([{"x": 3}]) is None
+
+def test_large_values_use_exact_python_ints():
+    # x^3 overflows int64 for x = 2^30, so the evaluator must switch to Python ints
+    ast = parse("(declare-const x Int)(assert (= (* x x x) 1237940039285380274899124224))")
+    engine = evaluator.Evaluator(ast, ["x"])
+    assert engine.first_satisfying([{"x": 2**30 - 1}, {"x": 2**30}]) == 1
+
+def test_unary_minus_and_chained_comparisons():
+    ast = parse("(declare-const x Int)(declare-const y Int)"
+        "(assert (< (- 3) x y 10))(assert (= (+ x y) 7))")
+    engine = evaluator.Evaluator(ast, ["x", "y"])
+    candidates = [{"x": -3, "y": 10}, {"x": 3, "y": 4}]
+    assert engine.first_satisfying(candidates) == 1
+
+def test_unsupported_operator_is_reported():
+    ast = parse("(declare-const x Int)(assert (= (div x 2) 1))")
+    assert not evaluator.Evaluator(ast, ["x"]).supported
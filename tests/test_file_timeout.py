@@ -0,0 +1,26 @@
+import contextlib
+import io
+import time
+from crtsolver.solvers import crt_solver
+from conftest import BENCHMARKS
+
+def test_file_timeout_stops_the_loop():
+    # Without a file timeout titanium runs for ~2s before giving up
+    solver = crt_solver.CRTSolver("5000", enum_threshold=0, file_timeout=300)
+    start = time.time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        sat_model = solver.solve_file(BENCHMARKS / "3var" / "3deg" / "titanium.smt2")
+    assert sat_model == [["UNKNOWN (TIMEOUT)"]]
+    assert time.time() - start < 1.5
+    last_prime, checked, setup = solver.get_progress()
+    assert last_prime >= 2 and checked >= 0 and setup >= 0
+
+def test_progress_is_stored(redirect):
+    # A generous file timeout leaves the results unchanged
+    solver = redirect(crt_solver.CRTSolver("5000", file_timeout=60000),
+        ["Last Prime", "Candidates Checked", "Setup (s)"])
+    with contextlib.redirect_stdout(io.StringIO()):
+        solver.execute()
+    rows = solver.writer.read_rows()
+    assert rows[0][5] == [["UNSAT"]]
+    assert all(row[5] != [["UNKNOWN (TIMEOUT)"]] and len(row) == 9 for row in rows)
@@ -0,0 +1,49 @@
+import itertools
+import random
+from crtsolver.input_output import generator, reader
+from crtsolver.crt_components.engine import evaluator
+from conftest import BENCHMARKS
+
+def load(file):
+    with open(file) as input:
+        ast = reader.tokenize_and_parse(input)
+    names = [subtree[1] for subtree in ast if subtree[0] == "declare-const"]
+    return evaluator.Evaluator(ast, names), names
+
+def test_layout_and_ground_truth(tmp_path):
+    assert generator.generate(tmp_path, variables=(2, 4), degrees=(2, 3), count=4,
+        coefficient=30, solution=6) == (8, 8)
+    files = list(reader.iter_files(tmp_path))
+    assert len(files) == 16
+    assert {(file.parent.parent.name, file.parent.name) for file in files} == \
+        {("2var", "2deg"), ("2var", "3deg"), ("4var", "2deg"), ("4var", "3deg")}
+
+    solutions = generator.read_solutions(tmp_path / "solutions.txt")
+    for file in files:
+        truth = solutions[file.stem]
+        program, names = load(file)
+        if truth == "UNSAT":
+            # P - c is non-zero mod the obstruction prime, so no integer point satisfies it
+            points = [dict(zip(names, point))
+                for point in itertools.product(range(-2, 3), repeat=len(names))]
+            assert program.first_satisfying(points) is None
+        else:
+            assert program.first_satisfying(truth) == 0 # the planted solution
+
+def test_generation_is_deterministic(tmp_path):
+    generator.generate(tmp_path / "a", variables=(3,), degrees=(3,), count=3, seed=7)
+    generator.generate(tmp_path / "b", variables=(5, 3), degrees=(2, 3), count=3, seed=7)
+    for file in reader.iter_files(tmp_path / "a"):
+        twin = tmp_path / "b" / file.relative_to(tmp_path / "a")
+        assert twin.read_text() == file.read_text()
+
+def test_read_existing_solutions():
+    solutions = generator.read_solutions(BENCHMARKS / "solutions.txt")
+    assert solutions["cat"] == "UNSAT"
+    assert solutions["truck"] == [{"x": 3, "y": -3}, {"x": -2, "y": -4}]
+    assert solutions["machine"] == [{"x": 13, "y": 7}]
+
+def test_term_count_is_clamped_to_available_monomials():
+    # 7 constants of degree 1 have 7 monomials - asking for 8 used to loop forever
+    assert len(generator.monomials(7, 1, 8, random.Random(0))) == 7
+    assert len(generator.monomials(2, 2, 10, random.Random(0))) == 5
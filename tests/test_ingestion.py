@@ -0,0 +1,44 @@
+import csv
+import io
+from crtsolver.input_output import reader, writer
+from crtsolver.solvers import z3_solver
+
+def names(files):
+    return [file.stem for file in files]
+
+def test_manifest_stdin_and_any_tree(tests_dir, tmp_path, monkeypatch):
+    manifest = tests_dir / "manifest.txt"
+    manifest.write_text("# selected files\n2var/2deg/small.smt2\n\n1var/2deg/cat.smt2\n")
+    assert names(reader.iter_files(manifest)) == ["small", "cat"]
+
+    monkeypatch.setattr("sys.stdin", io.StringIO(f"{tests_dir / '1var/2deg/dog.smt2'}\n"))
+    assert names(reader.iter_files("-")) == ["dog"]
+
+    # Any depth, natural order (2 before 10)
+    for name in ["a/10.smt2", "a/2.smt2", "b/c/d/deep.smt2", "a/notes.txt"]:
+        (tmp_path / "tree" / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / "tree" / name).write_text("(check-sat)")
+    assert names(reader.iter_files(tmp_path / "tree")) == ["2", "10", "deep"]
+
+def test_shards_partition_the_files(tests_dir):
+    files = names(reader.iter_files(tests_dir))
+    shards = [names(reader.iter_files(tests_dir, shard=(i, 2))) for i in range(2)]
+    assert sorted(shards[0] + shards[1]) == sorted(files)
+    assert shards[0] == ["cat", "small"]
+    assert reader.parse_shard("1/2") == (1, 2)
+
+def test_merge_shard_results(redirect, tmp_path):
+    outputs = []
+    for i in range(2):
+        solver = redirect(z3_solver.Z3Solver("5000"))
+        solver.shard = (i, 2)
+        solver.writer.set_shard(solver.shard)
+        solver.execute()
+        outputs.append(solver.writer.file_name)
+    assert outputs[0].name == "results_Z3.shard-0-of-2.csv"
+
+    writer.merge(outputs, tmp_path / "merged.csv")
+    with open(tmp_path / "merged.csv", newline="") as file:
+        rows = list(csv.reader(file))
+    assert [row[:2] for row in rows[1:-1]] == [["1", "cat"], ["2", "dog"], ["3", "small"]]
+    assert rows[-1][0] == "Totals: 3"
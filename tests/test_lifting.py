@@ -0,0 +1,53 @@
+import io
+from crtsolver.input_output import reader
+from crtsolver.crt_components.engine import lifting
+from crtsolver.crt_components.helpers import dto
+
+def bounds(text):
+    terms = dto.Terms()
+    ast = reader.preprocess(io.StringIO(text), dto.API(), terms)
+    return lifting.integer_bounds(ast, terms.vars)
+
+def test_lifts_are_congruent_and_ordered_by_magnitude():
+    assert lifting.lifts(4, 6, limit=4) == [-2, 4, -8, 10]
+    assert lifting.lifts(3, 6, limit=2) == [3, -3] # m/2 is represented as +m/2
+    assert lifting.lifts(1, 6, 2, 20, limit=4) == [7, 13, 19]
+    assert lifting.lifts(1, 6, -20, -2, limit=4) == [-5, -11, -17]
+    assert lifting.lifts(1, 6, 2, 6) == [] # no integer = 1 (mod 6) in [2, 6]
+
+def test_bounds_from_inequalities():
+    text = """
+        (declare-const x Int)
+        (declare-const y Int)
+        (declare-const z Int)
+        (assert (and (< x 10) (>= (* 2 x) -7)))
+        (assert (> (+ y 1) 0))
+        (assert (= (* x y z) 5))
+    """
+    assert bounds(text) == [(-3, 9), (0, None), (None, None)]
+
+def test_root_bounds():
+    # x^2 - 4x = 117 -> |x| <= 118; (x-3)^2 + (y+6)^2 = 7 with x^2 - 6x >= -9, y^2 + 12y >= -36:
+    # x^2 - 6x + 2 <= 0 -> |x| <= 7, y^2 + 12y + 29 <= 0 -> |y| <= 30
+    text = """
+        (declare-const x Int)
+        (declare-const y Int)
+        (assert (= (+ (* x x) (* -4 x)) 117))
+        (assert (= (+ (* (+ x -3) (+ x -3)) (* (+ y 6) (+ y 6))) 7))
+    """
+    assert bounds(text) == [(-7, 7), (-30, 30)]
+
+def test_odd_powers_and_mixed_terms_stay_open():
+    text = """
+        (declare-const x Int)
+        (declare-const y Int)
+        (assert (= (+ (* x x x) (* y y y)) 9))
+        (assert (= (+ (* x x) (* x y)) 4))
+    """
+    assert bounds(text) == [(None, None), (None, None)]
+
+def test_infeasible_classes_and_candidate_order():
+    lifter = lifting.Lifter([], [], limit=2)
+    lifter.bounds = [(0, 5), (None, None)]
+    assert not lifter.feasible(10, (7, 1)) # x = 7 (mod 10) has no lift in [0, 5]
+    assert lifter.candidates(10, (3, 9)) == [(3, -1), (3, 9)]
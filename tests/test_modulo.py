@@ -0,0 +1,64 @@
+import contextlib
+import io
+from crtsolver.solvers import crt_solver
+from conftest import BENCHMARKS
+
+def assertion_counts(use_bitvectors, primes):
+    solver = crt_solver.CRTSolver("5000", use_bitvectors=use_bitvectors, enum_threshold=0)
+    solver.reinit()
+    with open(BENCHMARKS / "2var" / "2deg" / "machine.smt2") as input:
+        solver.ast = crt_solver.reader.preprocess(input, solver.API, solver.terms)
+    solver.init_mod_and_candidate()
+
+    counts = []
+    for prime in primes:
+        solver.primes.prime = prime
+        solver.modulo.compute_mod()
+        counts.append(len(solver.API.mod_solver.getAssertions()))
+    return counts
+
+def test_modulo_assertions_do_not_accumulate():
+    for use_bitvectors in (True, False):
+        counts = assertion_counts(use_bitvectors, [2, 3, 5, 7])
+        assert len(set(counts)) == 1
+
+def test_exhausted_residues_do_not_leak_into_next_prime():
+    # Blocking clauses that exhaust every residue mod 2 must not make mod 3 UNSAT
+    file = BENCHMARKS / "3var" / "3deg" / "bar.smt2"
+    solver = crt_solver.CRTSolver("5000", enum_threshold=0, residue_limit=16)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert solver.solve_file(file) != [["UNSAT"]]
+
+def residue_sets(file, prime, modes=(True, False)):
+    # Every residue tuple mod prime: from cvc5 in each mode and from the NumPy enumerator
+    sets = []
+    for use_bitvectors in modes:
+        solver = crt_solver.CRTSolver("5000", use_bitvectors=use_bitvectors, enum_threshold=0)
+        solver.reinit()
+        with open(file) as input:
+            solver.ast = crt_solver.reader.preprocess(input, solver.API, solver.terms)
+        solver.init_mod_and_candidate()
+        solver.primes.prime = prime
+        solver.modulo.compute_mod()
+        result = solver.API.mod_solver.checkSat()
+        assert not result.isUnknown()
+        if result.isSat():
+            sets.append(set(map(tuple, solver.modulo.get_all_mod_values(prime ** 3))))
+        else:
+            sets.append(set())
+    sets.append(set(solver.enumerator.enumerate(prime)))
+    return sets
+
+def test_horner_encoding_matches_enumeration():
+    for name in ("1var/2deg/cat.smt2", "1var/2deg/dog.smt2", "2var/2deg/machine.smt2",
+        "2var/2deg/small.smt2"):
+        for prime in (5, 7, 11):
+            bv, integer, enumerated = residue_sets(BENCHMARKS / name, prime)
+            assert bv == integer == enumerated
+
+def test_bv_widths_match_enumeration():
+    # Factored cubes keep the DAG encoding - (x+23)^3 used to wrap around in n bits
+    for name in ("3var/3deg/bar.smt2", "3var/3deg/titanium.smt2"):
+        for prime in (5, 7):
+            bv, enumerated = residue_sets(BENCHMARKS / name, prime, modes=(True,))
+            assert bv == enumerated
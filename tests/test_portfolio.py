@@ -0,0 +1,33 @@
+import ast
+import csv
+from conftest import satisfies
+from crtsolver.solvers import portfolio_solver
+
+def test_portfolio_takes_definitive_answer_and_records_winner(redirect, tests_dir):
+    solver = redirect(portfolio_solver.PortfolioSolver("5000"), extra_headers=["Winner"])
+    solver.execute()
+
+    with open(solver.writer.file_name, newline="") as file:
+        rows = list(csv.DictReader(file))
+    results = {row["FileName"]: row for row in rows[:-1]}
+    assert results["cat"]["Result"] == "[['UNSAT']]"
+    assert satisfies(tests_dir / "1var" / "2deg" / "dog.smt2",
+        ast.literal_eval(results["dog"]["Result"]))
+    for row in results.values():
+        assert row["Winner"] in solver.engines
+
+def test_portfolio_kills_losing_engines(tests_dir):
+    solver = portfolio_solver.PortfolioSolver("5000")
+    solver.solve_file(tests_dir / "1var" / "2deg" / "cat.smt2")
+    # Every engine process has been joined before solve_file returns
+    assert not [child for child in portfolio_solver.multiprocessing.active_children()]
+
+def test_portfolio_accepts_empty_sat_model(tmp_path):
+    # SAT with no declared constants - cvc5 and Z3 return an empty model
+    file = tmp_path / "1var" / "1deg" / "trivial.smt2"
+    file.parent.mkdir(parents=True)
+    file.write_text("(assert (= 1 1))\n")
+
+    solver = portfolio_solver.PortfolioSolver("5000")
+    assert solver.solve_file(file) == []
+    assert solver.winner in solver.engines
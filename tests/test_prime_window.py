@@ -0,0 +1,34 @@
+import subprocess
+import sys
+from crtsolver.input_output import reader
+from crtsolver.solvers import batch, crt_solver
+
+def solve_all(solver, tests_dir, jobs=1):
+    files = reader.get_sorted_files(tests_dir)
+    return [sat_model for _, _, _, sat_model, _ in batch.solve_files(solver, files, jobs)]
+
+def test_window_matches_sequential(tests_dir):
+    for use_bitvectors in (True, False):
+        sequential = solve_all(crt_solver.CRTSolver("5000", use_bitvectors=use_bitvectors), tests_dir)
+        windowed = solve_all(crt_solver.CRTSolver(
+            "5000", use_bitvectors=use_bitvectors, prime_window=3), tests_dir)
+        assert windowed == sequential
+
+def test_window_pool_released_after_each_file(tests_dir):
+    solver = crt_solver.CRTSolver("5000", prime_window=3)
+    solve_all(solver, tests_dir)
+    assert solver.pool is None
+
+def test_jobs_with_window_terminates(tests_dir):
+    # Regression: nested window pools inside batch workers used to keep the run alive forever
+    code = (
+        "from crtsolver.input_output import reader\n"
+        "from crtsolver.solvers import batch, crt_solver\n"
+        f"files = reader.get_sorted_files({str(tests_dir)!r})\n"
+        "solver = crt_solver.CRTSolver('5000', prime_window=3)\n"
+        "print(len(list(batch.solve_files(solver, files, 2))))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code],
+        capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0
+    assert result.stdout.strip().endswith("3")
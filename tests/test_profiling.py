@@ -0,0 +1,51 @@
+import json
+from crtsolver.solvers import crt_solver
+from crtsolver.crt_components.helpers import profiling
+from conftest import BENCHMARKS
+
+def test_disabled_profiler_records_nothing():
+    profiler = profiling.Profiler(enabled=False)
+    with profiler.phase("parse"):
+        profiler.start_prime(2)
+        profiler.count("candidates", 5)
+    assert profiler.phase("lift") is profiling.NO_OP
+    assert (profiler.phases, profiler.counters, profiler.primes) == ({}, {}, [])
+
+def test_phases_are_attributed_to_primes():
+    profiler = profiling.Profiler()
+    with profiler.phase("parse"):
+        pass
+    profiler.start_prime(3)
+    for _ in range(2):
+        with profiler.phase("lift"):
+            pass
+    trace = profiler.to_json(file="x.smt2")
+    assert trace["file"] == "x.smt2" and trace["counters"] == {"primes": 1}
+    assert trace["phases"]["lift"]["calls"] == 2
+    assert list(trace["primes"][0]) == ["prime", "lift"]
+    assert len(profiler.columns()) == len(profiling.HEADERS)
+
+def test_trace_and_columns(redirect):
+    solver = crt_solver.CRTSolver("5000", verbose=0, profile_columns=True)
+    solver = redirect(solver, solver.writer.extra_headers)
+    solver.execute()
+
+    rows = solver.writer.read_rows()
+    assert solver.writer.extra_headers[-len(profiling.HEADERS):] == profiling.HEADERS
+    assert all(len(row) == 9 + len(profiling.HEADERS) for row in rows)
+
+    trace_file = solver.RESULTS / "traces" / solver.solver_name / "1var" / "2deg" / "cat.json"
+    trace = json.loads(trace_file.read_text())
+    assert trace["status"] == "unsat" and trace["last_prime"] == trace["primes"][-1]["prime"]
+    assert {"parse", "compile", "lift"} <= set(trace["phases"])
+    assert trace["counters"]["primes"] == len(trace["primes"])
+    assert trace["counters"]["candidates_checked"] == int(rows[0][7])
+
+def test_candidates_are_only_printed_at_verbosity_2(capsys):
+    file = BENCHMARKS / "1var" / "2deg" / "dog.smt2"
+    crt_solver.CRTSolver("5000", verbose=1).solve_file(file)
+    progress = capsys.readouterr().out
+    crt_solver.CRTSolver("5000", verbose=2).solve_file(file)
+    detail = capsys.readouterr().out
+    assert "Attempting to solve with mod 2" in progress and "Candidate SAT" in progress
+    assert "Evaluated" not in progress and "Evaluated" in detail
@@ -0,0 +1,44 @@
+import contextlib
+import io
+from crtsolver.crt_components.engine import term_dag
+from crtsolver.input_output import reader
+from crtsolver.solvers import crt_solver
+
+def parse(code):
+    return reader.parse(reader.tokenize(code))
+
+def test_let_define_fun_and_negative_literals():
+    ast = parse("(declare-fun x () Int)(define-fun sq ((a Int)) Int (* a a))"
+        "(define-fun c () Int (- 3))"
+        "(assert (let ((y (+ x 1)) (x 2)) (= (sq y) (+ c x))))")
+    assert ast == [["declare-const", "x", "Int"],
+        ["assert", ["=", ["*", ["+", "x", "1"], ["+", "x", "1"]], ["+", "-3", "2"]]]]
+    # Inner let shadows the outer binding
+    assert parse("(assert (let ((a 1)) (let ((a (+ a 1))) a)))") == [["assert", ["+", "1", "1"]]]
+
+def test_comments_and_quoted_symbols():
+    ast = parse('; comment with ( brackets\n(set-info :source |multi\nline (|)\n'
+        '(set-info :status "s""at") ; trailing\n(assert (= x (- 5)))')
+    assert ast == [["set-info", ":source", "|multi\nline (|"],
+        ["set-info", ":status", '"s""at"'], ["assert", ["=", "x", "-5"]]]
+
+def test_let_bindings_are_shared():
+    # 60 nested lets that each use the previous binding twice - 2^60 leaves when flattened
+    code = "(declare-const x Int)(assert (= "
+    previous = "x"
+    for i in range(60):
+        code += f"(let ((v{i} (+ {previous} {previous}))) "
+        previous = f"v{i}"
+    code += previous + ")" * 60 + " 0))"
+    ast = parse(code)
+    assert len(term_dag.Term_DAG(ast, ["x"]).nodes) == 63 # x, 60 sums, 0 and =
+
+def test_solves_file_with_definitions(tmp_path):
+    file = tmp_path / "1var" / "2deg" / "defined.smt2"
+    file.parent.mkdir(parents=True)
+    file.write_text("(set-logic QF_NIA)\n(declare-fun x () Int)\n"
+        "(define-fun f ((a Int) (b Int)) Int (+ (* a a) b))\n"
+        "(assert (let ((y (- x 1))) (= (f y (- 7)) 162)))\n(check-sat)\n")
+    with contextlib.redirect_stdout(io.StringIO()):
+        sat_model = crt_solver.CRTSolver("5000").solve_file(file)
+    assert sat_model in ([["x", 14]], [["x", -12]])
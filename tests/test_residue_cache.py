@@ -0,0 +1,50 @@
+import contextlib
+import io
+from crtsolver.input_output import cache
+from crtsolver.crt_components.engine import term_dag
+from crtsolver.solvers import crt_solver
+from conftest import BENCHMARKS
+
+def dag(*assertions):
+    ast = [["declare-const", "x", "Int"], ["declare-const", "y", "Int"]]
+    return term_dag.Term_DAG(ast + [["assert", assertion] for assertion in assertions], ["x", "y"])
+
+def test_canonical_form_of_reduced_system():
+    first = dag(["=", ["*", "x", "y"], "15"], ["=", ["+", "x", "y"], "8"])
+    # Asserts swapped, sides swapped, scaled by 2 and coefficients shifted by the modulus
+    second = dag(["=", "8", ["+", "x", "y"]], ["=", ["*", "2", "x", "y"], ["+", "30", "7"]])
+    assert first.canonical_form(7, "bv") == second.canonical_form(7, "bv")
+    assert first.canonical_form(11, "bv") != second.canonical_form(11, "bv")
+    assert first.canonical_form(7, "bv") != first.canonical_form(11, "bv")
+
+def test_entries_are_evicted_least_recently_used(tmp_path):
+    residues = cache.Residue_Cache(tmp_path / "residues.sqlite3", capacity=2)
+    residues.put("a", "UNSAT", None, 16)
+    residues.put("b", "SAT", [[1, 2]], 16)
+    assert residues.get("a", 16) == ("UNSAT", None) # a is now used more recently than b
+    residues.put("c", "SAT", [[0, 0], [1, 1]], 2)
+    assert residues.get("b", 16) is None
+    assert residues.get("a", 16) == ("UNSAT", None)
+    # Two tuples found under a limit of 2 - more may exist
+    assert residues.get("c", 1) == ("SAT", [[0, 0]])
+    assert residues.get("c", 4) is None
+
+def test_warm_run_skips_modulo_solving(tmp_path):
+    file = BENCHMARKS / "2var" / "2deg" / "machine.smt2"
+    residues = cache.Residue_Cache(tmp_path / "residues.sqlite3")
+    runs = []
+    for _ in range(2):
+        solver = crt_solver.CRTSolver("5000", enum_threshold=0)
+        solver.residue_cache = residues
+        built = [] # primes whose modulo problem was built
+        init_mod_and_candidate = solver.init_mod_and_candidate
+        def init():
+            init_mod_and_candidate()
+            compute_mod = solver.modulo.compute_mod
+            solver.modulo.compute_mod = lambda: built.append(solver.primes.prime) or compute_mod()
+        solver.init_mod_and_candidate = init
+        with contextlib.redirect_stdout(io.StringIO()):
+            runs.append((solver.solve_file(file), built))
+    (cold, cold_built), (warm, warm_built) = runs
+    assert cold == warm
+    assert cold_built and not warm_built
@@ -0,0 +1,42 @@
+from crtsolver.crt_components.engine import residue_enumerator
+from crtsolver.input_output import reader
+from crtsolver.solvers import crt_solver
+
+def parse(code):
+    return reader.parse(reader.tokenize(code))
+
+def test_enumerates_all_residues():
+    # (x - 5)(x + 1) = 0 -> x = 2 (mod 3), the only root since 5 = -1 (mod 3)
+    ast = parse("(declare-const x Int)(assert (= (* (+ x -5) (+ x 1)) 0))")
+    enumerator = residue_enumerator.Residue_Enumerator(ast, ["x"], 4096)
+    assert enumerator.enumerate(3) == [(2,)]
+    assert enumerator.enumerate(7) == [(5,), (6,)]
+
+def test_unsat_modulo_small_prime():
+    # 2 is not a square mod 3
+    ast = parse("(declare-const x Int)(assert (= (* x x) 2))")
+    enumerator = residue_enumerator.Residue_Enumerator(ast, ["x"], 4096)
+    assert enumerator.enumerate(3) == []
+
+def test_threshold_and_order_comparisons_fall_back_to_cvc5():
+    ast = parse("(declare-const x Int)(declare-const y Int)(assert (= (* x y) 1))")
+    enumerator = residue_enumerator.Residue_Enumerator(ast, ["x", "y"], 100)
+    assert enumerator.fits(7) and not enumerator.fits(11)
+
+    ast = parse("(declare-const x Int)(assert (> x 1))")
+    assert not residue_enumerator.Residue_Enumerator(ast, ["x"], 4096).fits(2)
+
+def test_unsat_files_decided_by_enumeration(tests_dir):
+    solver = crt_solver.CRTSolver("5000", use_bitvectors=False)
+    assert solver.solve_file(tests_dir / "1var" / "2deg" / "cat.smt2") == [["UNSAT"]]
+
+def test_negations_are_not_reduced_mod_p():
+    # 2x = 2 holds for every residue mod 2, but x = 0 satisfies (not (= (* 2 x) 2))
+    code = "(declare-const x Int)(assert (not (= (* 2 x) 2)))"
+    assert not residue_enumerator.Residue_Enumerator(parse(code), ["x"], 4096).supported
+    for use_bitvectors in (True, False):
+        for enum_threshold in (4096, 0): # enumeration, then the cvc5 modulo solver
+            solver = crt_solver.CRTSolver("5000", use_bitvectors=use_bitvectors,
+                enum_threshold=enum_threshold, verbose=0)
+            result = solver.solve(code)
+            assert result.status == "sat" and result.model["x"] != 1
@@ -0,0 +1,49 @@
+import contextlib
+import io
+import itertools
+from crtsolver.solvers import crt_solver
+from crtsolver.crt_components.helpers import polynomial, prime_generator, schedule
+from crtsolver.input_output import reader
+from conftest import BENCHMARKS
+
+def trial_division(n):
+    return n > 1 and all(n % d for d in range(2, int(n ** 0.5) + 1))
+
+def take(generator, n):
+    return list(itertools.islice(generator, n))
+
+def test_sieve_matches_trial_division_across_segments():
+    primes = take(prime_generator.Prime_Generator().get_next_prime(), 4000)
+    assert primes[-1] > prime_generator.SEGMENT_SIZE
+    assert primes == [n for n in range(2, primes[-1] + 1) if trial_division(n)]
+
+def test_generator_keeps_history():
+    generator = prime_generator.Prime_Generator(start=10)
+    take(generator.get_next_prime(), 3)
+    assert generator.primes == [11, 13, 17]
+    assert generator.get_current_prime() == 17
+    assert generator.get_previous_prime() == 13
+
+def test_schedules():
+    assert take(schedule.Modulus_Schedule("consecutive", start_prime=100).get_next_modulus(), 3) \
+        == [101, 103, 107]
+    assert take(schedule.Modulus_Schedule("prime_powers", power=2).get_next_modulus(), 3) \
+        == [4, 9, 25]
+    assert take(schedule.Modulus_Schedule("geometric", ratio=2.0).get_next_modulus(), 4) \
+        == [2, 5, 11, 23]
+    assert take(schedule.Modulus_Schedule(
+        "skip_leading", leading_coefficients=[6]).get_next_modulus(), 3) == [5, 7, 11]
+
+def test_leading_coefficients():
+    with open(BENCHMARKS / "1var" / "2deg" / "cat.smt2") as input:
+        ast = reader.tokenize_and_parse(input)
+    var_names = [subtree[1] for subtree in ast if subtree[0] == "declare-const"]
+    coefficients = polynomial.leading_coefficients(ast, var_names)
+    assert coefficients and all(c > 0 for c in coefficients)
+
+def test_prime_powers_find_obstruction_mod_4():
+    # (x-3)^2 + (y+6)^2 = 7 has no solution mod 4, but one mod every odd prime
+    file = BENCHMARKS / "2var" / "2deg" / "faint.smt2"
+    solver = crt_solver.CRTSolver("5000", schedule_name="prime_powers")
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert solver.solve_file(file) == [["UNSAT"]]
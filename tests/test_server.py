@@ -0,0 +1,63 @@
+import json
+import threading
+import time
+import urllib.request
+import pytest
+from crtsolver import server
+from conftest import BENCHMARKS
+
+@pytest.fixture(scope="module")
+def url():
+    solve_server = server.Solve_Server(workers=1, time_limit="5000", timeout=5000)
+    http_server = server.create_http_server(solve_server, port=0)
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{http_server.server_address[1]}"
+    http_server.shutdown()
+    http_server.server_close()
+    solve_server.close()
+
+def request(url, method="GET", body=None):
+    data = body if body is None or isinstance(body, bytes) else json.dumps(body).encode()
+    with urllib.request.urlopen(urllib.request.Request(url, data, method=method)) as response:
+        return json.loads(response.read())
+
+def test_solve_with_every_engine(url):
+    source = (BENCHMARKS / "1var" / "2deg" / "dog.smt2").read_bytes()
+    for engine in server.ENGINES:
+        response = request(f"{url}/solve?engine={engine}", "POST", source)
+        assert (response["engine"], response["state"], response["status"]) == (engine, "done", "sat")
+        assert response["model"]["x"] in (-4, -3)
+        assert response["run_time"] >= response["setup_time"] >= 0
+
+    response = request(f"{url}/solve", "POST",
+        {"input": (BENCHMARKS / "1var" / "2deg" / "cat.smt2").read_text(), "engine": "Z3"})
+    assert (response["status"], response["model"], response["reason"]) == ("unsat", {}, None)
+
+def test_timeout_queue_and_cancel(url):
+    slow = {"input": (BENCHMARKS / "3var" / "3deg" / "titanium.smt2").read_text(),
+        "engine": "CRT-BV", "timeout": 60000}
+    running = request(f"{url}/jobs", "POST", slow)
+    queued = request(f"{url}/jobs", "POST", slow)
+    time.sleep(0.5)
+    assert request(f"{url}/metrics")["queue_depth"] == 1
+
+    # A queued job is dropped, a running one kills and restarts its worker
+    assert request(f"{url}/jobs/{queued['id']}", "DELETE")["state"] == "cancelled"
+    request(f"{url}/jobs/{running['id']}", "DELETE")
+    assert request(f"{url}/jobs/{running['id']}?wait=1")["state"] == "cancelled"
+
+    # The restarted worker honours per-job timeouts
+    response = request(f"{url}/solve", "POST", dict(slow, timeout=300))
+    assert (response["status"], response["reason"]) == ("unknown", "timeout")
+
+    metrics = request(f"{url}/metrics")
+    assert metrics["cancelled"] == 2 and metrics["worker_restarts"] == 1
+    assert metrics["queue_depth"] == 0 and metrics["throughput"] > 0
+
+def test_bad_requests(url):
+    with pytest.raises(urllib.error.HTTPError) as e:
+        request(f"{url}/solve?engine=MathSAT", "POST", b"(check-sat)")
+    assert e.value.code == 400
+    with pytest.raises(urllib.error.HTTPError) as e:
+        request(f"{url}/jobs/unknown")
+    assert e.value.code == 404
@@ -0,0 +1,34 @@
+import contextlib
+import io
+from crtsolver.solvers import crt_solver
+from crtsolver.crt_components.engine import term_dag
+from conftest import BENCHMARKS
+
+def evaluate(dag, model):
+    operations = {"+": sum, "*": lambda operands: operands[0] * operands[1],
+        "=": lambda operands: operands[0] == operands[1]}
+    leaf = lambda kind, token: model[token] if kind == "var" else int(token)
+    return dag.instantiate(leaf, lambda operator, operands: operations[operator](operands))
+
+def test_common_subterms_are_shared():
+    square = ["*", ["+", "x", "1"], ["+", "x", "1"]]
+    ast = [["declare-const", "x", "Int"], ["assert", ["=", square, "4"]],
+        ["assert", ["=", square, ["+", "x", "3"]]]]
+    dag = term_dag.Term_DAG(ast, ["x"])
+    # x, 1, (+ x 1), (* ..), 4, (= .. 4), 3, (+ x 3), (= .. (+ x 3))
+    assert len(dag.nodes) == 9
+    assert evaluate(dag, {"x": 1}) == [True, True]
+    assert evaluate(dag, {"x": 2}) == [False, False]
+
+def test_deep_terms_do_not_recurse():
+    tree = "x"
+    for _ in range(20000):
+        tree = ["+", tree, "1"]
+    ast = [["declare-const", "x", "Int"], ["assert", ["=", tree, "20000"]]]
+    assert evaluate(term_dag.Term_DAG(ast, ["x"]), {"x": 0}) == [True]
+
+def test_back_ends_share_one_dag():
+    solver = crt_solver.CRTSolver("5000")
+    with contextlib.redirect_stdout(io.StringIO()):
+        solver.solve_file(BENCHMARKS / "2var" / "2deg" / "machine.smt2")
+    assert solver.modulo.dag is solver.dag and solver.candidate.dag is solver.dag
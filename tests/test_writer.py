@@ -0,0 +1,49 @@
+import csv
+import json
+from crtsolver.input_output import reader, writer
+from crtsolver.solvers import z3_solver
+
+def test_results_are_streamed(tests_dir, tmp_path):
+    file_writer = writer.Writer(tmp_path, "stream")
+    file = reader.get_sorted_files(tests_dir)[0]
+    file_writer.store_result(file, 0, [["UNSAT"]], 1)
+    # Visible on disk before write() is called
+    with open(file_writer.file_name, newline="") as file:
+        rows = list(csv.reader(file))
+    assert rows[1][1:] == ["cat", "1var", "2deg", "1", "[['UNSAT']]"]
+
+def test_resume_skips_completed_files(redirect, tests_dir):
+    solver = redirect(z3_solver.Z3Solver("5000"))
+    solver.execute()
+
+    # Interrupted run: only the first file has a result (plus a stale totals row)
+    with open(solver.writer.file_name, newline="") as file:
+        rows = list(csv.reader(file))
+    with open(solver.writer.file_name, "w", newline="") as file:
+        csv.writer(file).writerows(rows[:2] + rows[-1:])
+
+    solver.writer = writer.Writer(solver.RESULTS, solver.solver_name, resume=True)
+    assert solver.writer.completed() == {("1var", "2deg", "cat")}
+    assert len(reader.get_sorted_files(tests_dir, solver.writer.completed())) == 2
+    solver.execute()
+
+    with open(solver.writer.file_name, newline="") as file:
+        resumed = list(csv.reader(file))
+    assert [row[:4] for row in resumed[1:-1]] == [row[:4] for row in rows[1:-1]]
+    assert resumed[-1][0] == "Totals: 3" and resumed[-1][3] == rows[-1][3]
+
+def test_jsonl_drops_partial_line(redirect):
+    solver = redirect(z3_solver.Z3Solver("5000"))
+    solver.writer = writer.Writer(solver.RESULTS, solver.solver_name, output_format="jsonl")
+    solver.execute()
+    with open(solver.writer.file_name) as file:
+        records = [json.loads(line) for line in file]
+    assert [record.get("FileName") for record in records] == ["cat", "dog", "small", None]
+    assert records[-1]["Totals"] == "Totals: 3"
+
+    # A line cut off by a crash is ignored when resuming
+    with open(solver.writer.file_name, "a") as file:
+        file.write('{"TestInput": 4, "FileN')
+    resumed = writer.Writer(solver.RESULTS, solver.solver_name, output_format="jsonl",
+        resume=True)
+    assert len(resumed.read_rows()) == 3